@@ -15,6 +15,7 @@ from config import Config
 from services.session import SessionManager
 from services.webhook import WebhookService, initialize_survey_functions
 from services.survey import SurveyFlow, survey_manager # Import SurveyFlow and survey_manager
+from services.channel_resolver import channel_resolver
 from discord_bot.commands.survey import ask_dynamic_step, finish_survey # Import the functions
 from config import (
     WORKLOAD_OPTIONS,
@@ -108,7 +109,7 @@ async def survey_incomplete_timeout(user_id: str):
     if not survey:
         return
     try:
-        channel = await bot.fetch_channel(int(survey.channel_id))
+        channel = await channel_resolver.resolve(bot, survey.channel_id)
         if not channel:
             logger.warning(f"Channel {survey.channel_id} not found for user {user_id}")
             return
@@ -131,7 +132,7 @@ async def survey_incomplete_timeout(user_id: str):
 
 async def handle_start_daily_survey(bot, user_id: str, channel_id: str, steps: List[str]):
     try:
-        channel = await bot.fetch_channel(int(channel_id))
+        channel = await channel_resolver.resolve(bot, channel_id)
         if not channel:
             logger.warning(f"Channel {channel_id} not found for user {user_id}")
             return
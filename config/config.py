@@ -29,14 +29,36 @@ class Config:
     NOTION_TEAM_DIRECTORY_DB_ID: str = NOTION_TEAM_DIRECTORY_DB_ID
     NOTION_WORKLOAD_DB_ID: str = NOTION_WORKLOAD_DB_ID
     NOTION_PROFILE_STATS_DB_ID: str = NOTION_PROFILE_STATS_DB_ID
+    TEAM_DIRECTORY_REFRESH_INTERVAL: int = int(
+        os.getenv("TEAM_DIRECTORY_REFRESH_INTERVAL", "300")
+    )  # seconds between background Team Directory reloads
+    NOTION_RATE_LIMIT: float = float(os.getenv("NOTION_RATE_LIMIT", "3"))  # requests per second
+    NOTION_RATE_BURST: int = int(os.getenv("NOTION_RATE_BURST", "3"))
+    NOTION_TODO_CONCURRENCY: int = int(os.getenv("NOTION_TODO_CONCURRENCY", "4"))  # parallel block listings per ToDo walk
+    NOTION_TODO_CACHE_TTL: int = int(os.getenv("NOTION_TODO_CACHE_TTL", "300"))  # seconds a cached ToDo subtree is trusted; nested edits show up after this
+    NOTION_TODO_CACHE_MAX_BLOCKS: int = int(os.getenv("NOTION_TODO_CACHE_MAX_BLOCKS", "20000"))
+    TODO_PREFETCH_TIMEOUT: float = float(os.getenv("TODO_PREFETCH_TIMEOUT", "10"))  # max wait for ToDos when a survey finishes
+    NOTION_PREFETCH_TIMEOUT: float = float(os.getenv("NOTION_PREFETCH_TIMEOUT", "5"))  # max wait for prefetched author pages
 
     # Calendar configuration
     GOOGLE_SERVICE_ACCOUNT_B64: str = os.getenv("GOOGLE_SERVICE_ACCOUNT_B64", "")
     CALENDAR_ID: str = CALENDAR_ID
+    CALENDAR_TOKEN_REFRESH_MARGIN: int = int(
+        os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN", "300")
+    )  # seconds before expiry to refresh the cached access token
+    CALENDAR_EVENT_CONCURRENCY: int = int(os.getenv("CALENDAR_EVENT_CONCURRENCY", "4"))  # day-off events created at once
+    CALENDAR_DEDUP_TTL: int = int(os.getenv("CALENDAR_DEDUP_TTL", "60"))  # seconds a created event skips repeat submissions
 
     # External services
     CONNECTS_URL: str = CONNECTS_URL
 
+    # Shared HTTP client pool
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))  # seconds
+    HTTP_KEEPALIVE_TIMEOUT: int = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))  # seconds
+    HTTP_TIMEOUT: int = int(os.getenv("HTTP_TIMEOUT", "60"))  # total seconds per request
+
     # Database configuration
     DB_POSTGRESDB_PASSWORD: str = os.getenv("DB_POSTGRESDB_PASSWORD", "")
     DB_POSTGRESDB_USER: str = DB_POSTGRESDB_USER
@@ -49,9 +71,31 @@ class Config:
         )
     else:
         DATABASE_URL: str = ""
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
+    DB_POOL_ACQUIRE_TIMEOUT: float = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))  # seconds
 
     # Session configuration
     SESSION_TTL: int = int(os.getenv("SESSION_TTL", "86400"))  # 24 hours default
+    # Max wait for a view to finish its interaction before continuing a survey
+    SURVEY_HANDOFF_TIMEOUT: float = float(os.getenv("SURVEY_HANDOFF_TIMEOUT", "10"))  # seconds
+
+    # Channels fetched over REST are kept this long when the gateway cache misses
+    CHANNEL_CACHE_SIZE: int = int(os.getenv("CHANNEL_CACHE_SIZE", "256"))
+    CHANNEL_CACHE_TTL: int = int(os.getenv("CHANNEL_CACHE_TTL", "300"))  # seconds
+
+    # Outbox delivering queued Notion / connects writes in the background
+    OUTBOX_WORKERS: int = int(os.getenv("OUTBOX_WORKERS", "4"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))  # then dead-lettered
+    OUTBOX_RETRY_BASE: float = float(os.getenv("OUTBOX_RETRY_BASE", "5"))  # seconds, doubled per attempt
+    OUTBOX_RETRY_MAX: float = float(os.getenv("OUTBOX_RETRY_MAX", "600"))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+
+    # Outbound Discord message queue: per-channel and global token buckets
+    DISCORD_CHANNEL_RATE: int = int(os.getenv("DISCORD_CHANNEL_RATE", "5"))  # messages per DISCORD_CHANNEL_PER
+    DISCORD_CHANNEL_PER: float = float(os.getenv("DISCORD_CHANNEL_PER", "5"))  # seconds
+    DISCORD_GLOBAL_RATE: int = int(os.getenv("DISCORD_GLOBAL_RATE", "45"))  # requests per DISCORD_GLOBAL_PER
+    DISCORD_GLOBAL_PER: float = float(os.getenv("DISCORD_GLOBAL_PER", "1"))  # seconds
 
     # Web server configuration
     PORT: int = int(os.getenv("PORT", os.getenv("CAPTAIN_PORT", "3000")))
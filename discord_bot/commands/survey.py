@@ -4,14 +4,18 @@ from discord.ext import commands # type: ignore # Import commands for bot type h
 import json # Added for Notion ToDo JSON parsing
 from typing import Optional, List, Any # Added Any
 from config import ViewType, logger, Strings, Config, constants # Added constants
-from services import survey_manager, webhook_service
-from services.notion_todos import Notion_todos # Added for Notion ToDo fetching
+from services import survey_manager, webhook_service, channel_resolver, rest_calls, message_queue
+from services.message_queue import BROADCAST
 from services.survey import SurveyFlow # Added import
 # Removed factory import
 from discord_bot.views.workload_survey import create_workload_view # Use survey-specific view
 # Removed: from bot import bot # Import the bot instance from the root bot.py
 from discord_bot.views.model_connects_survey import ConnectsModal # Import the moved modal
 from discord_bot.views.day_off_survey import create_day_off_view # Use survey-specific view
+from discord_bot.views.components import component_router, layout, survey_custom_id, survey_template, survey_for_click
+
+# How often open surveys are checked for the step timeout, in seconds
+TIMEOUT_SWEEP_INTERVAL = 30
 
 # ==================================
 # Helper Functions
@@ -21,31 +25,17 @@ from discord_bot.views.day_off_survey import create_day_off_view # Use survey-sp
 async def cleanup_survey_message(interaction: discord.Interaction, survey: SurveyFlow): # Removed survey_id from log
     # logger.debug(f"[{survey.user_id if survey else 'N/A'}] - cleanup_survey_message called with message ID: {survey.current_question_message_id if survey else 'N/A'}")
     """Helper function to clean up the survey question message after modal submission.
-    Attempts to disable the button on the original message and then delete it.
+    Deletes it through a ``PartialMessage`` built from the stored ID: one call,
+    no fetch, and no point disabling the button of a message about to go.
     Handles potential errors like message not found or missing permissions gracefully.
     """
     if not survey.current_question_message_id:
         # logger.debug(f"[{survey.user_id if survey else 'N/A'}] - cleanup_survey_message: No message ID to clean up.")
         return # Added missing return
     try:
-        # logger.debug(f"[{survey.user_id if survey else 'N/A'}] - cleanup_survey_message: Fetching message {survey.current_question_message_id}")
-        original_msg = await interaction.channel.fetch_message(survey.current_question_message_id)
-        # logger.debug(f"[{survey.user_id if survey else 'N/A'}] - cleanup_survey_message: Message fetched successfully.")
-        # Attempt to disable button (best effort)
-        try:
-            view = discord.ui.View.from_message(original_msg)
-            if view: # Check if view exists
-                changed = False
-                for item in view.children:
-                    if isinstance(item, discord.ui.Button):
-                        item.disabled = True
-                        changed = True
-                if changed:
-                    await original_msg.edit(view=view)
-        except Exception as e_edit:
-            logger.warning(f"Could not disable button on message {survey.current_question_message_id}: {e_edit}")
+        original_msg = survey.message(survey.current_question_message_id, interaction.channel)
         # Delete the message
-        await original_msg.delete()
+        await message_queue.delete(original_msg)
         survey.current_question_message_id = None # Clear ID after deletion
     except discord.NotFound:
         logger.warning(f"Original survey question message {survey.current_question_message_id} not found for deletion.")
@@ -60,6 +50,16 @@ async def cleanup_survey_message(interaction: discord.Interaction, survey: Surve
         survey.current_question_message_id = None
 
 
+def step_button(session_id: str, step_name: str, disabled: bool = False) -> discord.ui.Button:
+    """The 'Ввести' button of a survey question, routed to ``handle_step_button``."""
+    return discord.ui.Button(
+        label=Strings.SURVEY_INPUT_BUTTON_LABEL, # "Ввести"
+        style=discord.ButtonStyle.primary,
+        custom_id=survey_custom_id("step", session_id, step_name),
+        disabled=disabled,
+    )
+
+
 async def handle_modal_error(interaction: discord.Interaction):
     """Standard error handler for modal on_submit exceptions.
     Attempts to send an ephemeral error message to the user.
@@ -90,13 +90,14 @@ async def handle_survey_incomplete(bot: commands.Bot, session_id: str) -> None:
     # Fetch channel using the provided bot instance
     channel = None
     try:
-        channel = await bot.fetch_channel(int(survey.channel_id))
+        channel = await channel_resolver.resolve(bot, survey.channel_id)
     except (discord.NotFound, discord.Forbidden):
          logger.warning(f"Could not fetch channel {survey.channel_id} via bot instance.")
     except Exception as e:
          logger.error(f"Error fetching channel {survey.channel_id} via bot instance: {e}")
     if not channel:
         logger.warning(f"Channel {survey.channel_id} could not be found for incomplete survey session {session_id}")
+        survey_manager.remove_survey(survey.channel_id) # Nothing left to notify; don't retry on every sweep
         return
 
     incomplete = survey.incomplete_steps()
@@ -108,21 +109,51 @@ async def handle_survey_incomplete(bot: commands.Bot, session_id: str) -> None:
     # Notify user about timeout
     try:
         logger.info(f"Sending timeout message to user {survey.user_id} in channel {survey.channel_id}")
-        await channel.send(f"<@{survey.user_id}> {Strings.TIMEOUT_MESSAGE}")
+        await message_queue.send(channel, f"<@{survey.user_id}> {Strings.TIMEOUT_MESSAGE}", priority=BROADCAST)
         logger.info(f"Successfully sent timeout message to user {survey.user_id}")
     except Exception as e:
         logger.error(f"Failed to send timeout message to user {survey.user_id}: {e}")
 
+    # Workload / day off buttons still waiting for a choice go with the survey
+    buttons_msg = survey.message(survey.buttons_message_id, channel)
+    if buttons_msg is not None:
+        try:
+            await message_queue.delete(buttons_msg)
+        except discord.NotFound:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to delete buttons message {survey.buttons_message_id} of timed out survey: {e}")
+
     survey_manager.remove_survey(survey.channel_id) # Remove by channel_id
     logger.info(f"Survey for user {survey.session_id} (session {session_id}) timed out with incomplete steps: {incomplete}")
 
 
+async def sweep_survey_timeouts(bot: commands.Bot, interval: float = TIMEOUT_SWEEP_INTERVAL) -> None:
+    """Close surveys left unanswered for the step timeout.
+
+    One loop checks every open survey, instead of a timed view per
+    question; surveys restored after a restart are covered too. Runs
+    until cancelled.
+    """
+    timeout = constants.VIEW_CONFIGS[constants.ViewType.DYNAMIC]["timeout"]
+    await bot.wait_until_ready()
+    while True:
+        for survey in survey_manager.stale(timeout):
+            logger.info(f"Survey {survey.session_id} had no activity for {timeout}s, closing it")
+            try:
+                await handle_survey_incomplete(bot, survey.session_id)
+            except Exception as e:
+                logger.error(f"Error closing timed out survey {survey.session_id}: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
 async def finish_empty_survey(
     bot: commands.Bot,
     channel: discord.TextChannel,
     user_id: str,
     channel_id: str,
     session_id: str,
+    todo_url: Optional[str] = None,
 ) -> None:
     """Create and immediately finish a survey with no steps."""
     if not channel:
@@ -132,24 +163,15 @@ async def finish_empty_survey(
         return
     try:
         minimal = survey_manager.create_survey(user_id, channel_id, [], session_id)
-        # Second check_channel call to populate survey.todo_url before finishing
-        payload = {
-            "command": "check_channel",
-            "channelId": channel_id,
-            "sessionId": session_id,
-        }
-        try:
-            await webhook_service.send_webhook_with_retry(None, payload, {})
-        except Exception as e:
-            logger.warning(
-                f"check_channel failed to refresh todo_url for channel {channel_id}: {e}"
-            )
+        # todo_url comes from the bootstrap lookup, no second round-trip needed
+        if todo_url:
+            minimal.todo_url = todo_url
         minimal.current_index = len(minimal.steps)
         await finish_survey(bot, channel, minimal)
     except ValueError as e:
         logger.error(f"Failed to create minimal survey for channel {channel_id}: {e}")
-        await channel.send(
-            f"<@{user_id}> {Strings.SURVEY_START_ERROR}: Failed to initialize survey."
+        await message_queue.send(
+            channel, f"<@{user_id}> {Strings.SURVEY_START_ERROR}: Failed to initialize survey."
         )
 
 async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id: str, session_id: str) -> None: # Added bot parameter
@@ -158,6 +180,7 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
     retrieves, filters, and orders steps, then starts the survey by asking the first step.
     """
     logger.info(f"Starting daily survey for channel {channel_id} (user: {user_id})")
+    rest_calls.enter("survey:start")
     # Check for existing survey first
     existing_survey = survey_manager.get_survey(channel_id) # Get by channel_id
     if existing_survey:
@@ -165,10 +188,8 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
         if str(existing_survey.channel_id) == str(channel_id) and str(existing_survey.user_id) == str(user_id): # Also check user_id for session uniqueness
             logger.info(f"Resuming existing survey for user {user_id} in channel {channel_id}")
             step = existing_survey.current_step()
-            if existing_survey.active_view:
-                existing_survey.active_view.stop()
             if step:
-                channel = await bot.fetch_channel(int(existing_survey.channel_id))
+                channel = await channel_resolver.resolve(bot, existing_survey.channel_id)
                 if channel:
                     await ask_dynamic_step(bot, channel, existing_survey, step) # Pass bot instance
                     return
@@ -181,32 +202,26 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
             # Let the flow continue to create a new survey for the *current* channel
 
 
-    # Check if channel is registered
-    payload = {
-        "command": "check_channel",
-        "channelId": channel_id,
-        "sessionId": session_id,
-    }
-    headers = {}
-    logger.info(
-        f"First check_channel call for channel {channel_id} with payload: {payload}"
-    )
-    success, data = await webhook_service.send_webhook_with_retry(
-        None, payload, headers
+    # Directory lookup, pending steps, ToDo URL and the channel itself are
+    # fetched in one concurrent fan-out
+    logger.info(f"Bootstrapping survey for channel {channel_id} (session {session_id})")
+    bootstrap, channel = await asyncio.gather(
+        webhook_service.bootstrap_survey(channel_id, session_id),
+        channel_resolver.resolve(bot, channel_id),
+        return_exceptions=True,
     )
-    logger.info(
-        f"First check_channel webhook response: success={success}, raw_data={data}"
-    )
-    resp = data.get("output") if data else None
-    if not success or not resp or resp.get("output") is not True:
+    if isinstance(bootstrap, BaseException):
+        logger.error(f"Survey bootstrap failed for channel {channel_id}: {bootstrap}")
+        return
+    logger.info(f"Survey bootstrap for channel {channel_id}: {bootstrap}")
+    if not bootstrap.get("registered"):
         logger.warning(f"Channel {channel_id} not registered for surveys")
         return
 
-    # Check channel response data
-    steps = resp.get("steps", [])
-    # logger.debug(f"Extracted steps from webhook data: {steps}") # Log extracted steps at debug level
-    channel = await bot.fetch_channel(channel_id)
-    if not channel:
+    steps = bootstrap.get("steps", [])
+    todo_url = bootstrap.get("todo_url")
+    author = (bootstrap.get("user") or {}).get("name")
+    if isinstance(channel, BaseException) or not channel:
         logger.warning(f"Channel {channel_id} not found")
         return
 
@@ -215,7 +230,7 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
         logger.info(
             f"No survey steps provided for channel {channel_id}, finishing survey."
         )
-        await finish_empty_survey(bot, channel, user_id, channel_id, session_id)
+        await finish_empty_survey(bot, channel, user_id, channel_id, session_id, todo_url)
         return
 
     logger.info(f"Starting survey with steps: {steps}")
@@ -231,18 +246,22 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
         logger.info(
             f"No *required* survey steps found for channel {channel_id} after filtering {steps}."
         )
-        await finish_empty_survey(bot, channel, user_id, channel_id, session_id)
+        await finish_empty_survey(bot, channel, user_id, channel_id, session_id, todo_url)
         return
 
     logger.info(f"Starting new survey for user {user_id} in channel {channel_id} with steps: {final_steps}")
 
     # Create the survey object
-    survey = survey_manager.create_survey(user_id, channel_id, final_steps, session_id) # Create survey with all required IDs
+    survey = survey_manager.create_survey(
+        user_id, channel_id, final_steps, session_id, author=author
+    ) # Create survey with all required IDs; prefetches the author's Notion pages
+    if todo_url:
+        survey.todo_url = todo_url
+        survey.prefetch_todos() # Ready by the time the survey finishes
 
     # Ask the first step
     first_step = survey.current_step()
     if first_step:
-        channel = await bot.fetch_channel(int(channel_id))
         if channel:
             logger.info(f"Fetched channel for survey: ID={channel.id}, Name={channel.name} (user: {user_id})") # Added log
             await ask_dynamic_step(bot, channel, survey, first_step) # Pass bot instance
@@ -252,8 +271,7 @@ async def handle_start_daily_survey(bot: commands.Bot, user_id: str, channel_id:
     else:
         # Should not happen if final_steps is not empty, but handle defensively
         logger.error(f"Survey created for channel {channel_id} but no first step available. Steps: {final_steps}")
-        channel = await bot.fetch_channel(int(channel_id))
-        if channel: await channel.send(f"<@{user_id}> {Strings.SURVEY_START_ERROR}: No steps found.")
+        if channel: await message_queue.send(channel, f"<@{user_id}> {Strings.SURVEY_START_ERROR}: No steps found.")
         survey_manager.remove_survey(channel_id) # Clean up by channel_id
 
 async def ask_dynamic_step(bot: commands.Bot, channel: discord.TextChannel, survey: SurveyFlow, step_name: str) -> None: # Added bot parameter, Type hint updated
@@ -286,232 +304,26 @@ async def ask_dynamic_step(bot: commands.Bot, channel: discord.TextChannel, surv
 
         if not question_text:
              logger.error(f"No question text found for survey step: {step_name}")
-             await channel.send(f"<@{user_id}> {Strings.STEP_ERROR}: Configuration error.")
+             await message_queue.send(channel, f"<@{user_id}> {Strings.STEP_ERROR}: Configuration error.")
              # Consider removing survey or stopping flow here
              return
 
         question_text = f"<@{user_id}> {question_text}" # Prepend user mention
 
-        # Create the "Ввести" button
-        button = discord.ui.Button( # Create the button for the step
-            label=Strings.SURVEY_INPUT_BUTTON_LABEL, # "Ввести"
-            style=discord.ButtonStyle.primary,
-            custom_id=f"survey_step_{survey.session_id}_{step_name}" # Unique ID
-        )
-
-        async def button_callback(interaction: discord.Interaction):
-            """Callback for the 'Ввести' button."""
-            original_msg = None # Initialize original_msg to None
-            logger.info(f"[{interaction.user.id}] - Button callback triggered for step: {step_name} in channel {interaction.channel.id}") # Added log with user ID
-
-            # No defer needed here, we will edit the original response directly.
-
-
-            logger.info(f"Button callback triggered for step: {step_name} in channel {interaction.channel.id} by user {interaction.user.id}") # Added log with user ID
-
-            # Verify user matches survey user
-            # Retrieve the survey using channel_id
-            current_survey = survey_manager.get_survey(str(interaction.channel.id))
-            if not current_survey or str(interaction.user.id) != str(current_survey.user_id):
-                logger.warning(f"User {interaction.user.id} attempted to interact with survey in channel {interaction.channel.id} but it belongs to user {current_survey.user_id if current_survey else 'N/A'}")
-                # Use send_message as this is the initial response
-                await interaction.response.send_message(Strings.SURVEY_NOT_FOR_YOU, ephemeral=False)
-                return # Exit if user/channel mismatch
-
-            # Disable the button on the original message
-            try:
-                original_msg = await interaction.channel.fetch_message(current_survey.current_question_message_id)
-                if original_msg:
-                    view = discord.ui.View.from_message(original_msg)
-                    if view:
-                        changed = False # Initialize changed flag
-                        for item in view.children:
-                            if isinstance(item, discord.ui.Button) and item.custom_id == f"survey_step_{current_survey.session_id}_{step_name}":
-                                item.disabled = True
-                                changed = True # Set changed flag
-                                break # Found and disabled the button, no need to continue loop
-                        if changed: # Only edit if a button was disabled
-                            await original_msg.edit(view=view)
-                            logger.debug(f"Disabled button on message {original_msg.id} for step {step_name}")
-
-            except Exception as disable_error:
-                logger.warning(f"Could not disable button on message {current_survey.current_question_message_id} for step {step_name}: {disable_error}")
-
-            # Add "⏳" reaction to the original message
-            try:
-                # original_msg is fetched above, reuse it if available
-                if original_msg and not any(r.emoji == "⏳" for r in original_msg.reactions): # Avoid adding reaction if already present
-                    await original_msg.add_reaction(Strings.PROCESSING) # Add reaction to the original message
-                    # logger.debug(f"Added {Strings.PROCESSING} reaction to message {original_msg.id} in channel {interaction.channel.id}")
-            except Exception as reaction_error:
-                logger.warning(f"Could not add {Strings.PROCESSING} reaction to message {current_survey.current_question_message_id} in channel {interaction.channel.id}: {reaction_error}")
-
-            # Identify the correct view or modal based on step_name
-            if step_name in ["workload_today", "workload_nextweek"]:
-                # Defer interaction for workload view as it's a followup message
-                try:
-                    if not interaction.response.is_done():
-                        await interaction.response.defer(ephemeral=False) # Defer publicly
-                except Exception as defer_error:
-                    logger.error(f"Error deferring interaction for workload step {step_name}: {defer_error}", exc_info=True)
-                    try:
-                        await interaction.response.send_message(Strings.GENERAL_ERROR, ephemeral=False)
-                    except:
-                        pass
-                    return
-
-                logger.info(f"Button callback for workload survey step: {step_name}. Creating workload view.")
-                # Create the multi-button workload view
-                # Pass the current_survey object and continue_survey function to the view factory
-                workload_view = create_workload_view(bot, step_name, str(interaction.user.id), has_survey=True, continue_survey_func=lambda c, s: continue_survey(bot, c, s), survey=current_survey, command_msg=original_msg) # Pass bot instance to continue_survey and the original message, added bot instance
-                # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Workload view created: {workload_view}") # Keep debug
-
-                # Send the workload view as a new message instead of editing the original
-                # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Attempting to send workload view via followup.send") # Added log
-                try:
-                    buttons_msg = await interaction.followup.send(
-                        content=Strings.SELECT_HOURS,
-                        view=workload_view,
-                        ephemeral=False
-                    )
-                    logger.info(f"[Channel {current_survey.session_id.split('_')[0]}] - Sent workload view as new message {buttons_msg.id}.") # Modified log
-                    # Store the message object reference on the view for the callback to use
-                    workload_view.buttons_msg = buttons_msg # Store the new message object
-
-                    # Remove the processing reaction from the original command message
-                    if original_msg:
-                        try:
-                            await original_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
-                            logger.debug(f"Removed {Strings.PROCESSING} reaction from original command message {original_msg.id}")
-                        except Exception as remove_reaction_error:
-                            logger.warning(f"Could not remove {Strings.PROCESSING} reaction from original command message {original_msg.id}: {remove_reaction_error}")
-                except Exception as e:
-                    logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Error sending workload view as new message: {e}", exc_info=True) # Modified log
-                    # Attempt to send error message via followup if sending failed
-                    try:
-                        # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Attempting to send error message via followup.send after failure") # Added log
-                        await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
-                        # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Sent error message via followup.send") # Added log
-                    except Exception as e_send_error: # Added specific exception for error sending
-                        logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send error message after workload view send failure: {e_send_error}", exc_info=True) # Added log
-
-            elif step_name == "connects_thisweek":
-                try:
-                    logger.info(f"Button callback for connects_thisweek survey step: {step_name}")
-
-                    # Create and send modal as the initial response
-                    # Pass the current_survey object and dependencies
-                    modal_to_send = ConnectsModal(
-                        survey=current_survey,
-                        step_name=step_name,
-                        finish_survey_func=lambda c, s: finish_survey(bot, c, s), # Pass bot instance to finish_survey
-                        webhook_service_instance=webhook_service, # Pass webhook_service instance
-                        bot_instance=bot # Pass bot instance
-                    )
-                    # Send modal as the initial response
-                    await interaction.response.send_modal(modal_to_send)
-
-                except discord.errors.InteractionResponded:
-                    logger.error("Interaction already responded to when trying to send modal")
-                    return
-                except Exception as e:
-                    logger.error(f"Error in connects_thisweek button callback: {e}", exc_info=True)
-                    try:
-                        # Use send_message as this is the initial response
-                        if not interaction.response.is_done():
-                            await interaction.response.send_message(
-                                Strings.GENERAL_ERROR,
-                                ephemeral=False
-                            )
-                        else:
-                             await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False) # Added followup for already responded
-                    except Exception as e:
-                        logger.error(f"Error sending error response in connects_thisweek button callback: {e}")
-
-            elif step_name == "day_off_nextweek":
-                # Defer interaction for day off view as it's a followup message
-                await interaction.response.defer()
-                logger.info(f"Button callback for day_off_nextweek survey step: {step_name}. Creating day off view.")
-                from discord_bot.views.day_off_survey import create_day_off_view # Use survey-specific view
-                logger.debug(f"[{interaction.user.id}] - Calling create_day_off_view for step: {step_name}")
-                try:
-                    # Pass the current_survey object and continue_survey function to the view factory
-                    day_off_view = create_day_off_view(bot, step_name, str(interaction.user.id), has_survey=True, continue_survey_func=lambda c, s: continue_survey(bot, c, s), survey=current_survey, command_msg=original_msg) # Pass bot instance and original_msg to create_day_off_view
-                    logger.debug(f"[{interaction.user.id}] - create_day_off_view returned: {day_off_view}")
-
-                    # Send the day off view as a new message instead of editing the original
-                    logger.debug(f"[{interaction.user.id}] - Attempting to send day off view via followup.send")
-                    try:
-                        buttons_msg = await interaction.followup.send(
-                            Strings.DAY_OFF_NEXTWEEK,
-                            view=day_off_view,
-                            ephemeral=False
-                        )
-                        logger.debug(f"[{interaction.user.id}] - interaction.followup.send returned message ID: {buttons_msg.id}")
-                        logger.info(f"[Channel {current_survey.session_id.split('_')[0]}] - Sent day off view as new message {buttons_msg.id}.")
-                        # Store the message object reference on the view for the callback to use
-                        day_off_view.buttons_msg = buttons_msg # Store the new message object
-
-                    except discord.errors.NotFound:
-                        logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Webhook not found when sending day off view. Interaction might be stale.", exc_info=True)
-                        # Inform the user that the interaction might be stale
-                        try:
-                            await interaction.followup.send("It seems there was an issue with the interaction. Please try starting the survey again.", ephemeral=True)
-                        except Exception as e_send_error:
-                            logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send stale interaction message: {e_send_error}", exc_info=True)
-                    except Exception as e:
-                        logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Error sending day off view as new message: {e}", exc_info=True)
-                        # Attempt to send a generic error message via followup if sending failed
-                        try:
-                            await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
-                        except Exception as e_send_error:
-                            logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send generic error message after day off view send failure: {e_send_error}", exc_info=True)
-
-                except Exception as e:
-                    logger.error(f"[{interaction.user.id}] - Error creating day off view for step {step_name}: {e}", exc_info=True)
-                    # Attempt to send a generic error message to the user
-                    try:
-                        await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
-                    except Exception as e_send_error:
-                        logger.error(f"[{interaction.user.id}] - Failed to send error message after view creation failure: {e_send_error}", exc_info=True)
-
-
-            else:
-                logger.error(f"Button callback triggered for unknown survey step: {step_name}")
-                # Use send_message as this is the initial response
-                await interaction.response.send_message(Strings.GENERAL_ERROR, ephemeral=False)
-                return
-
-        # Assign callback and create view
-        button.callback = button_callback
-        button.callback = button_callback
-        view = discord.ui.View(timeout=constants.VIEW_CONFIGS[constants.ViewType.DYNAMIC]["timeout"]) # Use timeout from constants
-        
-        # Add timeout handler to clean up and notify user
-        async def on_timeout():
-            logger.info(f"Survey step {step_name} timed out for user {user_id}")
-            # Get the latest survey state from the manager
-            current_survey = survey_manager.get_survey(survey.channel_id)
-            if current_survey:
-                await handle_survey_incomplete(bot, current_survey.session_id)
-            else:
-                logger.error(f"Survey not found for channel {survey.channel_id} during timeout")
-            
-        view.on_timeout = on_timeout
-        
-        view.add_item(button)
-        survey.active_view = view  # Attach view to survey
+        # The button only carries the session and step; handle_step_button
+        # picks the click up, also after a restart
+        button = step_button(survey.session_id, step_name)
 
         # Send the question message with the button
         logger.info(f"Attempting to send question for step {step_name} to channel ID={channel.id}, Name={channel.name} for user {user_id}") # Added log
-        question_msg = await channel.send(question_text, view=view)
-        survey.current_question_message_id = question_msg.id # Store message ID for cleanup
-        survey.current_message = question_msg # Store the message object
+        question_msg = await message_queue.send(channel, question_text, view=layout(button))
+        survey.current_message = question_msg # Keeps only the message ID and its channel
+        survey.touch() # The step timeout counts from here
         logger.info(f"Sent question for step {step_name} (msg ID: {question_msg.id}) for channel {channel.id}")
     except Exception as e:
         logger.error(f"Error in ask_dynamic_step for step {step_name}: {str(e)}", exc_info=True)
         try:
-            await channel.send(f"<@{user_id}> {Strings.STEP_ERROR}: {str(e)}")
+            await message_queue.send(channel, f"<@{user_id}> {Strings.STEP_ERROR}: {str(e)}")
         except Exception as send_error:
             logger.error(f"Failed to send error message: {send_error}")
 
@@ -522,6 +334,157 @@ async def ask_dynamic_step(bot: commands.Bot, channel: discord.TextChannel, surv
                 await continue_survey(bot, channel, survey) # Pass bot instance
             except Exception as e2:
                 logger.error(f"Error continuing survey after step failure: {e2}")
+
+
+@component_router.route(survey_template("step"))
+async def handle_step_button(interaction: discord.Interaction, session_id: str, step: str) -> None:
+    """Handle the 'Ввести' button of a survey question.
+
+    The session and step come from the button's custom_id, so questions
+    sent before a restart keep working.
+    """
+    step_name = step
+    bot = interaction.client
+    rest_calls.enter(f"survey:{step_name}")
+    logger.info(f"Button callback triggered for step: {step_name} in channel {interaction.channel.id} by user {interaction.user.id}") # Added log with user ID
+
+    # Verify the survey is still on this step and belongs to the user
+    current_survey = await survey_for_click(interaction, session_id, step_name)
+    if current_survey is None:
+        return
+
+    async def acknowledge() -> None:
+        """Acknowledge the click and disable the step button in the same call."""
+        await interaction.response.edit_message(view=layout(step_button(session_id, step_name, disabled=True)))
+        logger.debug(f"Disabled button on message {current_survey.current_question_message_id} for step {step_name}")
+
+    # Identify the correct view or modal based on step_name
+    if step_name in ["workload_today", "workload_nextweek"]:
+        # Acknowledge the interaction; the workload view follows as a followup message
+        try:
+            if not interaction.response.is_done():
+                await acknowledge()
+        except Exception as defer_error:
+            logger.error(f"Error acknowledging interaction for workload step {step_name}: {defer_error}", exc_info=True)
+            try:
+                await interaction.response.send_message(Strings.GENERAL_ERROR, ephemeral=False)
+            except:
+                pass
+            return
+
+        logger.info(f"Button callback for workload survey step: {step_name}. Creating workload view.")
+        # Create the multi-button workload view; the session and step travel in the custom_ids
+        workload_view = create_workload_view(current_survey.session_id, step_name)
+        # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Workload view created: {workload_view}") # Keep debug
+
+        # Send the workload view as a new message instead of editing the original
+        # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Attempting to send workload view via followup.send") # Added log
+        try:
+            buttons_msg = await interaction.followup.send(
+                content=Strings.SELECT_HOURS,
+                view=workload_view,
+                ephemeral=False
+            )
+            logger.info(f"[Channel {current_survey.session_id.split('_')[0]}] - Sent workload view as new message {buttons_msg.id}.") # Modified log
+            # Only the ID is kept; the buttons' handlers get the message with the click
+            current_survey.buttons_message_id = buttons_msg.id
+        except Exception as e:
+            logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Error sending workload view as new message: {e}", exc_info=True) # Modified log
+            # Attempt to send error message via followup if sending failed
+            try:
+                # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Attempting to send error message via followup.send after failure") # Added log
+                await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
+                # logger.debug(f"[{current_survey.session_id.split('_')[0]}] - Sent error message via followup.send") # Added log
+            except Exception as e_send_error: # Added specific exception for error sending
+                logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send error message after workload view send failure: {e_send_error}", exc_info=True) # Added log
+
+    elif step_name == "connects_thisweek":
+        try:
+            logger.info(f"Button callback for connects_thisweek survey step: {step_name}")
+
+            # Create and send modal as the initial response
+            # Pass the current_survey object and dependencies
+            modal_to_send = ConnectsModal(
+                survey=current_survey,
+                step_name=step_name,
+                finish_survey_func=lambda c, s: finish_survey(bot, c, s), # Pass bot instance to finish_survey
+                webhook_service_instance=webhook_service, # Pass webhook_service instance
+                bot_instance=bot # Pass bot instance
+            )
+            # Send modal as the initial response
+            await interaction.response.send_modal(modal_to_send)
+
+        except discord.errors.InteractionResponded:
+            logger.error("Interaction already responded to when trying to send modal")
+            return
+        except Exception as e:
+            logger.error(f"Error in connects_thisweek button callback: {e}", exc_info=True)
+            try:
+                # Use send_message as this is the initial response
+                if not interaction.response.is_done():
+                    await interaction.response.send_message(
+                        Strings.GENERAL_ERROR,
+                        ephemeral=False
+                    )
+                else:
+                     await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False) # Added followup for already responded
+            except Exception as e:
+                logger.error(f"Error sending error response in connects_thisweek button callback: {e}")
+
+    elif step_name == "day_off_nextweek":
+        # Acknowledge the interaction; the day off view follows as a followup message
+        await acknowledge()
+        logger.info(f"Button callback for day_off_nextweek survey step: {step_name}. Creating day off view.")
+        logger.debug(f"[{interaction.user.id}] - Calling create_day_off_view for step: {step_name}")
+        try:
+            # The session and step travel in the buttons' custom_ids
+            day_off_view = create_day_off_view(current_survey.session_id, step_name)
+            logger.debug(f"[{interaction.user.id}] - create_day_off_view returned: {day_off_view}")
+
+            # Send the day off view as a new message instead of editing the original
+            logger.debug(f"[{interaction.user.id}] - Attempting to send day off view via followup.send")
+            try:
+                buttons_msg = await interaction.followup.send(
+                    Strings.DAY_OFF_NEXTWEEK,
+                    view=day_off_view,
+                    ephemeral=False
+                )
+                logger.debug(f"[{interaction.user.id}] - interaction.followup.send returned message ID: {buttons_msg.id}")
+                logger.info(f"[Channel {current_survey.session_id.split('_')[0]}] - Sent day off view as new message {buttons_msg.id}.")
+                # Only the ID is kept; the buttons' handlers get the message with the click
+                current_survey.buttons_message_id = buttons_msg.id
+
+            except discord.errors.NotFound:
+                logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Webhook not found when sending day off view. Interaction might be stale.", exc_info=True)
+                # Inform the user that the interaction might be stale
+                try:
+                    await interaction.followup.send("It seems there was an issue with the interaction. Please try starting the survey again.", ephemeral=True)
+                except Exception as e_send_error:
+                    logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send stale interaction message: {e_send_error}", exc_info=True)
+            except Exception as e:
+                logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Error sending day off view as new message: {e}", exc_info=True)
+                # Attempt to send a generic error message via followup if sending failed
+                try:
+                    await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
+                except Exception as e_send_error:
+                    logger.error(f"[Channel {current_survey.session_id.split('_')[0]}] - Failed to send generic error message after day off view send failure: {e_send_error}", exc_info=True)
+
+        except Exception as e:
+            logger.error(f"[{interaction.user.id}] - Error creating day off view for step {step_name}: {e}", exc_info=True)
+            # Attempt to send a generic error message to the user
+            try:
+                await interaction.followup.send(Strings.GENERAL_ERROR, ephemeral=False)
+            except Exception as e_send_error:
+                logger.error(f"[{interaction.user.id}] - Failed to send error message after view creation failure: {e_send_error}", exc_info=True)
+
+
+    else:
+        logger.error(f"Button callback triggered for unknown survey step: {step_name}")
+        # Use send_message as this is the initial response
+        await interaction.response.send_message(Strings.GENERAL_ERROR, ephemeral=False)
+        return
+
+
 async def continue_survey(bot: commands.Bot, channel: discord.TextChannel, survey: SurveyFlow) -> None: # Added bot parameter, Type hint updated
     """Continues the survey to the next step or finishes it."""
     logger.info(f"[{survey.session_id}] - Entering continue_survey. is_done(): {survey.is_done()}, Current index: {survey.current_index}, Total steps: {len(survey.steps)}") # Added log
@@ -536,13 +499,6 @@ async def continue_survey(bot: commands.Bot, channel: discord.TextChannel, surve
         logger.info(f"[{survey.session_id}] - Survey is done, calling finish_survey.") # Added log
         await finish_survey(bot, channel, current_survey) # Pass bot instance
     else:
-        # Remove reaction from the previous message before asking the next step
-        if current_survey.current_message:
-            try:
-                await current_survey.current_message.remove_reaction("⏳", bot.user)
-            except Exception as reaction_error:
-                logger.warning(f"Could not remove ⏳ reaction from message {current_survey.current_message.id} in channel {channel.id}: {reaction_error}")
-
         next_step = current_survey.current_step()
         if next_step:
             logger.info(f"[{survey.session_id}] - Asking next step: {next_step}") # Added log
@@ -552,6 +508,22 @@ async def continue_survey(bot: commands.Bot, channel: discord.TextChannel, surve
             logger.error(f"[{survey.session_id}] - Survey not done but no next step found. Finishing survey.") # Added log
             await finish_survey(bot, channel, current_survey) # Pass bot instance
 
+def _with_todos(content: str, todos_data_str: str) -> str:
+    """Append the ToDo reminder from ``get_tasks_text`` to ``content``, within Discord's 2000 character limit."""
+    todos_data = json.loads(todos_data_str)
+    if not isinstance(todos_data, dict) or not todos_data.get('tasks_found', False):
+        return content
+    formatted_todos = todos_data.get('text', '')
+    if not formatted_todos:
+        return content
+    max_append_length = 2000 - len(content) - 2
+    if len(formatted_todos) > max_append_length:
+        truncated_length = max_append_length - len('... (truncated)')
+        if truncated_length < 0:
+            truncated_length = 0
+        formatted_todos = formatted_todos[:truncated_length] + '... (truncated)'
+    return f"{content}\n{formatted_todos}"
+
 async def finish_survey(bot: commands.Bot, channel: discord.TextChannel, survey: SurveyFlow) -> None: # Added bot parameter, Type hint updated
     """Finalizes a completed survey.
     Sends the collected results in a 'complete' status webhook to n8n
@@ -568,39 +540,42 @@ async def finish_survey(bot: commands.Bot, channel: discord.TextChannel, survey:
         if not current_survey or not current_survey.user_id or not current_survey.channel_id:
             raise ValueError("Invalid survey completion data")
 
+        notion_url = current_survey.todo_url
+        content = f"{Strings.SURVEY_COMPLETE_MESSAGE}"
+        # ToDos prefetched during the survey go straight into the first message
+        prefetched = bool(notion_url) and current_survey.todos_ready()
+        if prefetched:
+            try:
+                content = _with_todos(content, await current_survey.todos_text(0))
+                logger.info(f"[{current_survey.session_id}] - Using prefetched Notion ToDos for channel {current_survey.channel_id}.")
+            except Exception as prefetched_e:
+                logger.error(f"[{current_survey.session_id}] - Error processing prefetched Notion tasks: {prefetched_e}", exc_info=True)
+
         # Send initial completion message
-        completion_message = await channel.send(f"{Strings.SURVEY_COMPLETE_MESSAGE}")
+        completion_message = await message_queue.send(channel, content)
         logger.info(f"[{current_survey.session_id}] - Sent initial completion message (ID: {completion_message.id}) to channel {current_survey.channel_id}.")
 
-
-        notion_url = current_survey.todo_url
-        if notion_url:
-            logger.info(f"[{current_survey.session_id}] - Notion URL found: {notion_url}. Attempting to fetch ToDos for channel{current_survey.channel_id}.")
+        if notion_url and not prefetched:
+            logger.info(f"[{current_survey.session_id}] - Notion URL found: {notion_url}. Waiting for ToDos for channel{current_survey.channel_id}.")
             try:
-                notion_todos_instance = Notion_todos(notion_url, 21)
-                logger.info(f"[{current_survey.session_id}] - Calling get_tasks_text for URL: {notion_url}")
-                todos_data_str = await notion_todos_instance.get_tasks_text(user_id=current_survey.user_id)
-                todos_data = json.loads(todos_data_str)
-                if isinstance(todos_data, dict) and todos_data.get('tasks_found', False):
-                    formatted_todos = todos_data.get('text', '')
-                    if formatted_todos:
-                        max_append_length = 2000 - len(completion_message.content) - 2
-                        if len(formatted_todos) > max_append_length:
-                            truncated_length = max_append_length - len('... (truncated)')
-                            if truncated_length < 0:
-                                truncated_length = 0
-                            formatted_todos = formatted_todos[:truncated_length] + '... (truncated)'
-                        updated_content = f"{completion_message.content}\n{formatted_todos}"
-                        await completion_message.edit(content=updated_content)
+                timeout = getattr(Config, "TODO_PREFETCH_TIMEOUT", 10.0)
+                todos_data_str = await current_survey.todos_text(timeout)
+                if todos_data_str is None:
+                    logger.warning(f"[{current_survey.session_id}] - Notion ToDos not ready after {timeout}s. Keeping default completion message.")
+                else:
+                    updated_content = _with_todos(completion_message.content, todos_data_str)
+                    if updated_content != completion_message.content:
+                        await message_queue.edit(completion_message, content=updated_content)
                         logger.info(f"[{current_survey.session_id}] - Appended Notion ToDos to completion message {completion_message.id} in channel {current_survey.channel_id}.")
-                    logger.info(f"[{current_survey.session_id}] - No Notion ToDos found.")
+                    else:
+                        logger.info(f"[{current_survey.session_id}] - No Notion ToDos found.")
             except Exception as inner_notion_e:
                 logger.error(f"[{current_survey.session_id}] - Error during Notion task fetching/processing: {inner_notion_e}", exc_info=True)
                 try:
                     logger.warning(f"[{current_survey.session_id}] - Помилка при обробці завдань з Notion: {inner_notion_e}")
                 except Exception as send_error:
                     logger.error(f"Failed to send inner Notion error message: {send_error}")
-        else:
+        elif not notion_url:
             logger.warning(f"[{current_survey.session_id}] - todo_url not provided by router. Keeping default completion message.")
 
         # Log completion processing finished
@@ -612,7 +587,7 @@ async def finish_survey(bot: commands.Bot, channel: discord.TextChannel, survey:
         # Attempt to send a generic error message to the channel
         if channel:
             try:
-                await channel.send(f"<@{current_survey.user_id if current_survey else 'N/A'}> {Strings.SURVEY_FINISH_ERROR}: Invalid data.")
+                await message_queue.send(channel, f"<@{current_survey.user_id if current_survey else 'N/A'}> {Strings.SURVEY_FINISH_ERROR}: Invalid data.")
             except Exception as send_error:
                 logger.error(f"Failed to send validation error message: {send_error}")
 
@@ -621,7 +596,7 @@ async def finish_survey(bot: commands.Bot, channel: discord.TextChannel, survey:
         # Attempt to send a generic error message to the channel
         if channel:
             try:
-                await channel.send(f"<@{current_survey.user_id if current_survey else 'N/A'}> {Strings.SURVEY_FINISH_ERROR}: Unexpected error.")
+                await message_queue.send(channel, f"<@{current_survey.user_id if current_survey else 'N/A'}> {Strings.SURVEY_FINISH_ERROR}: Unexpected error.")
             except Exception as send_error:
                 logger.error(f"Failed to send unexpected error message: {send_error}")
 
@@ -0,0 +1,146 @@
+"""Route component interactions by their ``custom_id``.
+
+Survey buttons carry everything their handler needs in the custom_id,
+e.g. ``survey:workload:<session_id>:workload_today:8``. The messages are
+sent with a ``layout()`` view that discord.py doesn't keep in its view
+store, so no view objects or callbacks are held per open survey. Clicks
+reach ``ComponentRouter.dispatch`` through the bot's ``on_interaction``
+event, which matches the custom_id against the registered templates.
+The same buttons keep working after a restart.
+
+discord.py 2.4 ships the same idea as ``discord.ui.DynamicItem``; this
+tree pins 2.3, hence the small router.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Tuple
+
+import discord
+
+from config import logger, Strings
+from services import survey_manager, message_queue
+
+
+Handler = Callable[..., Awaitable[None]]
+
+
+def layout(*items: discord.ui.Item, timeout: Optional[float] = None) -> discord.ui.View:
+    """Return a view that only describes components.
+
+    discord.py stores unfinished views sent with a message and dispatches
+    clicks to their callbacks; a stopped view is sent as-is and never
+    stored, leaving the click to ``ComponentRouter``.
+    """
+    view = discord.ui.View(timeout=timeout)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
+
+
+def survey_custom_id(kind: str, session_id: str, step: str, *args: Any) -> str:
+    """Build a survey custom_id, e.g. ``survey:day:<session_id>:day_off_nextweek:0``."""
+    return ":".join(["survey", kind, str(session_id), step, *(str(a) for a in args)])
+
+
+def survey_template(kind: str, *args: str) -> str:
+    """Route template matching ``survey_custom_id(kind, ...)``; ``args`` name the extra groups."""
+    extra = "".join(f":(?P<{name}>[^:]+)" for name in args)
+    return f"survey:{kind}:(?P<session_id>[^:]+):(?P<step>[^:]+){extra}"
+
+
+async def survey_for_click(interaction: discord.Interaction, session_id: str, step: str) -> Any:
+    """Return the survey a survey button belongs to, or answer the click and return None.
+
+    The click is turned down when the survey is gone or has moved past
+    ``step`` (the button is stale) or when someone else pressed it.
+    """
+    survey = survey_manager.get_survey_by_session(session_id)
+    if survey is None or survey.current_step() != step:
+        logger.warning(f"Survey button for session {session_id}, step {step} clicked but the survey is gone or past that step")
+        await interaction.response.send_message(Strings.SURVEY_EXPIRED_OR_NOT_FOUND, ephemeral=True)
+        return None
+    if str(interaction.user.id) != str(survey.user_id):
+        logger.warning(f"User {interaction.user.id} clicked a survey button of user {survey.user_id} in channel {survey.channel_id}")
+        await interaction.response.send_message(Strings.SURVEY_NOT_FOR_YOU, ephemeral=False)
+        return None
+    if survey.channel is None:
+        survey.channel = interaction.channel # Restored after a restart
+    survey.touch()
+    return survey
+
+
+async def delete_buttons_message(state: Any, buttons_msg: Optional[discord.Message]) -> None:
+    """Delete a survey's workload / day off buttons message once its step is handled."""
+    if state.buttons_message_id == getattr(buttons_msg, "id", None):
+        state.buttons_message_id = None
+    if buttons_msg is None:
+        return
+    try:
+        await message_queue.delete(buttons_msg)
+        logger.info(f"[Channel {state.channel_id}] - Deleted buttons message {buttons_msg.id}.")
+    except discord.NotFound:
+        logger.warning(f"[Channel {state.channel_id}] - Buttons message {buttons_msg.id} already deleted.")
+    except Exception as e:
+        logger.error(f"[Channel {state.channel_id}] - Error deleting buttons message {buttons_msg.id}: {e}", exc_info=True)
+
+
+class ComponentRouter:
+    """Dispatch component clicks to handlers by custom_id template."""
+
+    def __init__(self) -> None:
+        self._routes: List[Tuple[Pattern[str], Handler]] = []
+        self.routed = 0
+        self.unmatched = 0
+
+    def route(self, template: str) -> Callable[[Handler], Handler]:
+        """Register ``handler(interaction, **groups)`` for custom_ids matching ``template``.
+
+        ``template`` is a regular expression with named groups, matched
+        against the whole custom_id.
+        """
+        pattern = re.compile(template)
+
+        def register(handler: Handler) -> Handler:
+            self._routes.append((pattern, handler))
+            return handler
+
+        return register
+
+    def match(self, custom_id: str) -> Optional[Tuple[Handler, Dict[str, str]]]:
+        for pattern, handler in self._routes:
+            found = pattern.fullmatch(custom_id)
+            if found:
+                return handler, found.groupdict()
+        return None
+
+    async def dispatch(self, interaction: discord.Interaction) -> None:
+        """``on_interaction`` listener; ignores anything it has no route for."""
+        if interaction.type != discord.InteractionType.component:
+            return
+        custom_id = (interaction.data or {}).get("custom_id", "")
+        found = self.match(custom_id)
+        if found is None:
+            self.unmatched += 1
+            return
+        handler, groups = found
+        self.routed += 1
+        try:
+            await handler(interaction, **groups)
+        except Exception as e:
+            logger.error(f"Error handling component {custom_id}: {e}", exc_info=True)
+
+    def install(self, bot: Any) -> None:
+        """Start routing ``bot``'s component interactions; safe to call twice."""
+        if not getattr(bot, "_component_router_installed", False):
+            bot.add_listener(self.dispatch, "on_interaction")
+            bot._component_router_installed = True
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"routes": len(self._routes), "routed": self.routed, "unmatched": self.unmatched}
+
+
+# Survey modules register their routes on import; installed on the bot in main.py
+component_router = ComponentRouter()
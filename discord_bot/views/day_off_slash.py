@@ -4,6 +4,7 @@ import discord # type: ignore
 from typing import Optional, List
 import datetime
 from config import ViewType, logger, constants, Strings
+from services import rest_calls
 import asyncio
 
 class DayOffButton_slash(discord.ui.Button):
@@ -18,23 +19,8 @@ class DayOffButton_slash(discord.ui.Button):
         
     async def callback(self, interaction: discord.Interaction):
         from config import Strings # Import Strings locally
-        # First, acknowledge the interaction to prevent timeout
-        logger.debug(f"[Channel {interaction.channel.id}] - Attempting to defer interaction response for DayOffButton_slash")
-        if not interaction.response.is_done():
-            await interaction.response.defer(ephemeral=False)
-        logger.debug(f"[Channel {interaction.channel.id}] - Interaction response deferred for DayOffButton_slash")
-        
-        # Get the original message
-        message = interaction.message
-        if message:
-            # Add processing reaction
-            try:
-                logger.debug(f"[Channel {interaction.channel.id}] - Attempting to add processing reaction to message {message.id}")
-                await message.add_reaction(Strings.PROCESSING)
-                logger.debug(f"[Channel {interaction.channel.id}] - Added processing reaction to message {message.id}")
-            except Exception as e:
-                logger.error(f"[Channel {interaction.channel.id}] - Error adding processing reaction to message {message.id}: {e}")
-            
+        rest_calls.enter(f"command:{self.cmd_or_step}")
+
         try:
             # Toggle selection
             self.is_selected = not self.is_selected
@@ -53,23 +39,16 @@ class DayOffButton_slash(discord.ui.Button):
                         view.selected_days.remove(self.label)
                         logger.debug(f"[Channel {interaction.channel.id}] - Removed '{self.label}' from selected_days. Current selected_days: {view.selected_days}")
             
-            # Update the message with the new button states
+            # Acknowledge the click and show the new button states in a single call
             logger.debug(f"[Channel {interaction.channel.id}] - Attempting to edit message {interaction.message.id} with updated view")
-            await interaction.message.edit(view=self.view)
+            await interaction.response.edit_message(view=self.view)
             logger.debug(f"[Channel {interaction.channel.id}] - Message {interaction.message.id} edited with updated view")
-            
-            # Show success reaction for survey steps
-            if message:
-                logger.debug(f"[Channel {interaction.channel.id}] - Attempting to remove processing reaction from message {message.id}")
-                await message.remove_reaction(Strings.PROCESSING, interaction.client.user)
-                logger.debug(f"[Channel {interaction.channel.id}] - Removed processing reaction from message {message.id}")
-                
+
         except Exception as e:
             logger.error(f"Error in day off button callback: {e}")
             logger.debug(f"Error details - custom_id: {self.custom_id}, interaction: {interaction.data if interaction else None}")
+            message = interaction.message
             if message:
-                await message.add_reaction(Strings.ERROR)
-                await message.remove_reaction(Strings.PROCESSING, interaction.client.user)
                 error_msg = Strings.DAYOFF_ERROR.format(
                     days=self.label,
                     error=Strings.UNEXPECTED_ERROR
@@ -90,30 +69,12 @@ class ConfirmButton_slash(discord.ui.Button):
         from services import webhook_service
         view = self.view
         if isinstance(view, DayOffView_slash):
-            # First, acknowledge the interaction to prevent timeout
-            logger.debug(f"[Channel {interaction.channel.id}]  - Attempting to defer interaction response for ConfirmButton_slash")
+            rest_calls.enter(f"command:{view.cmd_or_step}")
+            # Acknowledge the click, hide the buttons and show progress in one call
+            # instead of a defer plus a reaction on the command message
             if not interaction.response.is_done():
-                await interaction.response.defer(ephemeral=False)
-            logger.debug(f"[Channel {interaction.channel.id}] - Interaction response deferred for ConfirmButton_slash")
-            
-            # Delete buttons message
-            if view.buttons_msg:
-                try:
-                    logger.debug(f"[Channel {interaction.channel.id}] - Attempting to delete buttons message {getattr(view.buttons_msg, 'id', 'N/A')}")
-                    await view.buttons_msg.delete()
-                    logger.debug(f"[Channel {interaction.channel.id}] - Deleted buttons message {getattr(view.buttons_msg, 'id', 'N/A')}")
-                    view.stop() # Stop the view since buttons are gone
-                except Exception as e:
-                    logger.error(f"[Channel {interaction.channel.id}] - Error deleting buttons message {view.buttons_msg.id}: {e}")
-
-            # Add processing reaction to command message
-            if view.command_msg:
-                try:
-                    logger.debug(f"[Channel {interaction.channel.id}] - Attempting to add processing reaction to message {view.command_msg.id}")
-                    await view.command_msg.add_reaction(Strings.PROCESSING)
-                    logger.debug(f"[Channel {interaction.channel.id}] - Added processing reaction to command message {view.command_msg.id}")
-                except Exception as e:
-                    logger.error(f"[Channel {interaction.channel.id}] - Error adding processing reaction to command message {view.command_msg.id}: {e}")
+                await interaction.response.edit_message(content=f"{self.label} {Strings.PROCESSING}", view=None)
+            logger.debug(f"[Channel {interaction.channel.id}] - Interaction acknowledged for ConfirmButton_slash")
 
             try:
                 # Convert selected days to dates
@@ -144,7 +105,6 @@ class ConfirmButton_slash(discord.ui.Button):
                 # Update command message based on webhook response
                 if view.command_msg:
                     try:
-                        await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                         if success and data and "output" in data:
                             logger.debug(f"[Channel {interaction.channel.id}] - Attempting to edit command message {getattr(view.command_msg, 'id', 'N/A')} with output: {data['output']}")
                             output_content = data["output"]
@@ -166,7 +126,6 @@ class ConfirmButton_slash(discord.ui.Button):
                 logger.error(f"Error in confirm button: {e}")
                 if view.command_msg:
                     try:
-                        await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                         error_msg = Strings.DAYOFF_ERROR.format(
                             days=', '.join(view.selected_days),
                             error=Strings.UNEXPECTED_ERROR
@@ -175,6 +134,9 @@ class ConfirmButton_slash(discord.ui.Button):
                         await view.command_msg.add_reaction(Strings.ERROR)
                     except Exception as edit_error:
                         logger.error(f"[Channel {interaction.channel.id}] - Error editing command message {view.command_msg.id} after exception: {edit_error}")
+            finally:
+                await view.delete_buttons(interaction)
+
 class DeclineButton_slash(discord.ui.Button):
     def __init__(self):
         super().__init__(
@@ -192,32 +154,15 @@ class DeclineButton_slash(discord.ui.Button):
             logger.debug(f"Decline button clicked by {interaction.user}")
             logger.debug(f"View has_survey: {view.has_survey}, cmd_or_step: {view.cmd_or_step}")
             
-            # Immediately respond to interaction
+            rest_calls.enter(f"command:{view.cmd_or_step}")
+            # Acknowledge the click, hide the buttons and show progress in one call
+            # instead of a defer plus a reaction on the command message
             try:
-                logger.debug(f"[Channel {interaction.channel.id}] - Attempting to defer interaction response for DeclineButton_slash")
-                await interaction.response.defer(ephemeral=False)
-                logger.debug(f"[Channel {interaction.channel.id}] - Interaction deferred for DeclineButton_slash")
+                await interaction.response.edit_message(content=f"{self.label} {Strings.PROCESSING}", view=None)
+                logger.debug(f"[Channel {interaction.channel.id}] - Interaction acknowledged for DeclineButton_slash")
             except Exception as e:
-                logger.error(f"Failed to defer interaction: {e}")
+                logger.error(f"Failed to acknowledge interaction: {e}")
                 return
-            # Delete buttons message
-            if view.buttons_msg:
-                try:
-                    logger.debug(f"[Channel {interaction.channel.id}] - Attempting to delete buttons message {getattr(view.buttons_msg, 'id', 'N/A')}")
-                    await view.buttons_msg.delete()
-                    logger.debug(f"[Channel {interaction.channel.id}] - Deleted buttons message {getattr(view.buttons_msg, 'id', 'N/A')}")
-                    view.stop() # Stop the view since buttons are gone
-                except Exception as e:
-                    logger.error(f"[Channel {interaction.channel.id}] - Error deleting buttons message {view.buttons_msg.id}: {e}")
-
-            # Add processing reaction to command message
-            if view.command_msg:
-                try:
-                    logger.debug(f"[Channel {interaction.channel.id}] - Attempting to add processing reaction to message {view.command_msg.id}")
-                    await view.command_msg.add_reaction(Strings.PROCESSING)
-                    logger.debug(f"[Channel {interaction.channel.id}] - Added processing reaction to command message {view.command_msg.id}")
-                except Exception as e:
-                    logger.error(f"[Channel {interaction.channel.id}] - Error adding processing reaction to command message {view.command_msg.id}: {e}")
 
             try:
                 logger.debug(f"[Channel {interaction.channel.id}] - Attempting to send webhook for declined days (regular command)")
@@ -234,7 +179,6 @@ class DeclineButton_slash(discord.ui.Button):
                 # Update command message based on webhook response
                 if view.command_msg:
                     try:
-                        await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                         if success and data and "output" in data:
                             logger.debug(f"[Channel {interaction.channel.id}] - Attempting to edit command message {getattr(view.command_msg, 'id', 'N/A')} with output: {data['output']}")
                             await view.command_msg.edit(content=data["output"])
@@ -253,7 +197,6 @@ class DeclineButton_slash(discord.ui.Button):
                 logger.error(f"[Channel {interaction.channel.id}] - Error in decline button: {e}")
                 if view.command_msg:
                     try:
-                        await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                         error_msg = Strings.DAYOFF_ERROR.format(
                             days="Відмова від вихідних",
                             error=Strings.UNEXPECTED_ERROR
@@ -262,7 +205,8 @@ class DeclineButton_slash(discord.ui.Button):
                         await view.command_msg.add_reaction(Strings.ERROR)
                     except Exception as edit_error:
                         logger.error(f"[Channel {interaction.channel.id}] - Error editing command message {view.command_msg.id} after exception: {edit_error}")
-                    logger.debug(f"[Channel {interaction.channel.id}] - Deleted buttons message {getattr(view.buttons_msg, 'id', 'N/A')}")
+            finally:
+                await view.delete_buttons(interaction)
 
 class DayOffView_slash(discord.ui.View):
     def __init__(self, cmd_or_step: str, user_id: str, has_survey: bool = False):
@@ -277,6 +221,17 @@ class DayOffView_slash(discord.ui.View):
         self.command_msg: Optional[discord.Message] = None  # Reference to the command message
         self.buttons_msg: Optional[discord.Message] = None  # Reference to the buttons message
 
+    async def delete_buttons(self, interaction: discord.Interaction) -> None:
+        """Delete the buttons message once the command is done and stop the view."""
+        if self.buttons_msg:
+            try:
+                await self.buttons_msg.delete()
+                logger.debug(f"[Channel {interaction.channel.id}] - Deleted buttons message {getattr(self.buttons_msg, 'id', 'N/A')}")
+            except Exception as e:
+                logger.error(f"[Channel {interaction.channel.id}] - Error deleting buttons message {getattr(self.buttons_msg, 'id', 'N/A')}: {e}")
+            self.buttons_msg = None
+        self.stop() # Stop the view since buttons are gone
+
     def get_date_for_day(self, day: str) -> Optional[datetime.datetime]:
         """Get the date for a given weekday name in Kyiv time."""
         # Get current date in Kyiv time
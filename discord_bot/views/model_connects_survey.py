@@ -1,6 +1,6 @@
 import discord
 from config import logger, Strings
-from services import survey_manager
+from services import survey_manager, rest_calls, message_queue
 from services.survey import SurveyFlow
 from services.webhook import WebhookService # Import WebhookService type hint
 from discord.ext import commands # Import commands for bot type hint
@@ -59,6 +59,7 @@ class ConnectsModal(discord.ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         """Handles the modal submission for the connects step."""
+        rest_calls.enter(f"survey:{self.step_name}")
         logger.info("Starting ConnectsModal submission handling")
 
         async def send_error_response(interaction: discord.Interaction, message: str):
@@ -130,67 +131,68 @@ class ConnectsModal(discord.ui.Modal):
                 await send_error_response(interaction, Strings.GENERAL_ERROR)
                 return
 
-            # Send step webhook for just this step
+            current_survey.begin_interaction() # Hold survey continuation until this modal is done
             try:
-                result_payload = {
-                    "stepName": self.step_name,
-                    "value": str(connects)
-                }
-                logger.info(f"Sending survey step webhook for step: {{self.step_name}} with value: {{connects}}")
-                success, response = await self.webhook_service_instance.send_webhook( # Use passed instance
-                    interaction, # Pass interaction directly
-                    command="survey", # Use command="survey"
-                    status="step", # Use status="step"
-                    result=result_payload # Pass result_payload dictionary
-                )
-                logger.info(f"Step webhook response for channel {{current_survey.channel_id}}: success={{success}}, response={{response}}")
-                # Show n8n output to user if present
-                # Update command message with n8n output instead of deleting it
-                if success and response and "output" in response:
-                    if current_survey.current_message:
-                        try:
-                            logger.debug(f"Attempting to remove processing reaction from command message {{current_survey.current_message.id}}")
-                            await current_survey.current_message.remove_reaction("⏳", self.bot_instance.user) # Use passed instance
-                            output_content = response.get("output", f"Дякую! Кількість коннектів {connects} записано.") # Default success message
-                            logger.debug(f"Attempting to edit command message {{current_survey.current_message.id}} with output: {{output_content}}")
-                            await current_survey.current_message.edit(content=output_content, view=None, attachments=[]) # Update content and remove view/attachments
-                            logger.info(f"Updated command message {{current_survey.current_message.id}} with response")
-                        except Exception as edit_error:
-                            logger.error(f"Error editing command message {{getattr(current_survey.current_message, 'id', 'N/A')}}: {{edit_error}}", exc_info=True)
-                elif not success:
-                    logger.error(f"Failed to send webhook for survey step: {{self.step_name}}")
-                    if current_survey.current_message:
-                        try:
-                            await current_survey.current_message.remove_reaction("⏳", self.bot_instance.user) # Use passed instance
-                            error_msg = Strings.CONNECTS_ERROR.format( # Assuming a CONNECTS_ERROR string exists
-                                connects=connects,
-                                error=Strings.GENERAL_ERROR
-                            )
-                            await current_survey.current_message.edit(content=error_msg)
-                            await current_survey.current_message.add_reaction(Strings.ERROR)
-                        except Exception as edit_error:
-                            logger.error(f"Error editing command message on webhook failure {{getattr(current_survey.current_message, 'id', 'N/A')}}: {{edit_error}}", exc_info=True)
-
-            except Exception as e:
-                logger.error(f"Error sending step webhook or handling response: {{e}}", exc_info=True)
-                await send_error_response(interaction, Strings.GENERAL_ERROR)
-                return # Exit if step webhook fails
-
-            logger.info(f"Advancing survey for channel {{current_survey.channel_id}}")
-            # Advance survey state
-            try:
-                current_survey.next_step() # Advance the state
-                # logger.debug(f"Survey results after connects: {{current_survey.results}}")
-                # logger.debug(f"Survey steps: {{getattr(current_survey, 'steps', None)}}")
-                # logger.debug(f"Survey current_step: {{current_survey.current_step() if hasattr(current_survey, 'current_step') else None}}")
-
-                # Call continue_survey unconditionally, it will handle is_done() check
-                from discord_bot.commands.survey import continue_survey # Keep this import for now, will remove in next step
-                await continue_survey(self.bot_instance, interaction.channel, current_survey) # Call continue_survey after sending webhook, pass bot instance
-
-            except Exception as e:
-                logger.error(f"Error advancing survey: {{e}}")
-                await send_error_response(interaction, Strings.GENERAL_ERROR)
+                # Send step webhook for just this step
+                try:
+                    result_payload = {
+                        "stepName": self.step_name,
+                        "value": str(connects)
+                    }
+                    logger.info(f"Sending survey step webhook for step: {{self.step_name}} with value: {{connects}}")
+                    success, response = await self.webhook_service_instance.send_webhook( # Use passed instance
+                        interaction, # Pass interaction directly
+                        command="survey", # Use command="survey"
+                        status="step", # Use status="step"
+                        result=result_payload # Pass result_payload dictionary
+                    )
+                    logger.info(f"Step webhook response for channel {{current_survey.channel_id}}: success={{success}}, response={{response}}")
+                    # Show n8n output to user if present
+                    # Update command message with n8n output instead of deleting it
+                    if success and response and "output" in response:
+                        if current_survey.current_message:
+                            try:
+                                output_content = response.get("output", f"Дякую! Кількість коннектів {connects} записано.") # Default success message
+                                logger.debug(f"Attempting to edit command message {{current_survey.current_message.id}} with output: {{output_content}}")
+                                await message_queue.edit(current_survey.current_message, content=output_content, view=None, attachments=[]) # Update content and remove view/attachments
+                                logger.info(f"Updated command message {{current_survey.current_message.id}} with response")
+                            except Exception as edit_error:
+                                logger.error(f"Error editing command message {{getattr(current_survey.current_message, 'id', 'N/A')}}: {{edit_error}}", exc_info=True)
+                    elif not success:
+                        logger.error(f"Failed to send webhook for survey step: {{self.step_name}}")
+                        if current_survey.current_message:
+                            try:
+                                error_msg = Strings.CONNECTS_ERROR.format( # Assuming a CONNECTS_ERROR string exists
+                                    connects=connects,
+                                    error=Strings.GENERAL_ERROR
+                                )
+                                await message_queue.edit(current_survey.current_message, content=error_msg)
+                                await message_queue.react(current_survey.current_message, Strings.ERROR)
+                            except Exception as edit_error:
+                                logger.error(f"Error editing command message on webhook failure {{getattr(current_survey.current_message, 'id', 'N/A')}}: {{edit_error}}", exc_info=True)
+
+                except Exception as e:
+                    logger.error(f"Error sending step webhook or handling response: {{e}}", exc_info=True)
+                    await send_error_response(interaction, Strings.GENERAL_ERROR)
+                    return # Exit if step webhook fails
+
+                logger.info(f"Advancing survey for channel {{current_survey.channel_id}}")
+                # Advance survey state
+                try:
+                    current_survey.next_step() # Advance the state
+                    # logger.debug(f"Survey results after connects: {{current_survey.results}}")
+                    # logger.debug(f"Survey steps: {{getattr(current_survey, 'steps', None)}}")
+                    # logger.debug(f"Survey current_step: {{current_survey.current_step() if hasattr(current_survey, 'current_step') else None}}")
+
+                    # Call continue_survey unconditionally, it will handle is_done() check
+                    from discord_bot.commands.survey import continue_survey # Keep this import for now, will remove in next step
+                    await continue_survey(self.bot_instance, interaction.channel, current_survey) # Call continue_survey after sending webhook, pass bot instance
+
+                except Exception as e:
+                    logger.error(f"Error advancing survey: {{e}}")
+                    await send_error_response(interaction, Strings.GENERAL_ERROR)
+            finally:
+                current_survey.end_interaction()
 
         except Exception as e:
             logger.error(f"Unexpected error in connects modal submission: {{e}}", exc_info=True)
@@ -1,7 +1,7 @@
 import discord
 from typing import Optional
 from config import logger, Strings, constants
-from services import webhook_service
+from services import webhook_service, rest_calls
 
 class WorkloadView_slash(discord.ui.View):
     """View for workload selection - only used for non-survey commands"""
@@ -47,6 +47,7 @@ class WorkloadButton_slash(discord.ui.Button):
         self.cmd_or_step = cmd_or_step
 
     async def callback(self, interaction: discord.Interaction):
+        rest_calls.enter(f"command:{self.cmd_or_step}")
         logger.debug(f"[Channel {interaction.channel.id}] WorkloadButton_slash.callback entered. Interaction ID: {interaction.id}, Custom ID: {self.custom_id}")
         logger.debug(f"[Channel {interaction.channel.id}] Button callback for step: {self.cmd_or_step}, interaction.response.is_done(): {interaction.response.is_done()}")
         from config import Strings
@@ -99,13 +100,13 @@ class WorkloadButton_slash(discord.ui.Button):
 
             if isinstance(view, WorkloadView_slash):
                 logger.info(f"[Channel {interaction.channel.id}] Workload button clicked: {self.label} by user {view.user_id} for step {view.cmd_or_step}")
-                if view.command_msg:
+                if not interaction.response.is_done():
                     try:
-                        logger.debug(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Attempting to add processing reaction to command message {view.command_msg.id}")
-                        await view.command_msg.add_reaction(Strings.PROCESSING)
-                        logger.debug(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Added processing reaction to command message {view.command_msg.id}")
+                        # Acknowledge the click, hide the buttons and show progress in one call
+                        # instead of adding and later removing a reaction on the command message
+                        await interaction.response.edit_message(content=f"{self.label} {Strings.PROCESSING}", view=None)
                     except Exception as e:
-                        logger.error(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Error adding processing reaction to command message {getattr(view.command_msg, 'id', 'N/A')}: {e}", exc_info=True)
+                        logger.error(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Error acknowledging workload selection: {e}", exc_info=True)
 
             try:
                 if self.label == "Нічого немає":
@@ -128,19 +129,8 @@ class WorkloadButton_slash(discord.ui.Button):
                      await interaction.followup.send("An unexpected error occurred.", ephemeral=True)
                 return
 
-            if view.buttons_msg:
-                try:
-                    await view.buttons_msg.delete()
-                    logger.info(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Successfully deleted buttons message ID: {view.buttons_msg.id}")
-                    view.buttons_msg = None
-                    view.stop()
-                except discord.NotFound:
-                    logger.warning(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Buttons message {getattr(view.buttons_msg, 'id', 'N/A')} already deleted or not found.")
-                    view.buttons_msg = None
-                except Exception as delete_error:
-                    logger.error(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - Error deleting buttons message {getattr(view.buttons_msg, 'id', 'N/A')}: {delete_error}", exc_info=True)
-            else:
-                logger.warning(f"[Channel {getattr(interaction.channel, 'id', 'N/A')}] - view.buttons_msg is None or False, cannot delete.")
+            # The buttons message shows progress until the command is done; it is
+            # deleted in the finally block below
 
             logger.info(f"[Channel {interaction.channel.id}] [{view.user_id}] - Processing as regular command: {view.cmd_or_step}")
             webhook_payload = {
@@ -161,7 +151,6 @@ class WorkloadButton_slash(discord.ui.Button):
             if success and data and "output" in data:
                 if view.command_msg:
                     try:
-                        await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                         output_content = data.get("output", f"Дякую! Робоче навантаження {value} годин записано.") if data else f"Дякую! Робоче навантаження {value} годин записано."
                         await view.command_msg.edit(content=output_content, view=None, attachments=[])
                         logger.info(f"[Channel {interaction.channel.id}] [{view.user_id}] - Updated command message with success: {output_content}")
@@ -170,7 +159,6 @@ class WorkloadButton_slash(discord.ui.Button):
             else:
                 logger.error(f"Failed to send webhook for command: {view.cmd_or_step}")
                 if view.command_msg:
-                    await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                     error_msg = Strings.WORKLOAD_ERROR.format(
                         hours=value,
                         error=Strings.GENERAL_ERROR
@@ -181,7 +169,6 @@ class WorkloadButton_slash(discord.ui.Button):
             session_id_for_log = getattr(view, 'session_id', 'N/A').split('_')[0] if view and hasattr(view, 'session_id') else 'N/A'
             logger.error(f"[Channel {interaction.channel.id}] [Session {session_id_for_log}] - Error in workload button callback: {e}", exc_info=True)
             if view and view.command_msg:
-                await view.command_msg.remove_reaction(Strings.PROCESSING, interaction.client.user)
                 value = 0 if self.label == "Нічого немає" else self.label
                 error_msg = Strings.WORKLOAD_ERROR.format(
                     hours=value,
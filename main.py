@@ -2,6 +2,18 @@ import asyncio
 from config import Config, logger
 from web import create_and_start_server
 from bot import bot # Import the bot instance from bot.py
+from services.team_directory import team_directory
+from services.http_client import http_client
+from services.survey_steps_db import init_steps_db, close_steps_db
+from services.survey_steps_migrations import migrate
+from services.survey import survey_manager
+from services.survey_store import DatabaseSurveyStore
+from services.outbox import outbox, DatabaseOutboxStore
+from services.channel_resolver import channel_resolver
+from services.rest_calls import rest_calls
+from services.message_queue import message_queue
+from discord_bot.views.components import component_router
+from discord_bot.commands.survey import sweep_survey_timeouts
 
 async def main():
     """
@@ -16,18 +28,63 @@ async def main():
         return
     
     # Bot instance is created in bot.py and imported
+
+    # Open the shared HTTP pool used by all connectors
+    await http_client.start()
+
+    # Open the shared survey steps database pool used by all handlers
+    if Config.DATABASE_URL:
+        try:
+            steps_db = await init_steps_db(
+                Config.DATABASE_URL,
+                min_size=Config.DB_POOL_MIN_SIZE,
+                max_size=Config.DB_POOL_MAX_SIZE,
+                acquire_timeout=Config.DB_POOL_ACQUIRE_TIMEOUT,
+            )
+            version = await migrate(steps_db)
+            logger.info(f"Survey steps schema at version {version}")
+            # Checkpoint in-flight surveys and restore the ones a restart interrupted
+            survey_manager.set_store(DatabaseSurveyStore(steps_db))
+            await survey_manager.rehydrate(max_age=Config.SESSION_TTL)
+            # Deliver queued Notion / connects writes in the background;
+            # without a database handlers keep writing inline
+            outbox.set_store(DatabaseOutboxStore(steps_db))
+            await outbox.start(workers=Config.OUTBOX_WORKERS)
+        except Exception as e:
+            logger.error(f"Error connecting survey steps database: {e}")
+
+    # Load the Team Directory index and keep it refreshed in the background
+    await team_directory.start()
     
     # Start web server
     server_task = asyncio.create_task(create_and_start_server(bot))
     
+    # Count Discord REST calls per command and survey step
+    rest_calls.install(bot)
+
+    # Survey buttons are routed by custom_id, so they survive restarts;
+    # one loop closes the surveys nobody answered
+    component_router.install(bot)
+    timeout_task = asyncio.create_task(sweep_survey_timeouts(bot))
+
     # Start bot
     try:
         await bot.start(Config.DISCORD_TOKEN)
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
     finally:
+        timeout_task.cancel()
         # Wait for server task to complete
         await server_task
+        await team_directory.stop()
+        await outbox.stop()
+        logger.info(f"Channel lookups: {channel_resolver.metrics()}")
+        logger.info(f"Discord REST calls: {rest_calls.metrics()}")
+        logger.info(f"Outbound message queue: {message_queue.metrics()}")
+        logger.info(f"Component routes: {component_router.metrics()}")
+        await http_client.close()
+        await survey_manager.flush()
+        await close_steps_db()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main()) 
@@ -3,6 +3,12 @@ from services.survey import survey_manager, SurveyFlow
 from services.webhook import webhook_service, WebhookError
 from services.notion_connector import NotionConnector, NotionError
 from services.calendar_connector import CalendarConnector, CalendarError
+from services.team_directory import team_directory, TeamDirectoryIndex
+from services.http_client import http_client, HttpClient
+from services.outbox import outbox, Outbox
+from services.channel_resolver import channel_resolver, ChannelResolver
+from services.rest_calls import rest_calls, RestCallCounter
+from services.message_queue import message_queue, OutboundQueue
 try:  # pragma: no cover - optional dependency for tests
     from services.survey_steps_db import SurveyStepsDB
 except Exception:  # pragma: no cover - missing databases package
@@ -18,5 +24,17 @@ __all__ = [
     'NotionError',
     'CalendarConnector',
     'CalendarError',
+    'team_directory',
+    'TeamDirectoryIndex',
+    'http_client',
+    'HttpClient',
+    'outbox',
+    'Outbox',
+    'channel_resolver',
+    'ChannelResolver',
+    'rest_calls',
+    'RestCallCounter',
+    'message_queue',
+    'OutboundQueue',
     'SurveyStepsDB',
 ]
@@ -27,17 +27,33 @@ read from ``config.Config`` or environment variables.
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import os
-from typing import Any, Dict, Optional
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import aiohttp
 import asyncio
+from cachetools import TTLCache
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 
 from config import Config
 from services.logging_utils import get_logger
+from services.http_client import http_client
+
+
+# Refresh this many seconds before the token expires (tokens last ~1h)
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_TOKEN_LIFETIME = 3600
+# Events created at once by ``create_day_off_events``
+DEFAULT_EVENT_CONCURRENCY = 4
+# How long a created event ID short-circuits repeat submissions; only
+# covers double clicks and retries, the 409 path handles anything later
+DEFAULT_DEDUP_TTL = 60
+DEDUP_MAX_EVENTS = 4096
 
 
 class CalendarError(Exception):
@@ -66,12 +82,149 @@ def _get_credentials() -> service_account.Credentials:
     return _credentials
 
 
-def base_headers() -> Dict[str, str]:
-    """Return headers required for all Calendar API requests."""
+def _refresh_token() -> Tuple[str, float]:
+    """Refresh the service account token; blocking, run in a worker thread.
+
+    Returns the access token and the number of seconds until it expires.
+    """
 
     creds = _get_credentials()
     creds.refresh(Request())
-    return {"Authorization": f"Bearer {creds.token}"}
+    expiry = getattr(creds, "expiry", None)
+    if expiry is not None:
+        # google-auth keeps ``expiry`` as a naive UTC datetime
+        lifetime = (expiry - datetime.utcnow()).total_seconds()
+    else:
+        lifetime = DEFAULT_TOKEN_LIFETIME
+    return creds.token, lifetime
+
+
+class AccessTokenCache:
+    """Cache the Calendar access token until shortly before it expires.
+
+    ``creds.refresh`` does a synchronous HTTP round trip and RSA signing, so it
+    runs in a worker thread. Concurrent callers share one in-flight refresh.
+    """
+
+    def __init__(self) -> None:
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+        self.refreshes = 0
+
+    def _valid(self) -> bool:
+        margin = getattr(Config, "CALENDAR_TOKEN_REFRESH_MARGIN", DEFAULT_REFRESH_MARGIN)
+        return self._token is not None and time.monotonic() < self._expires_at - margin
+
+    async def _do_refresh(self) -> str:
+        log = get_logger("calendar.token")
+        started = time.monotonic()
+        token, lifetime = await asyncio.to_thread(_refresh_token)
+        self._token = token
+        self._expires_at = started + lifetime
+        self.refreshes += 1
+        log.debug("token refreshed", extra={"expires_in": int(lifetime)})
+        return token
+
+    async def get_token(self) -> str:
+        """Return a valid access token, refreshing it if needed."""
+        if self._valid():
+            return self._token  # type: ignore[return-value]
+        loop = asyncio.get_running_loop()
+        if self._refresh is None or self._refresh.done() or self._refresh.get_loop() is not loop:
+            self._refresh = asyncio.ensure_future(self._do_refresh())
+        # Shield so a cancelled caller doesn't abort the shared refresh
+        return await asyncio.shield(self._refresh)
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after a 401 response."""
+        self._token = None
+        self._expires_at = 0.0
+
+
+_token_cache = AccessTokenCache()
+
+
+def event_id(kind: str, user_name: str, start: str, end: str) -> str:
+    """Return the deterministic Calendar event ID for an event.
+
+    The same author, event type and date range always map to the same ID,
+    so a repeated insert is answered with 409 instead of a duplicate. Hex
+    digits are valid in Google's base32hex event IDs.
+    """
+
+    return hashlib.sha1(f"{kind}|{user_name}|{start}|{end}".encode("utf-8")).hexdigest()
+
+
+class EventDedupCache:
+    """Remember created event IDs so repeat submissions skip the API.
+
+    Concurrent submissions of the same event share one in-flight request.
+    Only successful creations are cached, and only for a resubmission
+    window: an event deleted in the calendar since must be created again,
+    which the deterministic ID and the 409 check take care of.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_DEDUP_TTL, maxsize: int = DEDUP_MAX_EVENTS) -> None:
+        self._created: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+
+    async def run(self, key: Tuple[str, str], create: Any) -> Dict[str, Any]:
+        """Return the cached result for ``key`` or await ``create()`` once."""
+        cached = self._created.get(key)
+        if cached is not None:
+            self.hits += 1
+            return dict(cached, duplicate=True)
+        pending = self._pending.get(key)
+        if pending is not None and not pending.done():
+            self.hits += 1
+            return dict(await asyncio.shield(pending), duplicate=True)
+        future = asyncio.ensure_future(create())
+        self._pending[key] = future
+        future.add_done_callback(lambda done: self._settle(key, done))
+        # Shield so a cancelled caller doesn't abort a shared request
+        return await asyncio.shield(future)
+
+    def _settle(self, key: Tuple[str, str], future: asyncio.Future) -> None:
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result().get("status") == "ok":
+            self._created[key] = future.result()
+
+    def clear(self) -> None:
+        self._created.clear()
+
+
+_dedup = EventDedupCache(ttl=getattr(Config, "CALENDAR_DEDUP_TTL", DEFAULT_DEDUP_TTL))
+
+
+def merge_dates(dates: Iterable[str]) -> List[Tuple[str, str]]:
+    """Group ISO dates into sorted ``(first, last)`` runs of consecutive days."""
+
+    days = sorted({date.fromisoformat(d) for d in dates})
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return [(first.isoformat(), last.isoformat()) for first, last in runs]
+
+
+def _days(first: str, last: str) -> List[str]:
+    start = date.fromisoformat(first)
+    count = (date.fromisoformat(last) - start).days + 1
+    return [(start + timedelta(days=i)).isoformat() for i in range(count)]
+
+
+async def base_headers() -> Dict[str, str]:
+    """Return headers required for all Calendar API requests."""
+
+    token = await _token_cache.get_token()
+    return {"Authorization": f"Bearer {token}"}
 
 
 class CalendarConnector:
@@ -81,11 +234,13 @@ class CalendarConnector:
         self.session = session
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or getattr(self.session, "closed", False):
-            self.session = aiohttp.ClientSession()
-        return self.session
+        # An explicitly passed session wins; otherwise use the shared pool
+        if self.session is not None and not getattr(self.session, "closed", False):
+            return self.session
+        return await http_client.get_session()
 
     async def close(self) -> None:
+        # The shared pool is closed by main.py; only close our own session
         if self.session and not getattr(self.session, "closed", False):
             await self.session.close()
 
@@ -95,21 +250,42 @@ class CalendarConnector:
         max_retries: int = 3,
         retry_delay: int = 20,
     ) -> Dict[str, Any]:
-        log = get_logger("calendar.create_event")
-        log.debug("request", extra={"payload": payload})
-        session = await self._get_session()
         calendar_id = Config.CALENDAR_ID
         if not calendar_id:
             raise CalendarError("CALENDAR_ID is not configured")
+        if not payload.get("id"):
+            return await self._insert_event(calendar_id, payload, max_retries, retry_delay)
+        # Repeat submissions of a known event never reach the API
+        return await _dedup.run(
+            (calendar_id, payload["id"]),
+            lambda: self._insert_event(calendar_id, payload, max_retries, retry_delay),
+        )
+
+    async def _insert_event(
+        self,
+        calendar_id: str,
+        payload: Dict[str, Any],
+        max_retries: int,
+        retry_delay: int,
+    ) -> Dict[str, Any]:
+        log = get_logger("calendar.create_event")
+        log.debug("request", extra={"payload": payload})
+        session = await self._get_session()
         url = f"https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events"
         last_error: Any = None
         for attempt in range(max_retries):
             try:
-                async with session.post(url, headers=base_headers(), json=payload) as resp:
+                headers = await base_headers()
+                async with session.post(url, headers=headers, json=payload) as resp:
                     data = await resp.json()
                     if resp.status == 200:
                         log.debug("response", extra={"status": resp.status})
                         return {"status": "ok", "event_id": data.get("id", "")}
+                    if resp.status == 409 and payload.get("id"):
+                        # An earlier attempt already created this event
+                        return await self._existing_event(session, url, headers, payload)
+                    if resp.status == 401:
+                        _token_cache.invalidate()
                     last_error = data.get("error", "calendar unreachable")
             except Exception as e:  # pragma: no cover - network errors
                 last_error = str(e)
@@ -118,22 +294,98 @@ class CalendarConnector:
         log.exception("failed")
         return {"status": "error", "message": last_error}
 
-    async def create_day_off_event(self, user_name: str, date: str) -> Dict[str, Any]:
-        """Create an all-day day-off event for the given user."""
+    async def _existing_event(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Resolve a 409 for ``payload["id"]``.
+
+        A deleted event keeps its ID, so a cancelled one is restored with the
+        new payload instead of being reported as created.
+        """
+
+        log = get_logger("calendar.create_event")
+        event_url = f"{url}/{payload['id']}"
+        async with session.get(event_url, headers=headers) as resp:
+            data = await resp.json()
+            if resp.status != 200:
+                return {"status": "error", "message": data.get("error", "calendar unreachable")}
+        if data.get("status") == "cancelled":
+            async with session.put(
+                event_url, headers=headers, json={**payload, "status": "confirmed"}
+            ) as resp:
+                restored = await resp.json()
+                if resp.status != 200:
+                    return {"status": "error", "message": restored.get("error", "calendar unreachable")}
+            log.info("cancelled event restored", extra={"event_id": payload["id"]})
+            return {"status": "ok", "event_id": payload["id"]}
+        log.info("event already exists", extra={"event_id": payload["id"]})
+        return {"status": "ok", "event_id": payload["id"], "duplicate": True}
 
+    async def create_day_off_event(
+        self, user_name: str, date: str, end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create an all-day day-off event for the given user.
+
+        ``end_date`` (inclusive) turns it into one multi-day event; Google
+        takes an exclusive end date for those.
+        """
+
+        end = date
+        if end_date and end_date != date:
+            end = (datetime.fromisoformat(end_date) + timedelta(days=1)).date().isoformat()
         payload = {
+            "id": event_id("day_off", user_name, date, end_date or date),
             "summary": f"Day-off: {user_name}",
             "start": {"date": date},
-            "end": {"date": date},
+            "end": {"date": end},
         }
         return await self._create_event(payload)
 
+    async def create_day_off_events(
+        self, user_name: str, dates: Iterable[str], concurrency: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create day-off events for many dates and return a status per date.
+
+        Consecutive dates become one multi-day event and the remaining
+        events are created concurrently, at most ``concurrency`` at a time.
+        Each date maps to the ``{"status": ...}`` result of the event that
+        covers it, so a failure leaves the other dates' outcomes intact.
+        """
+
+        log = get_logger("calendar.create_day_off_events")
+        runs = merge_dates(dates)
+        limit = concurrency or getattr(Config, "CALENDAR_EVENT_CONCURRENCY", DEFAULT_EVENT_CONCURRENCY)
+        slots = asyncio.Semaphore(max(1, limit))
+
+        async def create(first: str, last: str) -> Dict[str, Any]:
+            async with slots:
+                try:
+                    return await self.create_day_off_event(
+                        user_name, first, last if last != first else None
+                    )
+                except Exception:
+                    log.exception("create failed", extra={"start": first, "end": last})
+                    return {"status": "error", "message": ""}
+
+        results = await asyncio.gather(*(create(first, last) for first, last in runs))
+        statuses: Dict[str, Dict[str, Any]] = {}
+        for (first, last), result in zip(runs, results):
+            for day in _days(first, last):
+                statuses[day] = result
+        log.debug("done", extra={"events": len(runs), "dates": len(statuses)})
+        return statuses
+
     async def create_vacation_event(
         self, user_name: str, start_date: str, end_date: str, time_zone: str
     ) -> Dict[str, Any]:
         """Create a vacation event spanning the provided date range."""
 
         payload = {
+            "id": event_id("vacation", user_name, start_date, end_date),
             "summary": f"Vacation: {user_name}",
             "start": {"dateTime": f"{start_date}T00:00:00", "timeZone": time_zone},
             "end": {"dateTime": f"{end_date}T23:59:59", "timeZone": time_zone},
@@ -0,0 +1,95 @@
+"""Resolve Discord channels without spending a REST call when possible.
+
+``bot.fetch_channel`` is an HTTP request counted against Discord's rate
+limits, while the gateway already keeps most guild channels in
+``bot.get_channel``. ``ChannelResolver.resolve`` checks the gateway cache
+first, then a small TTL/LRU cache of channels it fetched before, and only
+then fetches over REST. Concurrent lookups of the same channel share one
+fetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from config import Config
+from services.logging_utils import get_logger
+
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL = 300  # seconds
+
+
+class ChannelResolver:
+    """Look channels up via the gateway cache, a local cache, then REST."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL) -> None:
+        self._fetched: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.gateway_hits = 0
+        self.cache_hits = 0
+        self.shared_fetches = 0
+        self.rest_fetches = 0
+
+    async def resolve(self, bot: Any, channel_id: Any) -> Any:
+        """Return the channel for ``channel_id``.
+
+        Raises whatever ``bot.fetch_channel`` raises (``discord.NotFound``,
+        ``discord.Forbidden``...) when the REST fallback fails.
+        """
+        cid = int(channel_id)
+        channel = bot.get_channel(cid)
+        if channel is not None:
+            self.gateway_hits += 1
+            return channel
+        channel = self._fetched.get(cid)
+        if channel is not None:
+            self.cache_hits += 1
+            return channel
+        pending = self._pending.get(cid)
+        if pending is not None and not pending.done():
+            self.shared_fetches += 1
+            return await asyncio.shield(pending)
+        future = asyncio.ensure_future(self._fetch(bot, cid))
+        self._pending[cid] = future
+        future.add_done_callback(
+            lambda done: self._pending.pop(cid, None) if self._pending.get(cid) is done else None
+        )
+        return await asyncio.shield(future)
+
+    async def _fetch(self, bot: Any, cid: int) -> Any:
+        self.rest_fetches += 1
+        channel = await bot.fetch_channel(cid)
+        if channel is not None:
+            self._fetched[cid] = channel
+        get_logger("channel_resolver.fetch").debug(
+            "channel fetched over REST", extra={"channel": cid, "metrics": self.metrics()}
+        )
+        return channel
+
+    def forget(self, channel_id: Any) -> None:
+        """Drop a cached channel, e.g. after it was deleted."""
+        self._fetched.pop(int(channel_id), None)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.gateway_hits + self.cache_hits + self.shared_fetches + self.rest_fetches
+        saved = lookups - self.rest_fetches
+        return {
+            "lookups": lookups,
+            "gateway_hits": self.gateway_hits,
+            "cache_hits": self.cache_hits,
+            "shared_fetches": self.shared_fetches,
+            "rest_fetches": self.rest_fetches,
+            "fetches_saved": saved,
+            "saved_rate": saved / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every command, view and the web server
+channel_resolver = ChannelResolver(
+    maxsize=getattr(Config, "CHANNEL_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+    ttl=getattr(Config, "CHANNEL_CACHE_TTL", DEFAULT_CACHE_TTL),
+)
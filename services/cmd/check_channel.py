@@ -5,7 +5,7 @@ from zoneinfo import ZoneInfo
 from typing import Any, Dict, Optional
 
 from config import Config
-from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_db import SurveyStepsDB, get_steps_db
 from services.logging_utils import get_logger
 
 # Some test environments stub Config without a DATABASE_URL; ensure the
@@ -21,10 +21,7 @@ async def handle(payload: Dict[str, Any], repo: Optional[SurveyStepsDB] = None)
     try:
         db = repo
         if db is None:
-            db_url = getattr(Config, "DATABASE_URL", "")
-            if not db_url:
-                raise RuntimeError("DATABASE_URL not configured")
-            db = SurveyStepsDB(db_url)
+            db = get_steps_db(getattr(Config, "DATABASE_URL", ""))
         now = datetime.now(ZoneInfo("Europe/Kyiv"))
         start = (now - timedelta(days=now.weekday())).replace(
             hour=0, minute=0, second=0, microsecond=0
@@ -40,9 +37,3 @@ async def handle(payload: Dict[str, Any], repo: Optional[SurveyStepsDB] = None)
             "output": False,
             "message": "Спробуй трохи піздніше. Я тут пораюсь по хаті.",
         }
-    finally:
-        if repo is None and db:
-            try:
-                await db.close()
-            except Exception:  # pragma: no cover - defensive cleanup
-                pass
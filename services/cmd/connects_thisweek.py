@@ -2,62 +2,131 @@
 
 from __future__ import annotations
 
+import asyncio
+from datetime import date
 from typing import Any, Dict
 
-import aiohttp
-
 from config import Config
+from services.http_client import http_client
 from services.notion_connector import NotionConnector
 from services.logging_utils import get_logger
-from services.survey_steps_db import SurveyStepsDB
+from services.outbox import PermanentDeliveryError, outbox
+from services.survey import survey_manager
+from services.survey_steps_db import get_steps_db
 
 
 ERROR_MESSAGE = "Спробуй трохи піздніше. Я тут пораюсь по хаті."
 
+_notion = NotionConnector()
+
+
+@outbox.delivery("connects_thisweek.post")
+async def _deliver_post(write: Dict[str, Any]) -> None:
+    # post connects count to external database
+    url = Config.CONNECTS_URL
+    session = await http_client.get_session()
+    async with session.post(
+        url, json={"name": write["name"], "connects": write["connects"]}
+    ) as resp:
+        if resp.status >= 400:
+            error = f"{url} answered {resp.status}"
+            if resp.status < 500 and resp.status != 429:
+                raise PermanentDeliveryError(error)
+            raise ConnectionError(error)
+    get_logger("connects_thisweek", user=write["name"]).info(
+        "connects posted", extra={"url": url, "connects": write["connects"]}
+    )
+
+
+@outbox.delivery("connects_thisweek.update_stats")
+async def _deliver_stats(write: Dict[str, Any]) -> None:
+    await _notion.update_profile_stats_connects(write["page_id"], write["connects"])
+    get_logger("connects_thisweek").info(
+        "notion stats updated", extra={"page_id": write["page_id"]}
+    )
+
+
+def _week() -> str:
+    year, week, _ = date.today().isocalendar()
+    return f"{year}-W{week:02d}"
+
 
 async def handle(payload: Dict[str, Any]) -> str:
-    """Record weekly connects and update optional profile stats."""
+    """Record weekly connects and update optional profile stats.
+
+    The step record, the POST to ``CONNECTS_URL`` and the Profile Stats
+    lookup + update don't depend on each other and run concurrently; each
+    one's failure is logged on its own. A failed record, post or lookup
+    still answers with ``ERROR_MESSAGE``; the Notion update is best effort.
+    The post and the update are handed to the outbox, which delivers them
+    in the background once its worker pool is running.
+    """
     log = get_logger("connects_thisweek", payload)
     try:
         connects = int(payload["result"]["connects"])
         log.debug("parsed connects", extra={"connects": connects})
+    except Exception:
+        log.exception("failed connects_thisweek")
+        return ERROR_MESSAGE
 
+    async def record_step() -> None:
         # mark survey step as completed using channel id as session id
-        db = SurveyStepsDB(Config.DATABASE_URL)
-        try:
-            await db.upsert_step(payload["channelId"], "connects_thisweek", True)
-            log.info("step recorded")
-        finally:
-            await db.close()
-
-        # post connects count to external database
-        url = Config.CONNECTS_URL
-
-        async with aiohttp.ClientSession() as session:
-            await session.post(
-                url, json={"name": payload["author"], "connects": connects}
-            )
-        log.info("connects posted", extra={"url": url})
+        db = get_steps_db(Config.DATABASE_URL)
+        await db.upsert_step(payload["channelId"], "connects_thisweek", True)
+        log.info("step recorded")
+
+    async def post_connects() -> None:
+        await outbox.submit(
+            "connects_thisweek.post",
+            {"name": payload["author"], "connects": connects},
+            dedup_key=f"connects_thisweek.post:{payload['author']}:{_week()}",
+        )
+        log.info("connects queued", extra={"url": Config.CONNECTS_URL})
 
+    async def update_stats() -> None:
         # update profile stats in notion if page exists
-        notion = NotionConnector()
-        stats = await notion.get_profile_stats_by_name(payload["author"])
-        results = stats.get("results", []) if isinstance(stats, dict) else []
+        page = await survey_manager.prefetched_page(
+            payload.get("channelId"), "profile_stats", payload["author"]
+        )
+        if page is not None:
+            results = [page]
+        else:
+            stats = await _notion.get_profile_stats_by_name(payload["author"])
+            results = stats.get("results", []) if isinstance(stats, dict) else []
         if results:
             page_id = results[0].get("id")
             try:
-                await notion.update_profile_stats_connects(page_id, connects)
-                log.info("notion stats updated", extra={"page_id": page_id})
+                await outbox.submit(
+                    "connects_thisweek.update_stats",
+                    {"page_id": page_id, "connects": connects},
+                    dedup_key=f"connects_thisweek.update_stats:{page_id}:{_week()}",
+                )
+                log.info("notion stats update queued", extra={"page_id": page_id})
             except Exception:  # pragma: no cover - best effort
                 log.exception("update profile stats failed")
-        await notion.close()
 
-        result = (
-            f"Записав! Upwork connects: залишилось {connects} на цьому тиждні."
-        )
-        log.info("done connects_thisweek", extra={"output": result})
-        return result
-    except Exception:
-        log.exception("failed connects_thisweek")
+    operations = {
+        "record_step": record_step,
+        "post_connects": post_connects,
+        "update_stats": update_stats,
+    }
+    outcomes = await asyncio.gather(
+        *(op() for op in operations.values()), return_exceptions=True
+    )
+    failed = False
+    for name, outcome in zip(operations, outcomes):
+        if isinstance(outcome, BaseException):
+            failed = True
+            log.error(
+                "failed connects_thisweek",
+                exc_info=outcome,
+                extra={"operation": name},
+            )
+    if failed:
         return ERROR_MESSAGE
 
+    result = (
+        f"Записав! Upwork connects: залишилось {connects} на цьому тиждні."
+    )
+    log.info("done connects_thisweek", extra={"output": result})
+    return result
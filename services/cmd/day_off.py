@@ -5,7 +5,7 @@ from typing import Any, Dict
 from config import Config
 from services.calendar_connector import CalendarConnector
 from services.logging_utils import get_logger
-from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_db import SurveyStepsDB, get_steps_db
 from services.date_utils import format_date_ua, is_valid_iso_date
 
 calendar = CalendarConnector()
@@ -16,10 +16,7 @@ def _ensure_db() -> SurveyStepsDB:
     """Return a SurveyStepsDB instance using the configured DATABASE_URL."""
     global _steps_db
     if _steps_db is None:
-        db_url = getattr(Config, "DATABASE_URL", "")
-        if not db_url:
-            raise RuntimeError("DATABASE_URL not configured")
-        _steps_db = SurveyStepsDB(db_url)
+        _steps_db = get_steps_db(getattr(Config, "DATABASE_URL", ""))
     return _steps_db
 
 
@@ -57,15 +54,24 @@ async def handle(payload: Dict[str, Any]) -> str:
             if not is_valid_iso_date(day):
                 log.error("Invalid day-off date provided", extra={"day": day})
                 return f"Некоректна дата: {day}"
-            try:
-                resp = await calendar.create_day_off_event(author, day)
-            except Exception:  # pragma: no cover - defensive
-                log.exception("create_day_off_event failed", extra={"day": day})
-                return "Спробуй трохи піздніше. Я тут пораюсь по хаті."
-            if resp.get("status") != "ok":
-                msg = resp.get("message", "")
-                log.error("Calendar error", extra={"day": day, "error": msg})
-                return msg or "Спробуй трохи піздніше. Я тут пораюсь по хаті."
+        # Consecutive days become one event; the rest are created concurrently
+        try:
+            statuses = await calendar.create_day_off_events(author, value)
+        except Exception:  # pragma: no cover - defensive
+            log.exception("create_day_off_events failed", extra={"days": value})
+            return "Спробуй трохи піздніше. Я тут пораюсь по хаті."
+        failed = [day for day in value if statuses.get(day, {}).get("status") != "ok"]
+        if failed:
+            msg = statuses.get(failed[0], {}).get("message", "")
+            log.error(
+                "Calendar error",
+                extra={
+                    "failed": failed,
+                    "recorded": [day for day in value if day not in failed],
+                    "error": msg,
+                },
+            )
+            return msg or "Спробуй трохи піздніше. Я тут пораюсь по хаті."
         await _mark_step(payload.get("channelId", ""), step)
         if len(value) == 1:
             result = (
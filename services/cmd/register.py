@@ -2,6 +2,7 @@ from typing import Any, Dict
 
 from services.notion_connector import NotionConnector
 from services.logging_utils import get_logger
+from services.team_directory import team_directory
 
 
 _notio = NotionConnector()
@@ -33,6 +34,7 @@ async def handle(payload: Dict[str, Any]) -> str:
             log.info("channel taken", extra={"discord_id": page.get("discord_id")})
             return "Канал вже зареєстрований на когось іншого."
         await _notio.update_team_directory_ids(page.get("id", ""), user_id, channel_id)
+        team_directory.update_ids(page.get("id", ""), user_id, channel_id, record=page)
         result_msg = f"Канал успішно зареєстровано на {name}"
         log.info("done register", extra={"page_id": page.get("id", ""), "output": result_msg})
         return result_msg
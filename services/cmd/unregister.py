@@ -2,6 +2,7 @@ from typing import Any, Dict
 
 from services.notion_connector import NotionConnector
 from services.logging_utils import get_logger
+from services.team_directory import team_directory
 
 _notio = NotionConnector()
 
@@ -20,6 +21,7 @@ async def handle(payload: Dict[str, Any]) -> str:
             )
         page_id = page[0]["id"]
         await _notio.clear_team_directory_ids(page_id)
+        team_directory.clear_channel(page_id)
         result = "Готово. Тепер цей канал не зареєстрований ні на кого."
         log.info("done unregister", extra={"page_id": page_id, "output": result})
         return result
@@ -8,7 +8,7 @@ from datetime import datetime
 from config import Config
 from services.calendar_connector import CalendarConnector
 from services.logging_utils import get_logger
-from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_db import get_steps_db
 
 # Reusable calendar connector instance
 calendar = CalendarConnector()
@@ -67,14 +67,11 @@ async def handle(payload: Dict[str, Any]) -> str:
             raise Exception("calendar error")
         log.info("calendar event created", extra={"event_id": resp.get("event_id")})
 
-        db = SurveyStepsDB(getattr(Config, "DATABASE_URL", ""))
-        try:
-            await db.upsert_step(
-                str(payload.get("channelId")), "vacation", True
-            )
-            log.info("step recorded")
-        finally:
-            await db.close()
+        db = get_steps_db(getattr(Config, "DATABASE_URL", ""))
+        await db.upsert_step(
+            str(payload.get("channelId")), "vacation", True
+        )
+        log.info("step recorded")
 
         result_msg = f"Записав! Відпустка: {_fmt(start_raw)}—{_fmt(end_raw)}."
         log.info("done vacation", extra={"output": result_msg})
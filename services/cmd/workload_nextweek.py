@@ -1,8 +1,11 @@
+from datetime import date
 from typing import Any, Dict, Optional, Union
 from services.notion_connector import NotionConnector
 from config import Config
 from services.logging_utils import get_logger
-from services.survey_steps_db import SurveyStepsDB
+from services.outbox import outbox
+from services.survey import survey_manager
+from services.survey_steps_db import SurveyStepsDB, get_steps_db
 
 ERROR_MSG = "Спробуй трохи піздніше. Я тут пораюсь по хаті."
 
@@ -13,13 +16,15 @@ _steps: Optional[SurveyStepsDB] = None
 def _ensure_db() -> SurveyStepsDB:
     global _steps
     if _steps is None:
-        db_url = getattr(Config, "DATABASE_URL", "")
-        if not db_url:
-            raise RuntimeError("DATABASE_URL not configured")
-        _steps = SurveyStepsDB(db_url)
+        _steps = get_steps_db(getattr(Config, "DATABASE_URL", ""))
     return _steps
 
 
+@outbox.delivery("workload_nextweek.update")
+async def _deliver_update(write: Dict[str, Any]) -> None:
+    await _notion.update_workload_day(write["page_id"], "Next week plan", write["hours"])
+
+
 def template(hours: Union[int, float]) -> str:
     """Return message confirming planned hours for next week."""
     return f"Записав! \nЗаплановане навантаження на наступний тиждень: {hours} год."
@@ -33,12 +38,21 @@ async def handle(payload: Dict[str, Any]) -> str:
         hours_raw = result.get("value", result.get("workload"))
         hours = int(hours_raw)
         log.debug("parsed hours", extra={"hours": hours})
-        page_data = await _notion.get_workload_page_by_name(payload["author"])
-        results = page_data.get("results", [])
-        if not results:
-            return ERROR_MSG
-        page = results[0]
-        await _notion.update_workload_day(page["id"], "Next week plan", hours)
+        page = await survey_manager.prefetched_page(
+            payload.get("channelId"), "workload", payload["author"]
+        )
+        if page is None:
+            page_data = await _notion.get_workload_page_by_name(payload["author"])
+            results = page_data.get("results", [])
+            if not results:
+                return ERROR_MSG
+            page = results[0]
+        year, week, _ = date.today().isocalendar()
+        await outbox.submit(
+            "workload_nextweek.update",
+            {"page_id": page["id"], "hours": hours},
+            dedup_key=f"workload_nextweek:{page['id']}:{year}-W{week:02d}",
+        )
         log.info("workload updated", extra={"page_id": page["id"]})
         db = _ensure_db()
         await db.upsert_step(payload["channelId"], "workload_nextweek", True)
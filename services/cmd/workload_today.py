@@ -4,7 +4,8 @@ This replaces the n8n workflow step that recorded a user's planned hours for
 the current day.  The function reads the desired number of hours from the
 payload, writes them to the Notion Workload database and marks the survey step
 as completed.  Any failure in the Notion interaction results in a generic
-error message being returned.
+error message being returned.  The page update goes through the outbox, so
+once its worker pool is running the reply doesn't wait for Notion.
 """
 
 from __future__ import annotations
@@ -15,7 +16,9 @@ from typing import Any, Dict, Optional
 from config import Config
 from services.notion_connector import NotionConnector, NotionError
 from services.logging_utils import get_logger
-from services.survey_steps_db import SurveyStepsDB
+from services.outbox import outbox
+from services.survey import survey_manager
+from services.survey_steps_db import SurveyStepsDB, get_steps_db
 
 
 _notio = NotionConnector()
@@ -25,10 +28,7 @@ _steps_db: Optional[SurveyStepsDB] = None
 def _ensure_db() -> SurveyStepsDB:
     global _steps_db
     if _steps_db is None:
-        db_url = getattr(Config, "DATABASE_URL", "")
-        if not db_url:
-            raise RuntimeError("DATABASE_URL not configured")
-        _steps_db = SurveyStepsDB(db_url)
+        _steps_db = get_steps_db(getattr(Config, "DATABASE_URL", ""))
     return _steps_db
 
 # Day name mappings for Ukrainian output and Notion fields
@@ -55,6 +55,11 @@ DAY_GEN = [
 ERROR_MSG = "Спробуй трохи піздніше. Я тут пораюсь по хаті."
 
 
+@outbox.delivery("workload_today.update")
+async def _deliver_update(write: Dict[str, Any]) -> None:
+    await _notio.update_workload_day(write["page_id"], write["field"], write["hours"])
+
+
 async def handle(payload: Dict[str, Any]) -> str:
     """Handle the ``workload_today`` command."""
 
@@ -73,24 +78,34 @@ async def handle(payload: Dict[str, Any]) -> str:
         idx = now.weekday()
         plan_field = f"{DAY_SHORT[idx]} Plan"
 
-        filter = {"property": "Name", "title": {"equals": payload["author"]}}
-        mapping: Dict[str, str] = {"capacity": "Capacity"}
-        for i in range(idx + 1):
-            mapping[f"fact_{i}"] = f"{DAY_SHORT[i]} Fact"
-        query = await _notio.query_database(
-            Config.NOTION_WORKLOAD_DB_ID, filter, mapping
+        page = await survey_manager.prefetched_page(
+            payload.get("channelId"), "workload", payload["author"]
         )
-        results = query.get("results", [])
-        if not results:
-            return ERROR_MSG
-        page = results[0]
+        if page is None:
+            filter = {"property": "Name", "title": {"equals": payload["author"]}}
+            mapping: Dict[str, str] = {"capacity": "Capacity"}
+            for i in range(idx + 1):
+                mapping[f"fact_{i}"] = f"{DAY_SHORT[i]} Fact"
+            query = await _notio.query_database(
+                Config.NOTION_WORKLOAD_DB_ID, filter, mapping
+            )
+            results = query.get("results", [])
+            if not results:
+                return ERROR_MSG
+            page = results[0]
+        else:
+            log.debug("using prefetched workload page", extra={"page_id": page.get("id")})
         page_id = page.get("id", "")
         capacity = int(page.get("capacity", 0))
         fact = int(
             sum(float(page.get(f"fact_{i}", 0)) for i in range(idx + 1))
         )
 
-        await _notio.update_workload_day(page_id, plan_field, hours)
+        await outbox.submit(
+            "workload_today.update",
+            {"page_id": page_id, "field": plan_field, "hours": hours},
+            dedup_key=f"workload_today:{page_id}:{now.date().isoformat()}",
+        )
         log.info("workload updated", extra={"page_id": page_id, "field": plan_field})
 
         db = _ensure_db()
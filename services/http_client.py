@@ -0,0 +1,154 @@
+"""Process-wide pooled HTTP client shared by all connectors.
+
+Connectors used to open their own ``aiohttp.ClientSession`` (and
+``connects_thisweek`` even a throwaway one per call), paying a new TCP/TLS
+handshake for almost every command.  ``http_client`` owns a single session
+backed by one ``TCPConnector`` with per-host limits, DNS caching and
+keep-alive, so connections to Notion, Google and the connects endpoint are
+reused across handlers.
+
+The session is created lazily on first use; ``main.py`` calls ``start()`` and
+``close()`` so it is opened before the bot connects and shut down cleanly.
+Per-host request, connection and latency counters are collected through an
+``aiohttp.TraceConfig`` and exposed via ``stats()``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from config import Config
+from services.logging_utils import get_logger
+
+
+DEFAULT_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 10
+DEFAULT_DNS_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_TIMEOUT = 60
+
+
+class HostStats:
+    """Counters for requests made to a single host."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record_latency(self, elapsed: float) -> None:
+        self.latency_total += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        completed = self.requests - self.errors
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "latency_avg": self.latency_total / completed if completed > 0 else 0.0,
+            "latency_max": self.latency_max,
+        }
+
+
+class HttpClient:
+    """Owner of the shared ``aiohttp.ClientSession``."""
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: Dict[str, HostStats] = {}
+
+    # --- Stats ---
+
+    def _host(self, host: Optional[str]) -> HostStats:
+        key = host or "unknown"
+        if key not in self._stats:
+            self._stats[key] = HostStats()
+        return self._stats[key]
+
+    async def _on_request_start(self, session, ctx: SimpleNamespace, params) -> None:
+        ctx.host = params.url.host
+        ctx.started = time.monotonic()
+        self._host(ctx.host).requests += 1
+
+    async def _on_request_end(self, session, ctx: SimpleNamespace, params) -> None:
+        self._host(ctx.host).record_latency(time.monotonic() - ctx.started)
+
+    async def _on_request_exception(self, session, ctx: SimpleNamespace, params) -> None:
+        self._host(ctx.host).errors += 1
+
+    async def _on_connection_create_end(self, session, ctx: SimpleNamespace, params) -> None:
+        self._host(getattr(ctx, "host", None)).connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, ctx: SimpleNamespace, params) -> None:
+        self._host(getattr(ctx, "host", None)).connections_reused += 1
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        return trace
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-host request, connection and latency counters."""
+        return {host: s.as_dict() for host, s in self._stats.items()}
+
+    # --- Lifecycle ---
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=getattr(Config, "HTTP_POOL_LIMIT", DEFAULT_LIMIT),
+            limit_per_host=getattr(Config, "HTTP_POOL_LIMIT_PER_HOST", DEFAULT_LIMIT_PER_HOST),
+            ttl_dns_cache=getattr(Config, "HTTP_DNS_CACHE_TTL", DEFAULT_DNS_TTL),
+            keepalive_timeout=getattr(Config, "HTTP_KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=getattr(Config, "HTTP_TIMEOUT", DEFAULT_TIMEOUT)
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[self._trace_config()],
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # No await between the check and the assignment, so concurrent
+            # callers on the same loop always end up with one session.
+            self._session = self._create_session()
+            self._loop = loop
+            get_logger("http_client.start").info("http session created")
+        return self._session
+
+    async def start(self) -> None:
+        """Open the shared session ahead of the first request."""
+        await self.get_session()
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            get_logger("http_client.close").info(
+                "http session closed", extra={"stats": self.stats()}
+            )
+        self._session = None
+        self._loop = None
+
+
+# Global shared HTTP client instance
+http_client = HttpClient()
@@ -0,0 +1,272 @@
+"""Outbound Discord message queue.
+
+Sending, editing, reacting and deleting from many coroutines at once lets
+discord.py's own 429 handling decide who waits, so a wave of survey
+greetings can stall the edits users are waiting on. ``OutboundQueue``
+puts those calls behind a token bucket per channel and one global
+bucket instead:
+
+* within a channel operations run one at a time, in priority order and
+  FIFO within a priority, so messages keep their order;
+* across channels the global bucket serves the highest priority waiter
+  first, so interaction responses overtake broadcast greetings;
+* an edit queued while another edit of the same message is still
+  waiting is merged into it; both callers get the one result, and the
+  merged edit runs at the more urgent of the two priorities.
+
+Interaction callbacks themselves (``interaction.response.*``) are not
+bound by the bot's rate limits and never go through the queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from services.logging_utils import get_logger
+
+
+INTERACTION = 0  # answers to a user's click, command or survey step
+BROADCAST = 1  # messages fired for the whole team, e.g. survey greetings
+
+PRIORITY_NAMES = {INTERACTION: "interaction", BROADCAST: "broadcast"}
+
+DEFAULT_CHANNEL_RATE = 5  # Discord allows about 5 messages per 5s per channel
+DEFAULT_CHANNEL_PER = 5.0
+DEFAULT_GLOBAL_RATE = 45  # kept under the 50 requests/s global limit
+DEFAULT_GLOBAL_PER = 1.0
+
+
+class RateBucket:
+    """Token bucket that hands tokens to waiters in priority order."""
+
+    def __init__(self, rate: float, per: float) -> None:
+        self.capacity = max(1.0, float(rate))
+        self.fill_rate = self.capacity / per
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._waiters: List[Any] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    @property
+    def idle(self) -> bool:
+        """True once nobody waits and the bucket has refilled."""
+        self._refill()
+        return not self._waiters and self.tokens >= self.capacity
+
+    async def acquire(self, priority: int = INTERACTION) -> None:
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        await future
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not self._waiters:
+            return
+        delay = max(0.0, (1 - self.tokens) / self.fill_rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._grant)
+
+    def _grant(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # the waiter was cancelled
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+
+@dataclass
+class _Job:
+    kind: str  # "send", "edit", "react" or "delete"
+    target: Any  # channel for "send", message otherwise
+    kwargs: Dict[str, Any]
+    priority: int
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+    started: bool = False
+
+
+class _Lane:
+    def __init__(self, bucket: RateBucket) -> None:
+        self.bucket = bucket
+        self.jobs: List[Any] = []
+        self.worker: Optional[asyncio.Task] = None
+
+
+class OutboundQueue:
+    """Rate-limited, prioritised queue for channel messages."""
+
+    def __init__(
+        self,
+        channel_rate: float = DEFAULT_CHANNEL_RATE,
+        channel_per: float = DEFAULT_CHANNEL_PER,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        global_per: float = DEFAULT_GLOBAL_PER,
+    ) -> None:
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self._global = RateBucket(global_rate, global_per)
+        self._lanes: Dict[int, _Lane] = {}
+        self._edits: Dict[int, _Job] = {}
+        self._seq = itertools.count()
+        self.max_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self._waits: Dict[int, List[float]] = {}  # priority -> [count, total, max]
+
+    async def send(self, channel: Any, content: Optional[str] = None, *, priority: int = INTERACTION, **kwargs: Any) -> Any:
+        """Queue ``channel.send(content, **kwargs)`` and return the sent message."""
+        if content is not None:
+            kwargs["content"] = content
+        return await self._submit(_Job("send", channel, kwargs, priority, self._future()), channel.id)
+
+    async def edit(self, message: Any, *, priority: int = INTERACTION, **kwargs: Any) -> Any:
+        """Queue ``message.edit(**kwargs)``, merging it into a waiting edit of the same message."""
+        pending = self._edits.get(message.id)
+        if pending is not None and not pending.started:
+            pending.kwargs.update(kwargs)
+            self.coalesced += 1
+            if priority < pending.priority:
+                self._reprioritise(pending, message.channel.id, priority)
+            return await asyncio.shield(pending.future)
+        job = _Job("edit", message, kwargs, priority, self._future())
+        self._edits[message.id] = job
+        return await self._submit(job, message.channel.id)
+
+    async def react(self, message: Any, emoji: Any, *, priority: int = INTERACTION) -> None:
+        """Queue ``message.add_reaction(emoji)``."""
+        await self._submit(_Job("react", message, {"emoji": emoji}, priority, self._future()), message.channel.id)
+
+    async def delete(self, message: Any, *, priority: int = INTERACTION) -> None:
+        """Queue ``message.delete()``."""
+        await self._submit(_Job("delete", message, {}, priority, self._future()), message.channel.id)
+
+    def _future(self) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Callers that gave up must not leave "exception never retrieved" noise
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    async def _submit(self, job: _Job, channel_id: Any) -> Any:
+        lane = self._lane(int(channel_id))
+        heapq.heappush(lane.jobs, (job.priority, next(self._seq), job))
+        self.max_depth = max(self.max_depth, self.depth())
+        if lane.worker is None:
+            lane.worker = asyncio.ensure_future(self._drain(int(channel_id), lane))
+        # A caller that is cancelled doesn't take the queued call down with it
+        return await asyncio.shield(job.future)
+
+    def _reprioritise(self, job: _Job, channel_id: Any, priority: int) -> None:
+        """Move a queued ``job`` up to ``priority``.
+
+        A job the lane worker has already popped is next in its channel
+        and only waits for a token; it keeps its place.
+        """
+        job.priority = priority
+        lane = self._lanes.get(int(channel_id))
+        if lane is None:
+            return
+        for i, (_, seq, queued) in enumerate(lane.jobs):
+            if queued is job:
+                lane.jobs[i] = (priority, seq, job)
+                heapq.heapify(lane.jobs)
+                return
+
+    def _lane(self, channel_id: int) -> _Lane:
+        lane = self._lanes.get(channel_id)
+        if lane is None:
+            # Forget lanes whose bucket has refilled; a fresh one is identical
+            for cid in [cid for cid, l in self._lanes.items() if l.worker is None and l.bucket.idle]:
+                del self._lanes[cid]
+            lane = self._lanes[channel_id] = _Lane(RateBucket(self.channel_rate, self.channel_per))
+        return lane
+
+    async def _drain(self, channel_id: int, lane: _Lane) -> None:
+        try:
+            while lane.jobs:
+                _, _, job = heapq.heappop(lane.jobs)
+                await lane.bucket.acquire(job.priority)
+                await self._global.acquire(job.priority)
+                job.started = True
+                if job.kind == "edit" and self._edits.get(job.target.id) is job:
+                    del self._edits[job.target.id]
+                self._record_wait(job)
+                try:
+                    if job.kind == "send":
+                        result = await job.target.send(**job.kwargs)
+                    elif job.kind == "edit":
+                        result = await job.target.edit(**job.kwargs)
+                    elif job.kind == "react":
+                        result = await job.target.add_reaction(job.kwargs["emoji"])
+                    else:
+                        result = await job.target.delete()
+                except Exception as exc:
+                    self.failed += 1
+                    get_logger("message_queue.drain").warning(
+                        "queued discord call failed",
+                        extra={"channel": channel_id, "kind": job.kind, "error": str(exc)},
+                    )
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+                else:
+                    self.completed += 1
+                    if not job.future.done():
+                        job.future.set_result(result)
+        finally:
+            lane.worker = None
+
+    def _record_wait(self, job: _Job) -> None:
+        waited = time.monotonic() - job.enqueued
+        stats = self._waits.setdefault(job.priority, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+
+    def depth(self) -> int:
+        return sum(len(lane.jobs) for lane in self._lanes.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        waits: Dict[str, Any] = {}
+        for priority, (count, total, longest) in sorted(self._waits.items()):
+            waits[PRIORITY_NAMES.get(priority, str(priority))] = {
+                "count": count,
+                "avg": total / count,
+                "max": longest,
+            }
+        return {
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "busy_channels": sum(1 for lane in self._lanes.values() if lane.worker is not None),
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "wait": waits,
+        }
+
+
+# Shared by the survey flow, the views and the web server
+message_queue = OutboundQueue(
+    channel_rate=getattr(Config, "DISCORD_CHANNEL_RATE", DEFAULT_CHANNEL_RATE),
+    channel_per=getattr(Config, "DISCORD_CHANNEL_PER", DEFAULT_CHANNEL_PER),
+    global_rate=getattr(Config, "DISCORD_GLOBAL_RATE", DEFAULT_GLOBAL_RATE),
+    global_per=getattr(Config, "DISCORD_GLOBAL_PER", DEFAULT_GLOBAL_PER),
+)
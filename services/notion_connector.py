@@ -34,6 +34,8 @@ environment variables or ``config.Config`` values.
 from __future__ import annotations
 
 import os
+import random
+import time
 from typing import Any, Dict, Optional
 
 import aiohttp
@@ -41,12 +43,134 @@ import asyncio
 
 from config import Config
 from services.logging_utils import get_logger
+from services.http_client import http_client
+
+
+TEAM_DIRECTORY_MAPPING = {
+    "name": "Name",
+    "discord_id": "Discord ID",
+    "channel_id": "Discord channel ID",
+    "to_do": "ToDo",
+    "is_public": "is_public",
+}
+
+WORKLOAD_DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Everything the workload handlers read from a Workload page
+WORKLOAD_MAPPING = {
+    "name": "Name",
+    "capacity": "Capacity",
+    **{f"fact_{i}": f"{day} Fact" for i, day in enumerate(WORKLOAD_DAYS)},
+}
+PROFILE_STATS_MAPPING = {"name": "Name", "connects": "Connects"}
+
+
+# Notion answers 429 when rate limited, 409 on transient conflicts and 5xx on
+# outages; anything else (400 validation, 401/403/404) won't succeed on retry.
+RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+MAX_BACKOFF = 30.0
 
 
 class NotionError(Exception):
     """Raised when the Notion API returns a non-successful response."""
 
 
+class TokenBucket:
+    """Async FIFO token-bucket limiter shared by all Notion requests.
+
+    Waiters are served in arrival order through an ``asyncio.Lock``.  A 429
+    response calls ``pause`` so every queued request respects ``Retry-After``,
+    not just the one that was throttled.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue_depth = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token and return the time spent waiting."""
+        started = time.monotonic()
+        self.queue_depth += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._blocked_until - now
+                    if wait <= 0:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        wait = (1 - self._tokens) / self.rate
+                    await asyncio.sleep(wait)
+        finally:
+            self.queue_depth -= 1
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every queued request for ``seconds`` (e.g. ``Retry-After``)."""
+        self.throttled += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_max": self.wait_time_max,
+            "wait_time_avg": self.wait_time_total / self.acquired if self.acquired else 0.0,
+        }
+
+
+notion_limiter = TokenBucket(
+    rate=getattr(Config, "NOTION_RATE_LIMIT", 3.0),
+    capacity=getattr(Config, "NOTION_RATE_BURST", 3),
+)
+
+
+def _retry_after(resp: Any) -> Optional[float]:
+    """Return the ``Retry-After`` delay in seconds if the response has one."""
+
+    value = (getattr(resp, "headers", None) or {}).get("Retry-After")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, base: float) -> float:
+    """Exponential backoff with full jitter."""
+
+    return random.uniform(0, min(MAX_BACKOFF, base * 2 ** attempt))
+
+
 def base_headers() -> Dict[str, str]:
     """Return headers required for all Notion API requests."""
 
@@ -97,86 +221,164 @@ def normalize_query(data: Dict[str, Any], mapping: Dict[str, str]) -> Dict[str,
         for out_name, prop_name in mapping.items():
             normalized[out_name] = _extract_property(props.get(prop_name, {}), out_name)
         results.append(normalized)
-    return {"status": "ok", "results": results}
+    return {
+        "status": "ok",
+        "results": results,
+        "has_more": bool(data.get("has_more")),
+        "next_cursor": data.get("next_cursor"),
+    }
 
 
 class NotionConnector:
     """Asynchronous wrapper around the Notion REST API."""
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        limiter: Optional[TokenBucket] = None,
+    ) -> None:
         self.session = session
+        self.limiter = limiter or notion_limiter
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or getattr(self.session, "closed", False):
-            self.session = aiohttp.ClientSession()
-        return self.session
+        # An explicitly passed session wins; otherwise use the shared pool
+        if self.session is not None and not getattr(self.session, "closed", False):
+            return self.session
+        return await http_client.get_session()
 
     async def close(self) -> None:
+        # The shared pool is closed by main.py; only close our own session
         if self.session and not getattr(self.session, "closed", False):
             await self.session.close()
 
-    async def query_database(
+    async def _request(
         self,
-        database_id: str,
-        filter: Dict[str, Any],
-        mapping: Optional[Dict[str, str]] = None,
-        max_retries: int = 3,
-        retry_delay: int = 20,
+        method: str,
+        url: str,
+        body: Optional[Dict[str, Any]],
+        log: Any,
+        max_retries: int,
+        retry_delay: float,
     ) -> Dict[str, Any]:
-        """Query a Notion database and return normalized results."""
+        """Send a rate-limited request, retrying only retryable failures."""
 
-        log = get_logger("notion.query_database")
-        log.debug("request", extra={"database_id": database_id, "filter": filter})
         session = await self._get_session()
-        url = f"https://api.notion.com/v1/databases/{database_id}/query"
         last_error: Any = None
         for attempt in range(max_retries):
+            waited = await self.limiter.acquire()
+            if waited > 0.5:
+                log.debug("rate limited", extra={"waited": round(waited, 3)})
+            retry_after: Optional[float] = None
             try:
-                async with session.post(
-                    url, headers=base_headers(), json={"filter": filter}
+                async with getattr(session, method)(
+                    url, headers=base_headers(), json=body
                 ) as resp:
                     data = await resp.json()
                     if resp.status == 200:
                         log.debug("response", extra={"status": resp.status})
-                        return normalize_query(data, mapping or {})
+                        return data
                     last_error = data
+                    if resp.status not in RETRYABLE_STATUSES:
+                        log.error("non-retryable response", extra={"status": resp.status})
+                        raise NotionError(last_error)
+                    if resp.status == 429:
+                        retry_after = _retry_after(resp)
+                        if retry_after is None:
+                            retry_after = _backoff(attempt, retry_delay)
+            except NotionError:
+                raise
             except Exception as e:  # pragma: no cover - network errors
                 last_error = {"error": str(e)}
             if attempt < max_retries - 1:
-                await asyncio.sleep(retry_delay)
+                if retry_after is not None:
+                    # The limiter holds every queued request, including this one
+                    self.limiter.pause(retry_after)
+                    log.info("throttled by notion", extra={"retry_after": retry_after})
+                else:
+                    await asyncio.sleep(_backoff(attempt, retry_delay))
         log.exception("failed")
         raise NotionError(last_error)
 
+    async def query_database(
+        self,
+        database_id: str,
+        filter: Optional[Dict[str, Any]],
+        mapping: Optional[Dict[str, str]] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        start_cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Query a Notion database and return normalized results."""
+
+        log = get_logger("notion.query_database")
+        log.debug("request", extra={"database_id": database_id, "filter": filter})
+        url = f"https://api.notion.com/v1/databases/{database_id}/query"
+        body: Dict[str, Any] = {}
+        if filter:
+            body["filter"] = filter
+        if start_cursor:
+            body["start_cursor"] = start_cursor
+        data = await self._request("post", url, body, log, max_retries, retry_delay)
+        return normalize_query(data, mapping or {})
+
     async def update_page(
         self,
         page_id: str,
         properties: Dict[str, Any],
         max_retries: int = 3,
-        retry_delay: int = 20,
+        retry_delay: float = 1.0,
     ) -> Dict[str, str]:
         """Update properties on a Notion page."""
 
         log = get_logger("notion.update_page")
         log.debug("request", extra={"page_id": page_id, "properties": properties})
-        session = await self._get_session()
         url = f"https://api.notion.com/v1/pages/{page_id}"
-        last_error: Any = None
-        for attempt in range(max_retries):
-            try:
-                async with session.patch(
-                    url, headers=base_headers(), json={"properties": properties}
-                ) as resp:
-                    data = await resp.json()
-                    if resp.status == 200:
-                        log.debug("response", extra={"status": resp.status})
-                        return {"status": "ok"}
-                    last_error = data
-            except Exception as e:  # pragma: no cover - network errors
-                last_error = {"error": str(e)}
-            if attempt < max_retries - 1:
-                await asyncio.sleep(retry_delay)
-        log.exception("failed")
-        raise NotionError(last_error)
+        await self._request(
+            "patch", url, {"properties": properties}, log, max_retries, retry_delay
+        )
+        return {"status": "ok"}
+
+    async def list_block_children(
+        self,
+        block_id: str,
+        start_cursor: Optional[str] = None,
+        page_size: int = 100,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ) -> Dict[str, Any]:
+        """Return one page of a block's children (raw ``results``/``next_cursor``)."""
+
+        log = get_logger("notion.list_block_children")
+        log.debug("request", extra={"block_id": block_id, "start_cursor": start_cursor})
+        url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size={page_size}"
+        if start_cursor:
+            url += f"&start_cursor={start_cursor}"
+        data = await self._request("get", url, None, log, max_retries, retry_delay)
+        return {
+            "results": data.get("results", []),
+            "has_more": bool(data.get("has_more")),
+            "next_cursor": data.get("next_cursor"),
+        }
+
+    async def query_database_all(
+        self,
+        database_id: str,
+        filter: Optional[Dict[str, Any]] = None,
+        mapping: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Query every page of a Notion database by following ``next_cursor``."""
+
+        results = []
+        cursor: Optional[str] = None
+        while True:
+            page = await self.query_database(
+                database_id, filter, mapping, start_cursor=cursor
+            )
+            results.extend(page.get("results", []))
+            cursor = page.get("next_cursor")
+            if not page.get("has_more") or not cursor:
+                break
+        return {"status": "ok", "results": results}
 
     # --- Helper methods for specific databases ---
 
@@ -185,26 +387,21 @@ class NotionConnector:
             "property": "Discord channel ID",
             "rich_text": {"contains": channel_id},
         }
-        mapping = {
-            "name": "Name",
-            "discord_id": "Discord ID",
-            "channel_id": "Discord channel ID",
-            "to_do": "ToDo",
-            "is_public": "is_public",
-        }
-        return await self.query_database(Config.NOTION_TEAM_DIRECTORY_DB_ID, filter, mapping)
+        return await self.query_database(
+            Config.NOTION_TEAM_DIRECTORY_DB_ID, filter, TEAM_DIRECTORY_MAPPING
+        )
 
     async def find_team_directory_by_name(self, name: str) -> Dict[str, Any]:
         filter = {"property": "Name", "title": {"equals": name}}
-        mapping = {
-            "name": "Name",
-            "discord_id": "Discord ID",
-            "channel_id": "Discord channel ID",
-            "to_do": "ToDo",
-            "is_public": "is_public",
-        }
         return await self.query_database(
-            Config.NOTION_TEAM_DIRECTORY_DB_ID, filter, mapping
+            Config.NOTION_TEAM_DIRECTORY_DB_ID, filter, TEAM_DIRECTORY_MAPPING
+        )
+
+    async def list_team_directory(self) -> Dict[str, Any]:
+        """Return every Team Directory entry using a paginated full query."""
+
+        return await self.query_database_all(
+            Config.NOTION_TEAM_DIRECTORY_DB_ID, None, TEAM_DIRECTORY_MAPPING
         )
 
     async def update_team_directory_ids(
@@ -222,9 +419,11 @@ class NotionConnector:
         properties = {"Discord channel ID": {"rich_text": []}}
         return await self.update_page(page_id, properties)
 
-    async def get_workload_page_by_name(self, name: str) -> Dict[str, Any]:
+    async def get_workload_page_by_name(
+        self, name: str, mapping: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         filter = {"property": "Name", "title": {"equals": name}}
-        mapping = {"name": "Name"}
+        mapping = mapping or {"name": "Name"}
         return await self.query_database(Config.NOTION_WORKLOAD_DB_ID, filter, mapping)
 
     async def update_workload_day(
@@ -235,8 +434,9 @@ class NotionConnector:
 
     async def get_profile_stats_by_name(self, name: str) -> Dict[str, Any]:
         filter = {"property": "Name", "title": {"equals": name}}
-        mapping = {"name": "Name", "connects": "Connects"}
-        return await self.query_database(Config.NOTION_PROFILE_STATS_DB_ID, filter, mapping)
+        return await self.query_database(
+            Config.NOTION_PROFILE_STATS_DB_ID, filter, PROFILE_STATS_MAPPING
+        )
 
     async def update_profile_stats_connects(
         self, page_id: str, connects: int
@@ -1,12 +1,120 @@
 import asyncio
-from config.logger import logger
+from config import Config, logger
 import os
 import re
 import json
 from dataclasses import dataclass, field
 from datetime import date, timedelta, datetime
-from typing import List, Optional
-from notion_client import Client as NotionClient
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from cachetools import TTLCache
+from services.notion_connector import NotionConnector
+
+# Parallel ``blocks.children.list`` calls per walk; the shared Notion rate
+# limiter still caps the overall request rate.
+DEFAULT_TODO_CONCURRENCY = 4
+DEFAULT_CACHE_TTL = 300 # seconds; bounds how long a checked or renamed nested to-do can show up
+DEFAULT_CACHE_MAX_BLOCKS = 20000
+# Block fields the ToDo walk reads; everything else is dropped before caching
+_CACHED_FIELDS = ('id', 'type', 'created_time', 'last_edited_time', 'has_children')
+
+
+class _CachedChildren(NamedTuple):
+    last_edited_time: str
+    children: List[Dict[str, Any]]
+    pages: int # ``blocks.children.list`` calls it took to read
+
+
+class _BlockLRU(TTLCache):
+    """TTLCache that counts capacity evictions."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+def _slim(block: Dict[str, Any]) -> Dict[str, Any]:
+    slim = {key: block[key] for key in _CACHED_FIELDS if key in block}
+    if block.get('type') == 'to_do':
+        to_do = block.get('to_do', {})
+        slim['to_do'] = {
+            'checked': to_do.get('checked', False),
+            'rich_text': [{'plain_text': t.get('plain_text', '')} for t in to_do.get('rich_text', [])],
+        }
+    return slim
+
+
+class ToDoBlockCache:
+    """Children of ToDo blocks keyed by block ID and ``last_edited_time``.
+
+    A subtree is reused while the ``last_edited_time`` its parent listing
+    reports for the block matches the cached one; otherwise it is listed
+    again. Checking, unchecking or renaming a child only changes the
+    child's own timestamp, not the block's, so such edits show up once the
+    entry expires after ``ttl`` seconds; keep it short (minutes). The
+    root block is always listed. Entries are evicted least recently used
+    first once ``max_blocks`` cached child blocks are held.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_blocks: int = DEFAULT_CACHE_MAX_BLOCKS) -> None:
+        self.max_blocks = max_blocks
+        self._entries = _BlockLRU(
+            maxsize=max_blocks, ttl=ttl, getsizeof=lambda entry: len(entry.children) + 1
+        )
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.calls_saved = 0
+
+    def get(self, block_id: str, last_edited_time: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(block_id)
+        if entry is not None and last_edited_time and entry.last_edited_time == last_edited_time:
+            self.hits += 1
+            self.calls_saved += entry.pages
+            return entry.children
+        if entry is not None:
+            self.stale += 1
+            self._entries.pop(block_id, None)
+        self.misses += 1
+        return None
+
+    def put(self, block_id: str, last_edited_time: Optional[str], children: List[Dict[str, Any]], pages: int) -> List[Dict[str, Any]]:
+        """Cache ``children`` and return the trimmed copy that was stored."""
+        slim = [_slim(child) for child in children]
+        if last_edited_time:
+            try:
+                self._entries[block_id] = _CachedChildren(last_edited_time, slim, pages)
+            except ValueError:
+                pass # Single subtree bigger than the whole cache
+        return slim
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "blocks": self._entries.currsize,
+            "max_blocks": self.max_blocks,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self._entries.evictions,
+            "calls_saved": self.calls_saved,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every Notion_todos instance so repeat survey completions reuse it
+todo_cache = ToDoBlockCache(
+    ttl=getattr(Config, "NOTION_TODO_CACHE_TTL", DEFAULT_CACHE_TTL),
+    max_blocks=getattr(Config, "NOTION_TODO_CACHE_MAX_BLOCKS", DEFAULT_CACHE_MAX_BLOCKS),
+)
 
 @dataclass
 class ToDoBlock:
@@ -30,18 +138,27 @@ def _parse_url(url: str) -> Optional[str]:
     return None
 
 class Notion_todos:
-    def __init__(self, todo_url: str, days: int = None):
-        notion_token = os.environ.get("NOTION_TOKEN")
+    def __init__(
+        self,
+        todo_url: str,
+        days: int = None,
+        connector: Optional[NotionConnector] = None,
+        concurrency: Optional[int] = None,
+        cache: Optional[ToDoBlockCache] = None,
+    ):
+        notion_token = os.environ.get("NOTION_TOKEN") or getattr(Config, "NOTION_TOKEN", "")
         if not notion_token:
             raise ValueError("Notion API token is required. Set NOTION_TOKEN environment variable.")
         if not todo_url:
             raise ValueError("Notion ToDo page URL is required.")
         self.todo_url = todo_url
-        self.client = NotionClient(auth=notion_token)
+        self.connector = connector or NotionConnector()
         self.block_id = _parse_url(self.todo_url)
         if not self.block_id:
             raise ValueError(f"Could not parse a valid Notion block ID from URL: {self.todo_url}")
         self.days = days
+        self.concurrency = concurrency or getattr(Config, "NOTION_TODO_CONCURRENCY", DEFAULT_TODO_CONCURRENCY)
+        self.cache = cache if cache is not None else todo_cache
 
     async def get_tasks_text(self, user_id: str, only_unchecked: bool = True) -> str:
         # Calculate date range if days is set
@@ -51,12 +168,6 @@ class Notion_todos:
             end_date = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
             start_dt = datetime.now() - timedelta(days=self.days)
             start_date = start_dt.strftime('%Y-%m-%dT%H:%M:%S')
-        try:
-            # Run blocking Notion API call in a separate thread
-            page = await asyncio.to_thread(self.client.blocks.retrieve, self.block_id)
-        except Exception as e:
-            logger.error(f"Failed to fetch Notion page: {e}")
-            raise ConnectionError(f"Failed to fetch Notion page (ID: {self.block_id}) from URL {self.todo_url}. Error: {e}")
 
         todos = await self._extract_todos(self.block_id, only_unchecked=only_unchecked, start_date=start_date, end_date=end_date)
 
@@ -68,31 +179,106 @@ class Notion_todos:
             lines.append(f" * *{block.title}*")
         return json.dumps({"tasks_found": True, "text": "\n".join(lines)}, ensure_ascii=False)
 
-    async def _extract_todos(self, block_id: str, only_unchecked: bool = True, start_date: str = None, end_date: str = str) -> List[ToDoBlock]: # Corrected type hint for end_date
+    async def _extract_todos(self, block_id: str, only_unchecked: bool = True, start_date: str = None, end_date: str = None) -> List[ToDoBlock]:
+        tree = await self._walk(block_id, only_unchecked=only_unchecked, start_date=start_date, end_date=end_date)
+        return self._collect(block_id, tree, only_unchecked=only_unchecked, start_date=start_date, end_date=end_date)
+
+    @staticmethod
+    def _skip(block: Dict[str, Any], only_unchecked: bool, start_date: str, end_date: str) -> bool:
+        """Whether ``block`` and its subtree are filtered out.
+
+        To-dos outside the date window (or checked ones) are skipped along
+        with their children. A block created after ``end_date`` is skipped
+        too: its children can't be older than the block itself.
+        """
+        created_time = block.get('created_time', '')
+        if end_date and created_time >= end_date:
+            return True
+        if block.get('type') != 'to_do':
+            return False
+        if start_date and created_time < start_date:
+            return True
+        return only_unchecked and block['to_do'].get('checked', False)
+
+    async def _walk(self, root_id: str, only_unchecked: bool = True, start_date: str = None, end_date: str = None) -> Dict[str, List[Dict[str, Any]]]:
+        """List the block tree under ``root_id`` breadth-first.
+
+        Up to ``concurrency`` blocks are listed at once, each one following
+        ``next_cursor`` until all of its children are read. Subtrees that
+        ``_skip`` rules out are never requested, and unchanged ones come
+        from ``self.cache``. The root is always listed.
+        """
+        tree: Dict[str, List[Dict[str, Any]]] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait((root_id, None))
+        root_error: List[Exception] = []
+
+        async def worker() -> None:
+            while True:
+                block_id, last_edited_time = await queue.get()
+                try:
+                    children = self.cache.get(block_id, last_edited_time) if last_edited_time else None
+                    if children is None:
+                        children, pages = await self._list_children(block_id)
+                        children = self.cache.put(block_id, last_edited_time, children, pages)
+                    tree[block_id] = children
+                    for child in children:
+                        if child.get('has_children') and not self._skip(child, only_unchecked, start_date, end_date):
+                            queue.put_nowait((child['id'], child.get('last_edited_time')))
+                except Exception as e:
+                    if block_id == root_id:
+                        root_error.append(e)
+                    else:
+                        logger.warning(f"[{root_id}] - Failed to list children of block {block_id}: {e}")
+                    tree[block_id] = []
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, self.concurrency))]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if root_error:
+            logger.error(f"Failed to fetch Notion page: {root_error[0]}")
+            raise ConnectionError(f"Failed to fetch Notion page (ID: {self.block_id}) from URL {self.todo_url}. Error: {root_error[0]}")
+        logger.debug(f"[{root_id}] - ToDo walk done, cache: {self.cache.metrics()}")
+        return tree
+
+    async def _list_children(self, block_id: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Return ``(children, pages)`` for a block, following ``next_cursor``."""
+        children: List[Dict[str, Any]] = []
+        cursor: Optional[str] = None
+        pages = 0
+        while True:
+            page = await self.connector.list_block_children(block_id, start_cursor=cursor)
+            pages += 1
+            children.extend(page["results"])
+            cursor = page["next_cursor"]
+            if not page["has_more"] or not cursor:
+                break
+        return children, pages
+
+    def _collect(self, block_id: str, tree: Dict[str, List[Dict[str, Any]]], only_unchecked: bool = True, start_date: str = None, end_date: str = None) -> List[ToDoBlock]:
+        """Return matching to-dos from a walked tree in page order."""
         todos = []
-        # Run blocking Notion API call in a separate thread
-        children = await asyncio.to_thread(self.client.blocks.children.list, block_id)
-        for child in children.get('results', []):
+        for child in tree.get(block_id, []):
             try: # Added try block for processing individual blocks
+                if self._skip(child, only_unchecked, start_date, end_date):
+                    continue
                 if child['type'] == 'to_do':
                     checked = child['to_do'].get('checked', False)
-                    created_time = child.get('created_time', '')
-                    # Date filtering
-                    if start_date and created_time < start_date:
-                        continue
-                    if end_date and created_time >= end_date:
-                        continue
-                    if only_unchecked and checked:
-                        continue
                     title = "".join([t['plain_text'] for t in child['to_do']['rich_text']])
-                    todo = ToDoBlock(title=title, todo_date=created_time, id=child['id'])
+                    todo = ToDoBlock(title=title, todo_date=child.get('created_time', ''), id=child['id'])
                     setattr(todo, 'checked', checked)
                     todos.append(todo)
-                # Recursively check children
+                # Nested blocks were already listed by the walker
                 if child.get('has_children'):
-                    # Recursively call the async version
-                    todos.extend(await self._extract_todos(child['id'], only_unchecked=only_unchecked, start_date=start_date, end_date=end_date))
+                    todos.extend(self._collect(child['id'], tree, only_unchecked=only_unchecked, start_date=start_date, end_date=end_date))
             except Exception as block_process_e: # Catch exceptions during block processing
                 logger.warning(f"[{block_id}] - Failed to process block {child.get('id', 'N/A')}: {block_process_e}", exc_info=True)
                 continue # Continue to the next block on error
-        return todos
\ No newline at end of file
+        return todos
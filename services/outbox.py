@@ -0,0 +1,489 @@
+"""Durable outbox for writes to external services.
+
+Handlers ``submit`` the side effects they need (Notion property updates, the
+``CONNECTS_URL`` post) instead of awaiting them, and reply straight away. A
+pool of background workers claims due entries, runs the delivery registered
+for their ``kind`` and then marks them done, schedules a retry with
+exponential backoff, or dead-letters them after ``max_attempts``.
+
+Every entry has a dedup key. Submitting the same key again replaces a queued
+payload instead of adding a second write, and is a no-op when that exact
+payload is already queued or delivered. Deliveries are at-least-once (a
+crash mid-delivery retries the entry once its lease expires), so they must
+be idempotent; "set property X to N" writes are.
+
+Stores follow ``services.survey_store``:
+
+* ``MemoryOutboxStore`` keeps entries in a dict (tests, local runs).
+* ``DatabaseOutboxStore`` uses the ``outbox`` table created by
+  ``services.survey_steps_migrations`` through the shared ``SurveyStepsDB``
+  pool.
+
+Until ``start`` is called (no database configured) ``submit`` runs the
+delivery inline, so callers still see failures as they happen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from config import Config
+from services.logging_utils import get_logger
+
+if TYPE_CHECKING:  # pragma: no cover - avoid requiring ``databases`` at import
+    from services.survey_steps_db import SurveyStepsDB
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_RETRY_BASE = 5.0  # seconds before the first retry, doubled each time
+DEFAULT_RETRY_MAX = 600.0
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_LEASE = 120.0  # seconds a claimed entry is hidden from other claims
+DEFAULT_RETENTION = 7 * 86400  # seconds delivered entries are kept for dedup
+PURGE_INTERVAL = 3600.0
+
+PENDING = "pending"
+DONE = "done"
+DEAD = "dead"
+
+Delivery = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PermanentDeliveryError(Exception):
+    """Raised by a delivery when retrying can't help; the entry is dead-lettered."""
+
+
+@dataclass
+class OutboxEntry:
+    id: Any
+    kind: str
+    dedup_key: str
+    payload: Dict[str, Any]
+    attempts: int
+    version: int  # bumped when the payload is replaced mid-delivery
+
+
+def _dump(payload: Dict[str, Any]) -> str:
+    # Stable text so identical payloads compare equal for dedup
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+class OutboxStore(ABC):
+    """Interface for outbox backends."""
+
+    @abstractmethod
+    async def put(self, kind: str, dedup_key: str, payload: Dict[str, Any], now: float) -> None:
+        ...
+
+    @abstractmethod
+    async def claim(self, limit: int, now: float, lease: float) -> List[OutboxEntry]:
+        """Return up to ``limit`` due entries, hiding them for ``lease`` seconds."""
+
+    @abstractmethod
+    async def complete(self, entry: OutboxEntry, now: float) -> None:
+        ...
+
+    @abstractmethod
+    async def retry(self, entry: OutboxEntry, attempts: int, next_attempt_at: float, error: str, now: float) -> None:
+        ...
+
+    @abstractmethod
+    async def dead(self, entry: OutboxEntry, attempts: int, error: str, now: float) -> None:
+        ...
+
+    @abstractmethod
+    async def purge(self, before: float) -> None:
+        """Drop delivered entries last updated before ``before``."""
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Return the number of entries per status."""
+
+    @abstractmethod
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        ...
+
+
+class MemoryOutboxStore(OutboxStore):
+    """Keep outbox entries in process memory."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, Dict[str, Any]] = {}  # dedup_key -> row
+        self._next_id = 0
+
+    async def put(self, kind: str, dedup_key: str, payload: Dict[str, Any], now: float) -> None:
+        data = _dump(payload)
+        row = self.rows.get(dedup_key)
+        if row is not None and row["payload"] == data and row["status"] in (PENDING, DONE):
+            return
+        if row is None:
+            self._next_id += 1
+            row = self.rows[dedup_key] = {"id": self._next_id, "version": 0, "created_at": now}
+        # A pending row may be claimed; its lease holds the replacement back
+        # until the old delivery has finished or expired
+        next_attempt_at = now
+        if row.get("status") == PENDING:
+            next_attempt_at = max(row["next_attempt_at"], now)
+        row.update(
+            kind=kind,
+            dedup_key=dedup_key,
+            payload=data,
+            status=PENDING,
+            attempts=0,
+            version=row["version"] + 1,
+            next_attempt_at=next_attempt_at,
+            last_error=None,
+            updated_at=now,
+        )
+
+    async def claim(self, limit: int, now: float, lease: float) -> List[OutboxEntry]:
+        due = sorted(
+            (r for r in self.rows.values() if r["status"] == PENDING and r["next_attempt_at"] <= now),
+            key=lambda r: (r["next_attempt_at"], r["id"]),
+        )[:limit]
+        for row in due:
+            row["next_attempt_at"] = now + lease
+        return [
+            OutboxEntry(r["id"], r["kind"], r["dedup_key"], json.loads(r["payload"]), r["attempts"], r["version"])
+            for r in due
+        ]
+
+    def _current(self, entry: OutboxEntry) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(entry.dedup_key)
+        if row is None or row["id"] != entry.id or row["version"] != entry.version:
+            return None
+        return row
+
+    async def complete(self, entry: OutboxEntry, now: float) -> None:
+        row = self._current(entry)
+        if row is not None:
+            row.update(status=DONE, attempts=entry.attempts + 1, last_error=None, updated_at=now)
+
+    async def retry(self, entry: OutboxEntry, attempts: int, next_attempt_at: float, error: str, now: float) -> None:
+        row = self._current(entry)
+        if row is not None:
+            row.update(attempts=attempts, next_attempt_at=next_attempt_at, last_error=error, updated_at=now)
+
+    async def dead(self, entry: OutboxEntry, attempts: int, error: str, now: float) -> None:
+        row = self._current(entry)
+        if row is not None:
+            row.update(status=DEAD, attempts=attempts, last_error=error, updated_at=now)
+
+    async def purge(self, before: float) -> None:
+        for key, row in list(self.rows.items()):
+            if row["status"] == DONE and row["updated_at"] < before:
+                del self.rows[key]
+
+    async def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, DONE: 0, DEAD: 0}
+        for row in self.rows.values():
+            counts[row["status"]] += 1
+        return counts
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = [r for r in self.rows.values() if r["status"] == DEAD][:limit]
+        return [
+            {k: r[k] for k in ("id", "kind", "dedup_key", "attempts", "last_error", "updated_at")}
+            | {"payload": json.loads(r["payload"])}
+            for r in rows
+        ]
+
+
+class DatabaseOutboxStore(OutboxStore):
+    """Store outbox entries in the ``outbox`` table."""
+
+    def __init__(self, steps_db: SurveyStepsDB) -> None:
+        self.steps_db = steps_db
+
+    async def put(self, kind: str, dedup_key: str, payload: Dict[str, Any], now: float) -> None:
+        # Identical payloads that are queued or delivered are left alone;
+        # anything else (new payload, dead letter) is queued afresh. A
+        # pending row may be claimed, so its lease is kept: the replacement
+        # is not delivered alongside the old payload.
+        query = (
+            "INSERT INTO outbox (kind, dedup_key, payload, status, attempts, version, "
+            "next_attempt_at, last_error, created_at, updated_at) "
+            "VALUES (:kind, :dedup_key, :payload, 'pending', 0, 1, :now, NULL, :now, :now) "
+            "ON CONFLICT (dedup_key) DO UPDATE SET "
+            "kind = excluded.kind, payload = excluded.payload, status = 'pending', "
+            "attempts = 0, version = outbox.version + 1, "
+            "next_attempt_at = CASE WHEN outbox.status = 'pending' "
+            "AND outbox.next_attempt_at > excluded.next_attempt_at "
+            "THEN outbox.next_attempt_at ELSE excluded.next_attempt_at END, "
+            "last_error = NULL, "
+            "updated_at = excluded.updated_at "
+            "WHERE outbox.payload <> excluded.payload OR outbox.status = 'dead'"
+        )
+        params = {"kind": kind, "dedup_key": dedup_key, "payload": _dump(payload), "now": now}
+        async with self.steps_db._acquire():
+            await self.steps_db.db.execute(query, params)
+
+    async def claim(self, limit: int, now: float, lease: float) -> List[OutboxEntry]:
+        select = (
+            "SELECT id, kind, dedup_key, payload, attempts, version FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= :now "
+            "ORDER BY next_attempt_at, id LIMIT :limit"
+        )
+        if self.steps_db.database_url.startswith("postgres"):
+            # Lets several bot processes share one outbox table
+            select += " FOR UPDATE SKIP LOCKED"
+        async with self.steps_db._acquire():
+            async with self.steps_db.db.transaction():
+                rows = await self.steps_db.db.fetch_all(select, {"now": now, "limit": limit})
+                for row in rows:
+                    await self.steps_db.db.execute(
+                        "UPDATE outbox SET next_attempt_at = :until WHERE id = :id",
+                        {"until": now + lease, "id": row["id"]},
+                    )
+        return [
+            OutboxEntry(r["id"], r["kind"], r["dedup_key"], json.loads(r["payload"]), r["attempts"], r["version"])
+            for r in rows
+        ]
+
+    async def _update(self, entry: OutboxEntry, assignments: str, params: Dict[str, Any]) -> None:
+        # The version check drops the outcome of a payload that was replaced
+        # while it was being delivered; the replacement stays queued.
+        query = f"UPDATE outbox SET {assignments} WHERE id = :id AND version = :version"
+        async with self.steps_db._acquire():
+            await self.steps_db.db.execute(query, {**params, "id": entry.id, "version": entry.version})
+
+    async def complete(self, entry: OutboxEntry, now: float) -> None:
+        await self._update(
+            entry,
+            "status = 'done', attempts = :attempts, last_error = NULL, updated_at = :now",
+            {"attempts": entry.attempts + 1, "now": now},
+        )
+
+    async def retry(self, entry: OutboxEntry, attempts: int, next_attempt_at: float, error: str, now: float) -> None:
+        await self._update(
+            entry,
+            "attempts = :attempts, next_attempt_at = :next_attempt_at, last_error = :error, updated_at = :now",
+            {"attempts": attempts, "next_attempt_at": next_attempt_at, "error": error, "now": now},
+        )
+
+    async def dead(self, entry: OutboxEntry, attempts: int, error: str, now: float) -> None:
+        await self._update(
+            entry,
+            "status = 'dead', attempts = :attempts, last_error = :error, updated_at = :now",
+            {"attempts": attempts, "error": error, "now": now},
+        )
+
+    async def purge(self, before: float) -> None:
+        async with self.steps_db._acquire():
+            await self.steps_db.db.execute(
+                "DELETE FROM outbox WHERE status = 'done' AND updated_at < :before",
+                {"before": before},
+            )
+
+    async def counts(self) -> Dict[str, int]:
+        async with self.steps_db._acquire():
+            rows = await self.steps_db.db.fetch_all(
+                "SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"
+            )
+        counts = {PENDING: 0, DONE: 0, DEAD: 0}
+        counts.update({r["status"]: int(r["n"]) for r in rows})
+        return counts
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        async with self.steps_db._acquire():
+            rows = await self.steps_db.db.fetch_all(
+                "SELECT id, kind, dedup_key, payload, attempts, last_error, updated_at "
+                "FROM outbox WHERE status = 'dead' ORDER BY updated_at DESC LIMIT :limit",
+                {"limit": limit},
+            )
+        return [dict(r) | {"payload": json.loads(r["payload"])} for r in rows]
+
+
+class Outbox:
+    """Queue external writes and deliver them with a background worker pool."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base: float = DEFAULT_RETRY_BASE,
+        retry_max: float = DEFAULT_RETRY_MAX,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        lease: float = DEFAULT_LEASE,
+        retention: float = DEFAULT_RETENTION,
+    ) -> None:
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retention = retention
+        self.store: Optional[OutboxStore] = None
+        self._deliveries: Dict[str, Delivery] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+        self._last_purge = 0.0
+        self.submitted = 0
+        self.inline = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    # --- Registration ---
+
+    def register(self, kind: str, delivery: Delivery) -> None:
+        """Register the coroutine that performs writes of ``kind``."""
+        self._deliveries[kind] = delivery
+
+    def delivery(self, kind: str) -> Callable[[Delivery], Delivery]:
+        """Decorator form of ``register``."""
+
+        def decorator(func: Delivery) -> Delivery:
+            self.register(kind, func)
+            return func
+
+        return decorator
+
+    def set_store(self, store: OutboxStore) -> None:
+        """Attach the backend used once the worker pool is started."""
+        self.store = store
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and self.store is not None
+
+    # --- Submission ---
+
+    async def submit(self, kind: str, payload: Dict[str, Any], dedup_key: str) -> None:
+        """Queue a write, or perform it now if the worker pool isn't running."""
+        if kind not in self._deliveries:
+            raise KeyError(f"no outbox delivery registered for {kind}")
+        if not self.running:
+            self.inline += 1
+            await self._deliveries[kind](payload)
+            return
+        await self.store.put(kind, dedup_key, payload, time.time())
+        self.submitted += 1
+        get_logger("outbox.submit").debug("queued", extra={"kind": kind, "dedup_key": dedup_key})
+        self._wake.set()
+
+    # --- Worker pool ---
+
+    async def start(self, workers: Optional[int] = None) -> None:
+        """Start the poller and ``workers`` delivery tasks."""
+        if self.store is None:
+            raise RuntimeError("outbox store not configured")
+        if self._tasks:
+            return
+        if workers is not None:
+            self.workers = workers
+        self._queue = asyncio.Queue()
+        self._wake = asyncio.Event()
+        self._in_flight = 0
+        self._tasks = [asyncio.create_task(self._poll_loop())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+        get_logger("outbox.start").info("outbox started", extra={"workers": self.workers})
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming, give in-flight deliveries ``timeout`` seconds, then cancel.
+
+        Entries cut off here are retried after their lease expires.
+        """
+        if not self._tasks:
+            return
+        poller, workers = self._tasks[0], self._tasks[1:]
+        poller.cancel()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            get_logger("outbox.stop").warning("deliveries still running at shutdown", extra={"in_flight": self._in_flight})
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(poller, *workers, return_exceptions=True)
+        self._tasks = []
+
+    async def _poll_loop(self) -> None:
+        log = get_logger("outbox.poll")
+        while True:
+            # Cleared before claiming so a submit during the claim isn't missed
+            self._wake.clear()
+            free = self.workers - self._in_flight
+            if free > 0:
+                try:
+                    now = time.time()
+                    for entry in await self.store.claim(free, now, self.lease):
+                        self._in_flight += 1
+                        self._queue.put_nowait(entry)
+                    if now - self._last_purge >= PURGE_INTERVAL:
+                        self._last_purge = now
+                        await self.store.purge(now - self.retention)
+                except Exception:
+                    log.exception("claim failed")
+            try:
+                # Woken by submits and finished deliveries; the timeout picks up retries
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self._queue.get()
+            try:
+                await self._deliver(entry)
+            except Exception:
+                get_logger("outbox.deliver").exception("failed to record outcome", extra={"kind": entry.kind})
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+                self._wake.set()
+
+    async def _deliver(self, entry: OutboxEntry) -> None:
+        log = get_logger("outbox.deliver", {"dedup_key": entry.dedup_key})
+        delivery = self._deliveries.get(entry.kind)
+        try:
+            if delivery is None:
+                raise LookupError(f"no outbox delivery registered for {entry.kind}")
+            await delivery(entry.payload)
+        except Exception as e:
+            attempts = entry.attempts + 1
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, PermanentDeliveryError) or attempts >= self.max_attempts:
+                await self.store.dead(entry, attempts, error, time.time())
+                self.dead_lettered += 1
+                log.error("dead-lettered", extra={"kind": entry.kind, "attempts": attempts, "error": error})
+            else:
+                delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+                await self.store.retry(entry, attempts, time.time() + delay, error, time.time())
+                self.retried += 1
+                log.warning("delivery failed, retrying", extra={"kind": entry.kind, "attempts": attempts, "delay": delay, "error": error})
+            return
+        await self.store.complete(entry, time.time())
+        self.delivered += 1
+        log.debug("delivered", extra={"kind": entry.kind})
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return delivery counters for this process."""
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "submitted": self.submitted,
+            "inline": self.inline,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+# Global outbox; handlers register their deliveries at import
+outbox = Outbox(
+    workers=getattr(Config, "OUTBOX_WORKERS", DEFAULT_WORKERS),
+    max_attempts=getattr(Config, "OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+    retry_base=getattr(Config, "OUTBOX_RETRY_BASE", DEFAULT_RETRY_BASE),
+    retry_max=getattr(Config, "OUTBOX_RETRY_MAX", DEFAULT_RETRY_MAX),
+    poll_interval=getattr(Config, "OUTBOX_POLL_INTERVAL", DEFAULT_POLL_INTERVAL),
+)
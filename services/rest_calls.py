@@ -0,0 +1,107 @@
+"""Count the Discord REST calls each command and survey step makes.
+
+Every bot request goes through ``bot.http.request`` and every interaction
+response or followup through discord.py's shared webhook adapter;
+``RestCallCounter.install`` wraps both and tallies calls under the current
+scope (e.g. ``command:workload_today`` or ``survey:day_off_nextweek``).
+The scope is a context variable, so a callback that calls ``enter`` only
+tags the calls made by its own task.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator
+
+from discord.webhook.async_ import async_context
+
+from services.logging_utils import get_logger
+
+
+DEFAULT_SCOPE = "other"
+
+_scope: ContextVar[str] = ContextVar("discord_rest_scope", default=DEFAULT_SCOPE)
+
+
+class RestCallCounter:
+    """Tally Discord REST calls by scope and route."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+
+    def enter(self, scope: str) -> None:
+        """Tag the rest of the current task's calls with ``scope``."""
+        _scope.set(scope)
+
+    @contextmanager
+    def scope(self, scope: str) -> Iterator[None]:
+        """Tag the calls made inside the ``with`` block with ``scope``."""
+        token = _scope.set(scope)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    def record(self, route: Any) -> None:
+        scope = _scope.get()
+        self.calls[(scope, f"{route.method} {route.path}")] += 1
+        get_logger("rest_calls.record").debug(
+            "discord rest call", extra={"scope": scope, "route": f"{route.method} {route.path}"}
+        )
+
+    def _wrap(self, request: Any) -> Any:
+        if getattr(request, "__rest_counted__", False):
+            return request
+
+        @functools.wraps(request)
+        async def counted(route: Any, *args: Any, **kwargs: Any) -> Any:
+            self.record(route)
+            return await request(route, *args, **kwargs)
+
+        counted.__rest_counted__ = True
+        return counted
+
+    def install(self, bot: Any) -> None:
+        """Start counting the REST calls made by ``bot``.
+
+        Also tags application commands with ``command:<name>`` through the
+        command tree's ``interaction_check``.
+        """
+        bot.http.request = self._wrap(bot.http.request)
+        adapter = async_context.get()
+        adapter.request = self._wrap(adapter.request)
+
+        tree = getattr(bot, "tree", None)
+        if tree is not None and not getattr(tree.interaction_check, "__rest_counted__", False):
+            check = tree.interaction_check
+
+            async def interaction_check(interaction: Any) -> bool:
+                command = getattr(interaction, "command", None)
+                if command is not None:
+                    self.enter(f"command:{command.name}")
+                return await check(interaction)
+
+            interaction_check.__rest_counted__ = True
+            tree.interaction_check = interaction_check
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        by_scope: Counter = Counter()
+        by_route: Counter = Counter()
+        for (scope, route), count in self.calls.items():
+            by_scope[scope] += count
+            by_route[route] += count
+        return {
+            "total": sum(self.calls.values()),
+            "by_scope": dict(by_scope.most_common()),
+            "by_route": dict(by_route.most_common()),
+        }
+
+
+# Installed on the bot in main.py
+rest_calls = RestCallCounter()
@@ -1,7 +1,9 @@
+import asyncio
 from typing import Any, Callable, Awaitable, Dict, Optional
 
 from services.notion_connector import NotionConnector
 from services.survey import survey_manager
+from services.team_directory import team_directory
 from services.cmd import (
     register,
     unregister,
@@ -53,6 +55,50 @@ def parse_prefix(message: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+async def _lookup_user(channel: Optional[str], log: Any) -> Dict[str, Any]:
+    """Return the Team Directory entry for ``channel`` or ``{}``."""
+    user = team_directory.get_by_channel(channel)
+    if user is None:
+        log.debug(f"query team directory for channel {channel}", extra={"channel": channel})
+        result = await _notio.find_team_directory_by_channel(channel)
+        user = result.get("results", [{}])[0] if result.get("results") else {}
+        log.debug("notion response", extra={"user": user})
+        team_directory.remember(user)
+    return user
+
+
+async def bootstrap_survey(channel_id: str, session_id: str) -> Dict[str, Any]:
+    """Collect everything needed to start a survey in one concurrent fan-out.
+
+    The directory lookup (which also yields the ToDo URL) and the pending
+    steps query run side by side. Returns ``registered``, ``steps``,
+    ``todo_url`` and the directory ``user``.
+    """
+    payload = {"command": "check_channel", "channelId": channel_id, "sessionId": session_id}
+    log = get_logger("router.bootstrap_survey", payload)
+    log.info("start bootstrap_survey")
+    user, pending = await asyncio.gather(
+        _lookup_user(channel_id, log),
+        check_channel.handle(payload),
+        return_exceptions=True,
+    )
+    if isinstance(user, BaseException):
+        log.error("team directory lookup failed", exc_info=user)
+        user = {}
+    if isinstance(pending, BaseException):
+        log.error("pending steps query failed", exc_info=pending)
+        pending = {"output": False}
+    registered = bool(user) and pending.get("output") is True
+    result = {
+        "registered": registered,
+        "steps": pending.get("steps", []) if registered else [],
+        "todo_url": user.get("to_do"),
+        "user": user,
+    }
+    log.info("done bootstrap_survey", extra={"registered": registered, "steps": result["steps"]})
+    return result
+
+
 async def dispatch(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Route payloads to internal handlers with contextual logging."""
     ctx = {
@@ -79,10 +125,7 @@ async def dispatch(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         todo_url = None
         channel = payload.get("channelId")
-        log.debug(f"query team directory for channel {channel}", extra={"channel": channel})
-        result = await _notio.find_team_directory_by_channel(payload["channelId"])
-        user = result.get("results", [{}])[0] if result.get("results") else {}
-        log.debug("notion response", extra={"user": user})
+        user = await _lookup_user(channel, log)
         if not user:
             return finalize({"output": "Користувач не знайдений"})
 
@@ -93,6 +136,7 @@ async def dispatch(payload: Dict[str, Any]) -> Dict[str, Any]:
         survey_state = survey_manager.get_survey(channel)
         if survey_state and todo_url:
             survey_state.todo_url = todo_url
+            survey_state.prefetch_todos()
 
         if payload.get("command") == "register":
             if user.get("is_public"):
@@ -103,7 +147,7 @@ async def dispatch(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         user_id = payload.get("userId", "")
         command = payload.get("command")
-        active = any(s.user_id == user_id for s in survey_manager.surveys.values())
+        active = survey_manager.has_survey_for_user(user_id)
         if command == "survey" or (active and command not in HANDLERS):
             step = payload.get("result", {}).get("stepName")
             handler = HANDLERS.get(step)
@@ -1,22 +1,48 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import discord
-from config import logger
+from config import Config, logger
 import asyncio # Import asyncio for cleanup
+import time
+from services.notion_todos import Notion_todos
+from services.notion_connector import NotionConnector, WORKLOAD_MAPPING
+
+# ToDo reminders cover tasks created in this many days
+TODO_LOOKBACK_DAYS = 21
+
+# Author pages prefetched when a survey starts, and the steps that read them
+PREFETCH_PAGES = {
+    "workload": ("workload_today", "workload_nextweek"),
+    "profile_stats": ("connects_thisweek",),
+}
+_PAGE_QUERIES = {
+    "workload": lambda notion, author: notion.get_workload_page_by_name(author, WORKLOAD_MAPPING),
+    "profile_stats": lambda notion, author: notion.get_profile_stats_by_name(author),
+}
+_notion = NotionConnector()
 
 class SurveyFlow:
     """
     Holds a list of survey steps for dynamic surveys.
     Manages the state of a survey in progress.
     """
+    # Assigning any of these triggers a checkpoint through ``_on_change``
+    CHECKPOINT_FIELDS = {
+        "current_index",
+        "todo_url",
+        "current_question_message_id",
+        "buttons_message_id",
+        "start_message_id",
+        "day_off_selection",
+    }
+
     def __init__(self, channel_id: str, steps: List[str], user_id: str, session_id: str):
-        # Existing properties
-        self.active_view: Optional[discord.ui.View] = None  # Add this
         """Initialize survey with required IDs:
         - channel_id: Discord channel ID where survey is running
         - steps: List of survey step names
         - user_id: Discord user ID participating in survey
         - session_id: Combined channel.user ID from initial request
         """
+        self._on_change = None # Set by SurveyManager once the survey is tracked
         logger.debug(f"[{user_id}] - SurveyFlow.__init__ called for user {user_id}, channel {channel_id}, session {session_id} with steps: {steps}") # Added log
         if not channel_id or not user_id or not session_id: # Validate required IDs
             logger.error(f"[{user_id}] - Missing required IDs during SurveyFlow initialization.") # Added log
@@ -28,62 +54,127 @@ class SurveyFlow:
         self.session_id = session_id
         self.current_index = 0
         self.results: Dict[str, Any] = {}
-        self.current_message: Optional[discord.Message] = None # Store the current message object
-        self.buttons_message: Optional[discord.Message] = None
-        self.start_message: Optional[discord.Message] = None
+        # Only IDs are kept; ``message()`` turns them into ``PartialMessage`` handles
+        self.channel: Optional[discord.abc.Messageable] = None
+        self.buttons_message_id: Optional[int] = None
+        self.start_message_id: Optional[int] = None
         self.current_question_message_id: Optional[int] = None
         self.todo_url: Optional[str] = None
+        # Weekday numbers toggled on in each day off step's buttons
+        self.day_off_selection: Dict[str, List[int]] = {}
+        # Wall-clock time of the last question or click; the timeout sweep reads it
+        self.last_activity = time.time()
         logger.info(f"[{user_id}] - Created survey flow for user {user_id} with steps: {steps}") # Modified log
 
-    async def cleanup(self) -> None:
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self.CHECKPOINT_FIELDS:
+            self._changed()
+
+    def _changed(self) -> None:
+        callback = self.__dict__.get("_on_change")
+        if callback:
+            callback(self)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot for the state store."""
+        return {
+            "channel_id": str(self.channel_id),
+            "user_id": str(self.user_id),
+            "session_id": str(self.session_id),
+            "steps": list(self.steps),
+            "current_index": self.current_index,
+            "results": dict(self.results),
+            "todo_url": self.todo_url,
+            "current_question_message_id": self.current_question_message_id,
+            "buttons_message_id": self.buttons_message_id,
+            "start_message_id": self.start_message_id,
+            "day_off_selection": {step: list(days) for step, days in self.day_off_selection.items()},
+            "last_activity": self.last_activity,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SurveyFlow":
+        """Rebuild a survey from a ``to_state`` snapshot.
+
+        No channel is attached yet; pass one to ``message()``/``cleanup()``
+        until the next question is sent.
         """
-        Clean up survey messages with robust error handling.
+        survey = cls(state["channel_id"], list(state.get("steps", [])), state["user_id"], state["session_id"])
+        survey.current_index = int(state.get("current_index", 0))
+        survey.results = dict(state.get("results") or {})
+        survey.todo_url = state.get("todo_url")
+        survey.current_question_message_id = state.get("current_question_message_id")
+        survey.buttons_message_id = state.get("buttons_message_id")
+        survey.start_message_id = state.get("start_message_id")
+        survey.day_off_selection = {
+            step: [int(day) for day in days]
+            for step, days in (state.get("day_off_selection") or {}).items()
+        }
+        survey.last_activity = float(state.get("last_activity") or time.time())
+        return survey
+
+    def message(self, message_id: Optional[int], channel: Optional[discord.abc.Messageable] = None) -> Optional[discord.PartialMessage]:
+        """Return a ``PartialMessage`` for ``message_id`` without fetching it.
+
+        Uses ``channel`` or the channel attached to the survey; returns None
+        when either the ID or a channel is missing.
         """
-        msgs_to_clean = [
-            (self.buttons_message, "buttons_message"),
-            (self.start_message, "start_message"),
-            (None, "question")  # Will try to cleanup by ID if exists
-        ]
+        channel = channel or self.channel
+        if not message_id or channel is None:
+            return None
+        return channel.get_partial_message(int(message_id))
 
-        for msg, msg_type in msgs_to_clean:
-            try:
-                if msg_type == "question": # Handle cleanup by ID if message object is not stored
-                    if not self.current_question_message_id:
-                        continue
-                    channel = self._get_channel() # Get the channel object
-                    if channel:
-                        msg = await channel.fetch_message(self.current_question_message_id)
-
-                if msg:
-                    await msg.delete()
-
-                # Reset ID references
-                if msg_type == "buttons_message":
-                    self.buttons_message = None
-                elif msg_type == "start_message":
-                    self.start_message = None
-                elif msg_type == "question":
-                    self.current_question_message_id = None
+    @property
+    def current_message(self) -> Optional[discord.PartialMessage]:
+        """Handle for the current question message."""
+        return self.message(self.current_question_message_id)
+
+    @current_message.setter
+    def current_message(self, message: Optional[discord.abc.Snowflake]) -> None:
+        # Keep the ID and the channel, not the message payload
+        if message is not None and getattr(message, "channel", None) is not None:
+            self.channel = message.channel
+        self.current_question_message_id = message.id if message is not None else None
+
+    async def cleanup(self, channel: Optional[discord.abc.Messageable] = None) -> None:
+        """
+        Clean up survey messages with robust error handling.
 
+        Messages are deleted through ``PartialMessage`` handles, so nothing
+        is fetched first. ``channel`` is only needed for a survey restored
+        after a restart, e.g. ``bot.get_partial_messageable(int(survey.channel_id))``.
+        """
+        for field in ("buttons_message_id", "start_message_id", "current_question_message_id"):
+            msg = self.message(getattr(self, field), channel)
+            if msg is None:
+                continue
+            try:
+                await msg.delete()
+                setattr(self, field, None) # Reset ID reference
             except discord.NotFound:
-                pass # Message was already deleted
+                setattr(self, field, None) # Message was already deleted
             except discord.Forbidden: # Log permission errors
-                logger.warning(f"No permissions to delete message {msg_type}")
+                logger.warning(f"No permissions to delete message {field}")
             except discord.HTTPException as e: # Log HTTP errors
-                logger.error(f"HTTP error deleting {msg_type}: {e}")
+                logger.error(f"HTTP error deleting {field}: {e}")
             except Exception as e: # Catch any other exceptions
-                logger.error(f"Unexpected error cleaning up {msg_type}: {e}")
+                logger.error(f"Unexpected error cleaning up {field}: {e}")
 
-    def _get_channel(self) -> Optional[discord.TextChannel]:
-        """Get the Discord channel if possible"""
-        try:
-            # This method might not work reliably without the bot instance
-            # Consider passing the bot instance or fetching channel differently if needed
-            # For now, keep as is but be aware of potential limitations
-            client = discord.utils.get(discord.utils.get_all_channels(), id=int(self.channel_id))
-            return client if client and isinstance(client, discord.TextChannel) else None
-        except Exception:
-            return None
+    def toggle_day_off(self, step: str, day: int) -> List[int]:
+        """Flip ``day`` in the selection of day off step ``step`` and return the new selection.
+
+        The selection is reassigned rather than changed in place, so every
+        toggle is checkpointed; clicks never read it back from the message.
+        """
+        days = set(self.day_off_selection.get(step, []))
+        days ^= {day}
+        self.day_off_selection = {**self.day_off_selection, step: sorted(days)}
+        return self.day_off_selection[step]
+
+    def touch(self) -> None:
+        """Record activity on the survey, pushing its timeout back."""
+        self.last_activity = time.time()
 
     def current_step(self) -> Optional[str]:
         """
@@ -129,6 +220,141 @@ class SurveyFlow:
         """
         self.results[step_name] = value
         logger.debug(f"Added result for step {step_name} for user {self.user_id}") # Change to DEBUG
+        self._changed()
+
+    # --- Notion page prefetch ---
+
+    def prefetch_pages(self, author: str) -> None:
+        """Start loading the author's Notion pages that this survey's steps use."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.author = author
+        tasks = self.__dict__.setdefault("_page_tasks", {})
+        for kind, steps in PREFETCH_PAGES.items():
+            if kind in tasks or not any(step in self.steps for step in steps):
+                continue
+            task = loop.create_task(_PAGE_QUERIES[kind](_notion, author))
+            task.add_done_callback(self._page_loaded)
+            tasks[kind] = task
+
+    def _page_loaded(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[{self.session_id}] - Notion page prefetch failed: {task.exception()}")
+
+    async def prefetched_page(self, kind: str, author: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the prefetched ``kind`` page for ``author``, or ``None`` on a miss.
+
+        Waits at most ``timeout`` seconds for a fetch still in flight; failed
+        or empty lookups count as misses so callers query Notion themselves.
+        """
+        task = self.__dict__.get("_page_tasks", {}).get(kind)
+        if task is None or getattr(self, "author", None) != author:
+            return None
+        try:
+            data = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except Exception:
+            return None
+        results = data.get("results", []) if isinstance(data, dict) else []
+        return results[0] if results else None
+
+    # --- ToDo prefetch ---
+    # The ToDo reminder shown by ``finish_survey`` is the slowest Notion call
+    # in the flow, so it starts as soon as ``todo_url`` is known and the
+    # result is kept on the survey.
+
+    def prefetch_todos(self) -> Optional[asyncio.Task]:
+        """Start loading the ToDo reminder for ``todo_url`` in the background.
+
+        The task is memoised per URL; returns ``None`` without a URL or loop.
+        """
+        if not self.todo_url:
+            return None
+        task = self.__dict__.get("_todo_task")
+        if task is not None and self.__dict__.get("_todo_task_url") == self.todo_url:
+            return task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if task is not None:
+            task.cancel()
+        task = loop.create_task(self._load_todos(self.todo_url))
+        task.add_done_callback(self._todos_loaded)
+        self._todo_task = task
+        self._todo_task_url = self.todo_url
+        return task
+
+    async def _load_todos(self, todo_url: str) -> str:
+        return await Notion_todos(todo_url, TODO_LOOKBACK_DAYS).get_tasks_text(user_id=self.user_id)
+
+    def _todos_loaded(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[{self.session_id}] - ToDo prefetch failed: {task.exception()}")
+
+    def todos_ready(self) -> bool:
+        """Whether a prefetched ToDo reminder is available without waiting."""
+        task = self.__dict__.get("_todo_task")
+        return bool(
+            task is not None
+            and self.__dict__.get("_todo_task_url") == self.todo_url
+            and task.done()
+            and not task.cancelled()
+            and task.exception() is None
+        )
+
+    async def todos_text(self, timeout: float) -> Optional[str]:
+        """Return the ToDo reminder JSON, waiting at most ``timeout`` seconds.
+
+        Starts the fetch if it wasn't prefetched. Returns ``None`` when there
+        is no URL or the wait times out; fetch errors are raised.
+        """
+        task = self.prefetch_todos()
+        if task is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def cancel_todo_prefetch(self) -> None:
+        tasks = [self.__dict__.get("_todo_task"), *self.__dict__.get("_page_tasks", {}).values()]
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+
+    # --- Interaction handoff ---
+    # Views and modals call ``begin_interaction`` before submitting a step and
+    # ``end_interaction`` once their interaction response is finished. Survey
+    # continuation waits on this signal instead of a fixed delay.
+
+    def begin_interaction(self) -> None:
+        """Mark that a view is still responding to the current step."""
+        event = self.__dict__.get("_interaction_done")
+        if event is None:
+            event = self._interaction_done = asyncio.Event()
+        event.clear()
+
+    def end_interaction(self) -> None:
+        """Signal that the view has finished responding to the current step."""
+        event = self.__dict__.get("_interaction_done")
+        if event is not None:
+            event.set()
+
+    async def wait_for_interaction(self, timeout: float) -> bool:
+        """Wait until the current interaction is finished.
+
+        Returns ``False`` if ``timeout`` seconds pass first.
+        """
+        event = self.__dict__.get("_interaction_done")
+        if event is None or event.is_set():
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
 
 class SurveyManager:
@@ -138,8 +364,102 @@ class SurveyManager:
     def __init__(self):
         """Initialize the survey manager."""
         self.surveys: Dict[str, SurveyFlow] = {} # Use channel_id as key
+        # Secondary indexes pointing back into ``surveys`` so lookups by
+        # session or user don't scan every active survey. ``surveys`` stays the
+        # source of truth; index hits are checked against it before use.
+        self._by_session: Dict[str, str] = {} # session_id -> channel_id
+        self._by_user: Dict[str, Set[str]] = {} # user_id -> channel_ids
+        # Optional durable backend (see services.survey_store). Writes are
+        # queued per channel so only the latest snapshot is persisted and
+        # transitions stay synchronous for callers.
+        self.store = None
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {} # channel_id -> state, None = delete
+        self._writers: Dict[str, asyncio.Task] = {}
 
-    def create_survey(self, user_id: str, channel_id: str, steps: List[str], session_id: str) -> SurveyFlow:
+    # --- Persistence ---
+
+    def set_store(self, store: Any) -> None:
+        """Attach a ``SurveyStateStore`` used for checkpoints and rehydration."""
+        self.store = store
+
+    def checkpoint(self, survey: SurveyFlow) -> None:
+        """Queue a snapshot of ``survey`` for the state store."""
+        if self.store is None or self.surveys.get(str(survey.channel_id)) is not survey:
+            return
+        self._queue_write(str(survey.channel_id), survey.to_state())
+
+    def _queue_write(self, channel_id: str, state: Optional[Dict[str, Any]]) -> None:
+        if self.store is None:
+            return
+        self._pending[channel_id] = state
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return # No loop yet; flush() will persist it
+        writer = self._writers.get(channel_id)
+        if writer is None or writer.done():
+            self._writers[channel_id] = loop.create_task(self._write_loop(channel_id))
+
+    async def _write_loop(self, channel_id: str) -> None:
+        while channel_id in self._pending:
+            state = self._pending.pop(channel_id)
+            try:
+                if state is None:
+                    await self.store.delete(channel_id)
+                else:
+                    await self.store.save(channel_id, state)
+            except Exception as e:
+                logger.error(f"Failed to checkpoint survey for channel {channel_id}: {e}")
+        self._writers.pop(channel_id, None)
+
+    async def flush(self) -> None:
+        """Wait until every queued checkpoint has been written."""
+        writers = [t for t in self._writers.values() if not t.done()]
+        if writers:
+            await asyncio.gather(*writers, return_exceptions=True)
+        for channel_id in list(self._pending):
+            await self._write_loop(channel_id)
+
+    async def rehydrate(self, max_age: Optional[float] = None) -> int:
+        """Restore active surveys from the store; returns how many were loaded."""
+        if self.store is None:
+            return 0
+        restored = 0
+        for state in await self.store.load_all(max_age):
+            try:
+                survey = SurveyFlow.from_state(state)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable survey state {state}: {e}")
+                continue
+            channel_id = str(survey.channel_id)
+            if survey.is_done() or channel_id in self.surveys:
+                if channel_id not in self.surveys:
+                    self._queue_write(channel_id, None)
+                continue
+            survey._on_change = self.checkpoint
+            self.surveys[channel_id] = survey
+            self._index(survey)
+            restored += 1
+        logger.info(f"Rehydrated {restored} surveys from state store")
+        return restored
+
+    def _index(self, survey: SurveyFlow) -> None:
+        channel_id = str(survey.channel_id)
+        self._by_session[str(survey.session_id)] = channel_id
+        self._by_user.setdefault(str(survey.user_id), set()).add(channel_id)
+
+    def _unindex(self, survey: SurveyFlow) -> None:
+        channel_id = str(survey.channel_id)
+        session_id = str(survey.session_id)
+        if self._by_session.get(session_id) == channel_id:
+            del self._by_session[session_id]
+        channels = self._by_user.get(str(survey.user_id))
+        if channels is not None:
+            channels.discard(channel_id)
+            if not channels:
+                del self._by_user[str(survey.user_id)]
+
+    def create_survey(self, user_id: str, channel_id: str, steps: List[str], session_id: str, author: Optional[str] = None) -> SurveyFlow:
         """Create and track a new survey instance.
 
         Args:
@@ -147,6 +467,8 @@ class SurveyManager:
         channel_id: Discord channel ID
         steps: List of survey step names
         session_id: Combined channel.user ID from initial request
+        author: Team Directory name; when given, the Notion pages the
+            steps need are prefetched
 
         Returns:
             The created SurveyFlow instance
@@ -159,7 +481,15 @@ class SurveyManager:
 
         try:
             survey = SurveyFlow(channel_id, steps, user_id, session_id)
+            previous = self.surveys.get(str(channel_id))
+            if previous:
+                self._unindex(previous) # Replaced survey must not stay reachable
             self.surveys[str(channel_id)] = survey # Use channel_id as key
+            self._index(survey)
+            survey._on_change = self.checkpoint
+            self.checkpoint(survey)
+            if author:
+                survey.prefetch_pages(author)
             logger.info(f"Created new survey for channel {channel_id}") # Log survey creation
             return survey
         except Exception as e:
@@ -183,23 +513,62 @@ class SurveyManager:
     def get_survey_by_session(self, session_id: str) -> Optional[SurveyFlow]:
         """Get survey by session ID."""
         # This method is still needed for the timeout handler
-        for survey in self.surveys.values():
-            if survey.session_id == session_id:
-                return survey
-        pass # No survey found for session ID {session_id}
+        channel_id = self._by_session.get(str(session_id))
+        if channel_id is None:
+            return None # No survey found for session ID {session_id}
+        survey = self.surveys.get(channel_id)
+        if survey and str(survey.session_id) == str(session_id):
+            return survey
+        del self._by_session[str(session_id)] # Stale entry, survey dropped outside the manager
         return None
 
+    def get_surveys_by_user(self, user_id: str) -> List[SurveyFlow]:
+        """Get all active surveys for a Discord user ID."""
+        channels = self._by_user.get(str(user_id))
+        if not channels:
+            return []
+        found = []
+        for channel_id in list(channels):
+            survey = self.surveys.get(channel_id)
+            if survey and str(survey.user_id) == str(user_id):
+                found.append(survey)
+            else:
+                channels.discard(channel_id) # Stale entry
+        if not channels:
+            del self._by_user[str(user_id)]
+        return found
+
+    def has_survey_for_user(self, user_id: str) -> bool:
+        """Return True if the user has at least one active survey."""
+        return bool(self.get_surveys_by_user(user_id))
+
+    def stale(self, timeout: float, now: Optional[float] = None) -> List[SurveyFlow]:
+        """Return the surveys with no activity in the last ``timeout`` seconds."""
+        deadline = (time.time() if now is None else now) - timeout
+        return [survey for survey in self.surveys.values() if survey.last_activity < deadline]
+
+    async def prefetched_page(self, channel_id: Any, kind: str, author: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a page prefetched for the survey in ``channel_id``, if any."""
+        survey = self.surveys.get(str(channel_id))
+        if survey is None or not author:
+            return None
+        timeout = getattr(Config, "NOTION_PREFETCH_TIMEOUT", 5.0)
+        return await survey.prefetched_page(kind, author, timeout)
+
     def remove_survey(self, channel_id: str) -> None:
         """Remove a survey for a channel.
 
         Args:
             channel_id: The Discord channel ID
         """
+        channel_id = str(channel_id)
         survey = self.surveys.get(channel_id)
         if survey:
-            if survey.active_view:
-                survey.active_view.stop()
             del self.surveys[channel_id]
+            self._unindex(survey)
+            survey.cancel_todo_prefetch()
+            survey._on_change = None
+            self._queue_write(channel_id, None)
             logger.info(f"Removed survey for channel {channel_id}") # Log survey removal
         else:
             pass # Attempted to remove survey for channel {channel_id}, but none was found.
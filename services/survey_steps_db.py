@@ -1,16 +1,54 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Dict, Any, Optional
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple
 
 from databases import Database
 
 
+DEFAULT_MIN_SIZE = 1
+DEFAULT_MAX_SIZE = 5
+DEFAULT_ACQUIRE_TIMEOUT = 10.0
+# Rows per INSERT in ``upsert_steps``; 3 params per row keeps the statement
+# under SQLite's default 999 bound-parameter limit.
+UPSERT_BATCH_SIZE = 300
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+
 class SurveyStepsDB:
     """Asynchronous interface to the ``n8n_survey_steps_missed`` table."""
 
-    def __init__(self, database_url: str, db: Optional[Database] = None) -> None:
+    def __init__(
+        self,
+        database_url: str,
+        db: Optional[Database] = None,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_size: int = DEFAULT_MAX_SIZE,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+    ) -> None:
         self.database_url = database_url
-        self.db = db or Database(database_url)
+        if db is None:
+            options: Dict[str, Any] = {}
+            if database_url.startswith("postgres"):
+                # asyncpg pool bounds; the sqlite backend rejects these
+                options = {"min_size": min_size, "max_size": max_size}
+            db = Database(database_url, **options)
+        self.db = db
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        # Mirrors the pool size so in-use/wait metrics match the real pool
+        self._slots = asyncio.Semaphore(max_size)
+        self._in_use = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
 
     async def _connect(self) -> None:
         if not self.db.is_connected:
@@ -20,24 +58,99 @@ class SurveyStepsDB:
         if self.db.is_connected:
             await self.db.disconnect()
 
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[None]:
+        """Hold one pool slot for the duration of a query."""
+
+        await self._connect()
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise PoolTimeoutError(
+                f"no database connection available after {self.acquire_timeout}s"
+            )
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - started
+        self._acquired += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._in_use += 1
+        try:
+            yield
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return pool usage counters."""
+
+        return {
+            "in_use": self._in_use,
+            "max_size": self.max_size,
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "acquire_timeouts": self._timeouts,
+            "wait_time_total": self._wait_total,
+            "wait_time_max": self._wait_max,
+            "wait_time_avg": self._wait_total / self._acquired if self._acquired else 0.0,
+        }
+
     async def upsert_step(self, session_id: str, step_name: str, completed: bool) -> Dict[str, str]:
         """Insert or update a step record for a session."""
 
-        await self._connect()
         query = (
             "INSERT INTO n8n_survey_steps_missed (session_id, step_name, completed, updated) "
             "VALUES (:session_id, :step_name, :completed, CURRENT_TIMESTAMP) "
             "ON CONFLICT (session_id, step_name) DO UPDATE SET "
             "completed = excluded.completed, updated = excluded.updated"
         )
-        await self.db.execute(query, {"session_id": session_id, "step_name": step_name, "completed": completed})
+        async with self._acquire():
+            await self.db.execute(query, {"session_id": session_id, "step_name": step_name, "completed": completed})
         return {"status": "ok"}
 
+    async def upsert_steps(self, records: Iterable[Tuple[str, str, bool]]) -> Dict[str, Any]:
+        """Insert or update many ``(session_id, step_name, completed)`` rows.
+
+        Rows are sent as multi-row ``VALUES`` statements inside one
+        transaction with the same ``ON CONFLICT`` behaviour as ``upsert_step``.
+        When a key appears more than once the last value wins, since Postgres
+        refuses to update the same row twice in one statement.
+        """
+
+        latest: Dict[Tuple[str, str], bool] = {}
+        for session_id, step_name, completed in records:
+            latest[(session_id, step_name)] = completed
+        rows = [(key[0], key[1], completed) for key, completed in latest.items()]
+        if not rows:
+            return {"status": "ok", "count": 0}
+
+        async with self._acquire():
+            async with self.db.transaction():
+                for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                    chunk = rows[start:start + UPSERT_BATCH_SIZE]
+                    values = []
+                    params: Dict[str, Any] = {}
+                    for i, (session_id, step_name, completed) in enumerate(chunk):
+                        values.append(f"(:session_id_{i}, :step_name_{i}, :completed_{i}, CURRENT_TIMESTAMP)")
+                        params[f"session_id_{i}"] = session_id
+                        params[f"step_name_{i}"] = step_name
+                        params[f"completed_{i}"] = completed
+                    query = (
+                        "INSERT INTO n8n_survey_steps_missed (session_id, step_name, completed, updated) "
+                        f"VALUES {', '.join(values)} "
+                        "ON CONFLICT (session_id, step_name) DO UPDATE SET "
+                        "completed = excluded.completed, updated = excluded.updated"
+                    )
+                    await self.db.execute(query, params)
+        return {"status": "ok", "count": len(rows)}
+
     async def fetch_week(self, session_id: str, week_start: Any) -> List[Dict[str, Any]]:
         """Return statuses for a session from the given week start."""
 
-        await self._connect()
-
         params = {"session_id": session_id, "week_start": week_start}
 
         if self.database_url.startswith("postgres"):
@@ -57,7 +170,8 @@ class SurveyStepsDB:
                 ") AS ranked WHERE rn = 1 ORDER BY step_name"
             )
 
-        rows = await self.db.fetch_all(query, params)
+        async with self._acquire():
+            rows = await self.db.fetch_all(query, params)
         return [dict(r) for r in rows]
 
     async def pending_steps(self, session_id: str, week_start: Any, all_steps: Iterable[str]) -> List[str]:
@@ -67,3 +181,120 @@ class SurveyStepsDB:
         done = {r["step_name"] for r in records if r["completed"]}
         return [s for s in all_steps if s not in done]
 
+    async def fetch_week_many(
+        self, session_ids: Iterable[str], week_start: Any
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Return ``fetch_week`` results for many sessions in one query.
+
+        Every requested session is present in the result, with an empty list
+        when it has no records for the week.
+        """
+
+        ids = list(dict.fromkeys(str(s) for s in session_ids))
+        result: Dict[str, List[Dict[str, Any]]] = {s: [] for s in ids}
+        if not ids:
+            return result
+
+        params: Dict[str, Any] = {"week_start": week_start}
+        placeholders = []
+        for i, session_id in enumerate(ids):
+            placeholders.append(f":session_id_{i}")
+            params[f"session_id_{i}"] = session_id
+        in_clause = ", ".join(placeholders)
+
+        if self.database_url.startswith("postgres"):
+            query = (
+                "SELECT DISTINCT ON (session_id, step_name) session_id, step_name, completed, updated "
+                "FROM n8n_survey_steps_missed "
+                f"WHERE session_id IN ({in_clause}) AND updated >= :week_start "
+                "ORDER BY session_id, step_name, updated DESC"
+            )
+        else:
+            query = (
+                "SELECT session_id, step_name, completed, updated FROM ("
+                "SELECT session_id, step_name, completed, updated, "
+                "ROW_NUMBER() OVER (PARTITION BY session_id, step_name ORDER BY updated DESC) AS rn "
+                "FROM n8n_survey_steps_missed "
+                f"WHERE session_id IN ({in_clause}) AND updated >= :week_start"
+                ") AS ranked WHERE rn = 1 ORDER BY session_id, step_name"
+            )
+
+        async with self._acquire():
+            rows = await self.db.fetch_all(query, params)
+        for row in rows:
+            record = dict(row)
+            session_id = record.pop("session_id")
+            result.setdefault(session_id, []).append(record)
+        return result
+
+    async def pending_steps_many(
+        self, session_ids: Iterable[str], week_start: Any, all_steps: Iterable[str]
+    ) -> Dict[str, List[str]]:
+        """Return ``pending_steps`` for many sessions with a single query."""
+
+        steps = list(all_steps)
+        weekly = await self.fetch_week_many(session_ids, week_start)
+        pending: Dict[str, List[str]] = {}
+        for session_id, records in weekly.items():
+            done = {r["step_name"] for r in records if r["completed"]}
+            pending[session_id] = [s for s in steps if s not in done]
+        return pending
+
+
+# Process-wide instance shared by every handler
+_shared: Optional[SurveyStepsDB] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_steps_db(database_url: str) -> SurveyStepsDB:
+    """Return the shared pooled ``SurveyStepsDB`` for ``database_url``.
+
+    The instance is normally created by ``init_steps_db`` at startup; calling
+    this first creates it lazily with default pool sizes.
+    """
+
+    global _shared, _shared_loop
+    if not database_url:
+        raise RuntimeError("DATABASE_URL not configured")
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    stale_loop = loop is not None and _shared_loop is not None and _shared_loop is not loop
+    if _shared is None or _shared.database_url != database_url or stale_loop:
+        _shared = SurveyStepsDB(database_url)
+        _shared_loop = loop
+    elif _shared_loop is None:
+        _shared_loop = loop
+    return _shared
+
+
+async def init_steps_db(
+    database_url: str,
+    min_size: int = DEFAULT_MIN_SIZE,
+    max_size: int = DEFAULT_MAX_SIZE,
+    acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+) -> SurveyStepsDB:
+    """Create and connect the shared pool; called once at startup."""
+
+    global _shared, _shared_loop
+    await close_steps_db()
+    _shared = SurveyStepsDB(
+        database_url,
+        min_size=min_size,
+        max_size=max_size,
+        acquire_timeout=acquire_timeout,
+    )
+    _shared_loop = asyncio.get_running_loop()
+    await _shared._connect()
+    return _shared
+
+
+async def close_steps_db() -> None:
+    """Disconnect the shared pool; called at shutdown."""
+
+    global _shared, _shared_loop
+    if _shared is not None:
+        await _shared.close()
+    _shared = None
+    _shared_loop = None
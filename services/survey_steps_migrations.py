@@ -0,0 +1,169 @@
+"""Schema migrations for the survey tables (``n8n_survey_steps_missed``,
+``survey_state``) and the ``outbox`` of queued external writes.
+
+Migrations are plain SQL statements per dialect, applied in order and
+recorded in ``survey_steps_schema_version`` so each runs once.  Every
+statement is idempotent (``IF NOT EXISTS``), which keeps the first run safe
+against databases created before versioning existed.  ``main.py`` runs
+``migrate`` right after opening the shared pool.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple
+
+from services.logging_utils import get_logger
+from services.survey_steps_db import SurveyStepsDB
+
+
+VERSION_TABLE = "survey_steps_schema_version"
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    statements: Dict[str, List[str]]  # dialect -> SQL statements
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "create n8n_survey_steps_missed",
+        {
+            "postgres": [
+                "CREATE TABLE IF NOT EXISTS n8n_survey_steps_missed ("
+                "id SERIAL PRIMARY KEY, "
+                "session_id TEXT NOT NULL, "
+                "step_name TEXT NOT NULL, "
+                "completed BOOLEAN NOT NULL, "
+                "updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                "UNIQUE (session_id, step_name))"
+            ],
+            "sqlite": [
+                "CREATE TABLE IF NOT EXISTS n8n_survey_steps_missed ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "session_id TEXT NOT NULL, "
+                "step_name TEXT NOT NULL, "
+                "completed BOOLEAN NOT NULL, "
+                "updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                "UNIQUE (session_id, step_name))"
+            ],
+        },
+    ),
+    Migration(
+        2,
+        "index session_id, step_name, updated for fetch_week",
+        {
+            "postgres": [
+                "CREATE INDEX IF NOT EXISTS idx_survey_steps_session_step_updated "
+                "ON n8n_survey_steps_missed (session_id, step_name, updated DESC)"
+            ],
+            "sqlite": [
+                "CREATE INDEX IF NOT EXISTS idx_survey_steps_session_step_updated "
+                "ON n8n_survey_steps_missed (session_id, step_name, updated DESC)"
+            ],
+        },
+    ),
+    Migration(
+        3,
+        "create survey_state for in-flight survey checkpoints",
+        {
+            "postgres": [
+                "CREATE TABLE IF NOT EXISTS survey_state ("
+                "channel_id TEXT PRIMARY KEY, "
+                "state TEXT NOT NULL, "
+                "updated_at DOUBLE PRECISION NOT NULL)"
+            ],
+            "sqlite": [
+                "CREATE TABLE IF NOT EXISTS survey_state ("
+                "channel_id TEXT PRIMARY KEY, "
+                "state TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            ],
+        },
+    ),
+    Migration(
+        4,
+        "create outbox for queued external writes",
+        {
+            "postgres": [
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id BIGSERIAL PRIMARY KEY, "
+                "kind TEXT NOT NULL, "
+                "dedup_key TEXT NOT NULL UNIQUE, "
+                "payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "version INTEGER NOT NULL DEFAULT 1, "
+                "next_attempt_at DOUBLE PRECISION NOT NULL, "
+                "last_error TEXT, "
+                "created_at DOUBLE PRECISION NOT NULL, "
+                "updated_at DOUBLE PRECISION NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS idx_outbox_status_next_attempt "
+                "ON outbox (status, next_attempt_at)",
+            ],
+            "sqlite": [
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "kind TEXT NOT NULL, "
+                "dedup_key TEXT NOT NULL UNIQUE, "
+                "payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "version INTEGER NOT NULL DEFAULT 1, "
+                "next_attempt_at REAL NOT NULL, "
+                "last_error TEXT, "
+                "created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS idx_outbox_status_next_attempt "
+                "ON outbox (status, next_attempt_at)",
+            ],
+        },
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _dialect(db: SurveyStepsDB) -> str:
+    return "postgres" if db.database_url.startswith("postgres") else "sqlite"
+
+
+async def current_version(db: SurveyStepsDB) -> int:
+    """Return the highest applied migration version, creating the tracker."""
+
+    async with db._acquire():
+        await db.db.execute(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "description TEXT NOT NULL, "
+            "applied TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        version = await db.db.fetch_val(f"SELECT MAX(version) FROM {VERSION_TABLE}")
+    return int(version or 0)
+
+
+async def migrate(db: SurveyStepsDB) -> int:
+    """Apply pending migrations and return the resulting schema version."""
+
+    log = get_logger("survey_steps.migrate")
+    version = await current_version(db)
+    dialect = _dialect(db)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        async with db._acquire():
+            async with db.db.transaction():
+                for statement in migration.statements[dialect]:
+                    await db.db.execute(statement)
+                await db.db.execute(
+                    f"INSERT INTO {VERSION_TABLE} (version, description) "
+                    "VALUES (:version, :description) ON CONFLICT (version) DO NOTHING",
+                    {"version": migration.version, "description": migration.description},
+                )
+        version = migration.version
+        log.info(
+            "migration applied",
+            extra={"version": migration.version, "description": migration.description},
+        )
+    return version
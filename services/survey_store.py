@@ -0,0 +1,99 @@
+"""Pluggable persistence for in-flight ``SurveyFlow`` state.
+
+``SurveyManager`` checkpoints a JSON snapshot of every survey on each
+transition and rehydrates active surveys from the store on startup, so a
+deploy or crash doesn't drop surveys half way through.
+
+Two backends are provided:
+
+* ``MemorySurveyStore`` keeps snapshots in a dict (tests, local runs).
+* ``DatabaseSurveyStore`` writes them to the ``survey_state`` table created by
+  ``services.survey_steps_migrations`` through the shared ``SurveyStepsDB``
+  pool, so it works on both Postgres and SQLite.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - avoid requiring ``databases`` at import
+    from services.survey_steps_db import SurveyStepsDB
+
+
+class SurveyStateStore(ABC):
+    """Interface for survey state backends."""
+
+    @abstractmethod
+    async def save(self, channel_id: str, state: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, channel_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def load_all(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return stored states, skipping ones older than ``max_age`` seconds."""
+
+
+class MemorySurveyStore(SurveyStateStore):
+    """Keep survey snapshots in process memory."""
+
+    def __init__(self) -> None:
+        self.states: Dict[str, tuple[float, Dict[str, Any]]] = {}
+
+    async def save(self, channel_id: str, state: Dict[str, Any]) -> None:
+        # Round-trip through JSON so stored state can't alias live objects
+        self.states[channel_id] = (time.time(), json.loads(json.dumps(state, default=str)))
+
+    async def delete(self, channel_id: str) -> None:
+        self.states.pop(channel_id, None)
+
+    async def load_all(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        cutoff = time.time() - max_age if max_age else None
+        return [
+            dict(state)
+            for updated, state in self.states.values()
+            if cutoff is None or updated >= cutoff
+        ]
+
+
+class DatabaseSurveyStore(SurveyStateStore):
+    """Store survey snapshots in the ``survey_state`` table."""
+
+    def __init__(self, steps_db: SurveyStepsDB) -> None:
+        self.steps_db = steps_db
+
+    async def save(self, channel_id: str, state: Dict[str, Any]) -> None:
+        query = (
+            "INSERT INTO survey_state (channel_id, state, updated_at) "
+            "VALUES (:channel_id, :state, :updated_at) "
+            "ON CONFLICT (channel_id) DO UPDATE SET "
+            "state = excluded.state, updated_at = excluded.updated_at"
+        )
+        params = {
+            "channel_id": channel_id,
+            "state": json.dumps(state, default=str),
+            "updated_at": time.time(),
+        }
+        async with self.steps_db._acquire():
+            await self.steps_db.db.execute(query, params)
+
+    async def delete(self, channel_id: str) -> None:
+        async with self.steps_db._acquire():
+            await self.steps_db.db.execute(
+                "DELETE FROM survey_state WHERE channel_id = :channel_id",
+                {"channel_id": channel_id},
+            )
+
+    async def load_all(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        cutoff = time.time() - max_age if max_age else 0.0
+        async with self.steps_db._acquire():
+            rows = await self.steps_db.db.fetch_all(
+                "SELECT state FROM survey_state WHERE updated_at >= :cutoff",
+                {"cutoff": cutoff},
+            )
+        return [json.loads(r["state"]) for r in rows]
@@ -0,0 +1,202 @@
+"""In-memory index of the Notion Team Directory.
+
+``router.dispatch`` needs the Team Directory entry for the channel on every
+payload.  Instead of querying Notion each time, the whole directory is loaded
+with a paginated query at startup, refreshed periodically in the background and
+patched in place whenever ``register``/``unregister`` write new IDs.
+
+Until the first full load succeeds the index is considered cold and callers
+fall back to live Notion lookups.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from services.logging_utils import get_logger
+from services.notion_connector import NotionConnector
+
+
+DEFAULT_REFRESH_INTERVAL = 300
+
+
+def _key(value: Any) -> str:
+    return str(value or "").strip()
+
+
+class TeamDirectoryIndex:
+    """Team Directory entries keyed by channel ID, Discord ID and name."""
+
+    def __init__(
+        self,
+        connector: Optional[NotionConnector] = None,
+        refresh_interval: Optional[int] = None,
+    ) -> None:
+        self.connector = connector
+        self.refresh_interval = refresh_interval
+        self.loaded = False
+        self.last_refresh: Optional[float] = None
+        self._by_page: Dict[str, Dict[str, Any]] = {}
+        self._by_channel: Dict[str, str] = {}
+        self._by_discord_id: Dict[str, str] = {}
+        self._by_name: Dict[str, str] = {}
+        # page_id -> (timestamp, fields) for writes made by this process
+        self._writes: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # --- Lookups ---
+
+    def _lookup(self, index: Dict[str, str], value: Any) -> Optional[Dict[str, Any]]:
+        if not self.loaded:
+            return None
+        page_id = index.get(_key(value))
+        record = self._by_page.get(page_id) if page_id else None
+        return dict(record) if record else None
+
+    def get_by_channel(self, channel_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the entry registered to ``channel_id`` or ``None``."""
+        return self._lookup(self._by_channel, channel_id)
+
+    def get_by_discord_id(self, discord_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the entry for a Discord user ID or ``None``."""
+        return self._lookup(self._by_discord_id, discord_id)
+
+    def get_by_name(self, name: Any) -> Optional[Dict[str, Any]]:
+        """Return the entry with the given Team Directory name or ``None``."""
+        return self._lookup(self._by_name, name)
+
+    def __len__(self) -> int:
+        return len(self._by_page)
+
+    # --- Mutation ---
+
+    def _unindex(self, page_id: str) -> None:
+        old = self._by_page.pop(page_id, None)
+        if not old:
+            return
+        for index, field in (
+            (self._by_channel, "channel_id"),
+            (self._by_discord_id, "discord_id"),
+            (self._by_name, "name"),
+        ):
+            key = _key(old.get(field))
+            if key and index.get(key) == page_id:
+                del index[key]
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        page_id = _key(record.get("id"))
+        if not page_id:
+            return
+        self._unindex(page_id)
+        self._by_page[page_id] = record
+        for index, field in (
+            (self._by_channel, "channel_id"),
+            (self._by_discord_id, "discord_id"),
+            (self._by_name, "name"),
+        ):
+            key = _key(record.get(field))
+            if key:
+                index[key] = page_id
+
+    def remember(self, record: Optional[Dict[str, Any]]) -> None:
+        """Merge an entry obtained from a live lookup into a warm index."""
+        if self.loaded and record and record.get("id"):
+            self._index(dict(record))
+
+    def _write(self, page_id: str, fields: Dict[str, Any], record: Optional[Dict[str, Any]] = None) -> None:
+        self._writes[page_id] = (time.monotonic(), fields)
+        if not self.loaded:
+            return
+        current = dict(self._by_page.get(page_id) or record or {"id": page_id})
+        current.update(fields)
+        self._index(current)
+
+    def update_ids(
+        self,
+        page_id: str,
+        discord_id: str,
+        channel_id: str,
+        record: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Apply a successful ``update_team_directory_ids`` write locally."""
+        if page_id:
+            self._write(page_id, {"discord_id": discord_id, "channel_id": channel_id}, record)
+
+    def clear_channel(self, page_id: str) -> None:
+        """Apply a successful ``clear_team_directory_ids`` write locally."""
+        if page_id:
+            self._write(page_id, {"channel_id": ""})
+
+    # --- Loading ---
+
+    def _get_connector(self) -> NotionConnector:
+        if self.connector is None:
+            self.connector = NotionConnector()
+        return self.connector
+
+    async def refresh(self) -> int:
+        """Reload the whole directory from Notion and return the entry count."""
+        log = get_logger("team_directory.refresh")
+        started = time.monotonic()
+        data = await self._get_connector().list_team_directory()
+        records: List[Dict[str, Any]] = data.get("results", [])
+
+        self._by_page.clear()
+        self._by_channel.clear()
+        self._by_discord_id.clear()
+        self._by_name.clear()
+        for record in records:
+            self._index(dict(record))
+
+        # Writes made while the query was in flight are newer than the snapshot
+        for page_id, (ts, fields) in list(self._writes.items()):
+            if ts >= started:
+                current = dict(self._by_page.get(page_id) or {"id": page_id})
+                current.update(fields)
+                self._index(current)
+            else:
+                del self._writes[page_id]
+
+        self.loaded = True
+        self.last_refresh = time.time()
+        log.info("team directory loaded", extra={"entries": len(self._by_page)})
+        return len(self._by_page)
+
+    async def _refresh_loop(self, interval: int) -> None:
+        log = get_logger("team_directory.refresh")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                log.exception("background refresh failed")
+
+    async def start(self) -> None:
+        """Load the index and start the background refresh task."""
+        log = get_logger("team_directory.start")
+        try:
+            await self.refresh()
+        except Exception:
+            log.exception("initial load failed, using live lookups")
+        interval = self.refresh_interval or getattr(
+            Config, "TEAM_DIRECTORY_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL
+        )
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop(interval))
+
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# Global Team Directory index instance
+team_directory = TeamDirectoryIndex()
@@ -1,8 +1,8 @@
 import asyncio
 import discord
-from typing import Dict, Any, Tuple, Optional, Union
+from typing import Dict, Any, Tuple, Optional, Union, Set
 from discord.ext import commands
-from config import logger, Strings
+from config import Config, logger, Strings
 from services.session import session_manager
 from services.survey import survey_manager
 from . import router
@@ -32,6 +32,8 @@ class WebhookService:
 
     def __init__(self):
         logger.info("Initializing WebhookService")
+        # Background continuations, kept referenced until they finish
+        self._continuations: Set[asyncio.Task] = set()
 
     def build_payload(
         self,
@@ -198,40 +200,56 @@ class WebhookService:
         if success and data and "survey" in data and data["survey"] == "continue":
             user_id = payload['userId'] # Get user_id from payload
             logger.info(f"[SurveyContinuation] n8n requested survey continuation for user {user_id}")
-            try:
-                # Add a small delay to ensure the current interaction is complete
-                await asyncio.sleep(1)
+            state = survey_manager.get_survey(channel_id) if channel_id else None
+            if state is None and SURVEYS is not None and user_id in SURVEYS:
+                state = SURVEYS[user_id]
+            if state is None:
+                logger.warning(f"[SurveyContinuation] Survey state not found for user {user_id} when trying to continue.")
+            else:
+                # Continue once the view's interaction response is finished,
+                # without holding up the caller
+                task = asyncio.create_task(
+                    self._continue_survey(channel, state, user_id, state.current_index)
+                )
+                self._continuations.add(task)
+                task.add_done_callback(self._continuations.discard)
+        logger.info(f"send_webhook returning: success={success}, data={data}") # Log at INFO level
+        return success, data
 
-                if SURVEYS is None:
-                    logger.error(f"[SurveyContinuation] SURVEYS is None when trying to continue survey for user {user_id}. Initialization missing.") # Keep ERROR
-                elif user_id in SURVEYS:
-                    state = SURVEYS[user_id]
+    async def _continue_survey(self, channel: Any, state: Any, user_id: str, index: int) -> None:
+        """Ask the next survey step once the current interaction is finished.
 
-                    state.next_step()
-                    next_step = state.current_step()
+        Views usually advance the survey themselves; if ``current_index`` has
+        moved past ``index`` by the time the interaction ends, nothing is done.
+        """
+        timeout = getattr(Config, "SURVEY_HANDOFF_TIMEOUT", 10.0)
+        try:
+            if not await state.wait_for_interaction(timeout):
+                logger.warning(f"[SurveyContinuation] Interaction for user {user_id} not finished after {timeout}s, continuing anyway")
 
-                    if next_step:
-                        await ask_dynamic_step(channel, state, next_step)
-                    else:
-                        await finish_survey(channel, state)
-                else:
-                    logger.warning(f"[SurveyContinuation] Survey state not found for user {user_id} when trying to continue.")
-                    # Optionally inform the user
-                    # await channel.send(f"<@{user_id}> Не вдалося знайти ваше активне опитування для продовження.")
-
-            except Exception as e:
-                logger.error(f"[SurveyContinuation] Error handling survey continuation for user {user_id}: {e}", exc_info=True) # Added exc_info=True
-                # Only notify user if survey did not actually continue
-                if channel and hasattr(channel, 'send'):
-                    # Check if user_id is not in SURVEYS or state is missing
-                    if not SURVEYS or user_id not in SURVEYS:
-                        await channel.send(f"<@{user_id}> Помилка при продовженні опитування: код 500")
-                    else:
-                        pass # Survey state exists for user {user_id}, suppressing redundant error message.
-                else:
-                    logger.error(f"[SurveyContinuation] Invalid channel object for user {user_id}, cannot send error message.")
-        logger.info(f"send_webhook returning: success={success}, data={data}") # Log at INFO level
-        return success, data
+            if state.current_index != index or survey_manager.get_survey(state.channel_id) is not state:
+                logger.debug(f"[SurveyContinuation] Survey for user {user_id} already advanced by the view")
+                return
+            if ask_dynamic_step is None or finish_survey is None:
+                logger.error(f"[SurveyContinuation] Survey functions not initialized when trying to continue survey for user {user_id}.") # Keep ERROR
+                return
+
+            state.next_step()
+            next_step = state.current_step()
+
+            if next_step:
+                await ask_dynamic_step(channel, state, next_step)
+            else:
+                await finish_survey(channel, state)
+
+        except Exception as e:
+            logger.error(f"[SurveyContinuation] Error handling survey continuation for user {user_id}: {e}", exc_info=True) # Added exc_info=True
+            # Only notify user if survey did not actually continue
+            if channel and hasattr(channel, 'send'):
+                if survey_manager.get_survey(state.channel_id) is not state:
+                    await channel.send(f"<@{user_id}> Помилка при продовженні опитування: код 500")
+            else:
+                logger.error(f"[SurveyContinuation] Invalid channel object for user {user_id}, cannot send error message.")
 
     async def send_interaction_response(
         self,
@@ -245,7 +263,13 @@ class WebhookService:
         view: Optional[discord.ui.View] = None
     ) -> None:
         """
-        Send an interaction response with consistent reaction handling.
+        Send an interaction response with consistent progress handling.
+
+        Takes two Discord calls: the response (or a followup if the
+        interaction was already answered) shows ``initial_message`` with the
+        processing marker, and one edit replaces it with the outcome. The
+        old defer, reaction add/remove and delete + re-send round trips are
+        folded into those two.
 
         Args:
             interaction: Discord interaction
@@ -258,13 +282,13 @@ class WebhookService:
             view: Optional Discord view to attach to the message
         """
         try:
-            # First, acknowledge the interaction to prevent timeout
-            if not interaction.response.is_done():
-                await interaction.response.defer(ephemeral=False)
-
-            # Send the message with view if provided
-            response_message = await interaction.followup.send(initial_message, view=view, wait=True)
-            await response_message.add_reaction(Strings.PROCESSING)  # Show processing
+            extra = {"view": view} if view is not None else {}
+            pending = f"{initial_message} {Strings.PROCESSING}"
+            response_message = None
+            if interaction.response.is_done():
+                response_message = await interaction.followup.send(pending, wait=True, **extra)
+            else:
+                await interaction.response.send_message(pending, **extra)
 
             # Send the webhook
             success, data = await self.send_webhook(
@@ -276,14 +300,10 @@ class WebhookService:
                 extra_headers=extra_headers
             )
 
-            # Remove processing reaction
-            await response_message.remove_reaction(Strings.PROCESSING, interaction.client.user)
-
-            # If webhook was successful and we got output, delete the original message
+            edit: Dict[str, Any] = {"content": initial_message}
             if success and data and "output" in data:
-                # Add success reaction before deleting
-                await response_message.delete()
-                await interaction.followup.send(data["output"])
+                # The output takes the message's place, without the view
+                edit = {"content": data["output"], "view": None}
             elif not success:
                 # Show user's selection if available in result
                 user_input = ""
@@ -294,19 +314,20 @@ class WebhookService:
                         user_input = f"Вибрано: {result['value']}"
 
                 error_msg = f"{user_input}\nПомилка: Не вдалося виконати команду." if user_input else f"{initial_message}\nПомилка: Не вдалося виконати команду."
-                await response_message.edit(content=error_msg)
-                await response_message.add_reaction(Strings.ERROR)  # Show error
+                edit = {"content": f"{error_msg} {Strings.ERROR}"}
+
+            if response_message is not None:
+                await response_message.edit(**edit)
+            else:
+                await interaction.edit_original_response(**edit)
 
         except Exception as e:
             logger.error(f"Error in send_interaction_response: {e}")
             if not interaction.response.is_done():
-                message = await interaction.response.send_message(
-                    "Помилка: Не вдалося обробити команду.",
+                await interaction.response.send_message(
+                    f"Помилка: Не вдалося обробити команду. {Strings.ERROR}",
                     ephemeral=False
                 )
-                await message.add_reaction(Strings.PROCESSING)  # Show that processing was attempted
-                await message.remove_reaction(Strings.PROCESSING, interaction.client.user)
-                await message.add_reaction(Strings.ERROR)  # Show error
 
     async def send_webhook_with_retry(
         self,
@@ -318,6 +339,10 @@ class WebhookService:
         data = await router.dispatch(payload)
         return data is not None, data
 
+    async def bootstrap_survey(self, channel_id: str, session_id: str) -> Dict[str, Any]:
+        """Forward a survey bootstrap to the internal router."""
+        return await router.bootstrap_survey(channel_id, session_id)
+
     async def send_error_message(self, target: Any, message: str) -> None:
         """
         Send an error message to the appropriate destination.
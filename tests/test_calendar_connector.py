@@ -1,6 +1,9 @@
 import sys
 import json
 import re
+import time
+import asyncio
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
@@ -84,6 +87,10 @@ def load_author():
     return match.group(1)
 
 
+async def fake_headers():
+    return {"Authorization": "Bearer token"}
+
+
 class MockResponse:
     """Simple mock for aiohttp response."""
 
@@ -127,7 +134,7 @@ async def test_create_day_off_event_success(tmp_path, monkeypatch):
     log_file.write_text(f"Input: user={name}, date=2024-02-05\n")
 
     Config.CALENDAR_ID = "CAL_ID"
-    monkeypatch.setattr(cc, "base_headers", lambda: {"Authorization": "Bearer token"})
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
 
     session = DummySession()
     session.post_response = MockResponse(200, {"id": event_id})
@@ -158,7 +165,7 @@ async def test_create_day_off_event_failure(tmp_path, monkeypatch):
     log_file.write_text(f"Input: user={name}, date=2024-02-05\n")
 
     Config.CALENDAR_ID = "CAL_ID"
-    monkeypatch.setattr(cc, "base_headers", lambda: {"Authorization": "Bearer token"})
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
 
     session = DummySession()
     session.post_response = MockResponse(500, {"error": author})
@@ -184,7 +191,7 @@ async def test_create_vacation_event_success(tmp_path, monkeypatch):
     log_file.write_text(f"Input: user={name}, start=2024-02-05, end=2024-02-10\n")
 
     Config.CALENDAR_ID = "CAL_ID"
-    monkeypatch.setattr(cc, "base_headers", lambda: {"Authorization": "Bearer token"})
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
 
     session = DummySession()
     session.post_response = MockResponse(200, {"id": event_id})
@@ -220,7 +227,7 @@ async def test_create_vacation_event_failure(tmp_path, monkeypatch):
     log_file.write_text(f"Input: user={name}, start=2024-02-05, end=2024-02-10\n")
 
     Config.CALENDAR_ID = "CAL_ID"
-    monkeypatch.setattr(cc, "base_headers", lambda: {"Authorization": "Bearer token"})
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
 
     session = DummySession()
     session.post_response = MockResponse(500, {"error": author})
@@ -236,3 +243,184 @@ async def test_create_vacation_event_failure(tmp_path, monkeypatch):
 
     assert session.post_calls
     assert result == {"status": "error", "message": author}
+
+
+class SlowCredentials:
+    """Credentials whose refresh blocks like a real OAuth round trip."""
+
+    def __init__(self):
+        self.token = None
+        self.expiry = None
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        time.sleep(0.3)
+        self.refresh_calls += 1
+        self.token = f"token-{self.refresh_calls}"
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_does_not_block_loop(tmp_path, monkeypatch):
+    cc, Config = _stub_config(monkeypatch)
+    log_file = tmp_path / "token_burst_log.txt"
+    log_file.write_text("Input: 20 concurrent create_day_off_event calls\n")
+
+    Config.CALENDAR_ID = "CAL_ID"
+    creds = SlowCredentials()
+    monkeypatch.setattr(cc, "_get_credentials", lambda: creds)
+    monkeypatch.setattr(cc, "Request", lambda: None)
+
+    session = DummySession()
+    session.post_response = MockResponse(200, {"id": "evt"})
+    connector = cc.CalendarConnector(session=session)
+
+    # Measure the longest gap between event loop ticks during the burst
+    gaps = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick_task = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        *(connector.create_day_off_event("User", f"2024-02-{i + 1:02d}") for i in range(20))
+    )
+    again = await connector.create_day_off_event("User", "2024-03-01")
+    stop.set()
+    await tick_task
+
+    with open(log_file, "a") as f:
+        f.write("Step: burst of create_day_off_event\n")
+        f.write(f"Output: refreshes={creds.refresh_calls} max_gap={max(gaps):.3f}\n")
+
+    assert all(r["status"] == "ok" for r in results)
+    assert again["status"] == "ok"
+    assert creds.refresh_calls == 1
+    assert max(gaps) < 0.2
+    assert all(h["Authorization"] == "Bearer token-1" for _, h, _ in session.post_calls)
+
+
+@pytest.mark.asyncio
+async def test_create_day_off_events_merges_and_reports_per_date(tmp_path, monkeypatch):
+    cc, Config = _stub_config(monkeypatch)
+    log_file = tmp_path / "dayoff_bulk_log.txt"
+    dates = ["2024-02-07", "2024-02-05", "2024-02-06", "2024-02-09", "2024-02-12"]
+    log_file.write_text(f"Input: dates={dates}, concurrency=2, 2024-02-09 fails\n")
+
+    Config.CALENDAR_ID = "CAL_ID"
+    payloads = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_create(self, payload, **_):
+        nonlocal in_flight, max_in_flight
+        payloads.append(payload)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        if payload["start"]["date"] == "2024-02-09":
+            return {"status": "error", "message": "quota"}
+        return {"status": "ok", "event_id": payload["start"]["date"]}
+
+    monkeypatch.setattr(cc.CalendarConnector, "_create_event", fake_create)
+    connector = cc.CalendarConnector(session=DummySession())
+
+    statuses = await connector.create_day_off_events("User", dates, concurrency=2)
+    with open(log_file, "a") as f:
+        f.write("Step: called create_day_off_events\n")
+        f.write(f"Output: {statuses} payloads={payloads}\n")
+
+    spans = sorted((p["start"]["date"], p["end"]["date"]) for p in payloads)
+    # Google's all-day end date is exclusive
+    assert spans == [
+        ("2024-02-05", "2024-02-08"),
+        ("2024-02-09", "2024-02-09"),
+        ("2024-02-12", "2024-02-12"),
+    ]
+    assert max_in_flight == 2
+    assert set(statuses) == set(dates)
+    assert statuses["2024-02-06"] == {"status": "ok", "event_id": "2024-02-05"}
+    assert statuses["2024-02-09"] == {"status": "error", "message": "quota"}
+    assert statuses["2024-02-12"]["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_repeat_day_off_submissions_create_one_event(tmp_path, monkeypatch):
+    cc, Config = _stub_config(monkeypatch)
+    log_file = tmp_path / "dayoff_dedup_log.txt"
+    log_file.write_text("Input: double-click Confirm, then submit again\n")
+
+    Config.CALENDAR_ID = "CAL_ID"
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
+    session = DummySession()
+    session.post_response = MockResponse(200, {"id": "evt"})
+    connector = cc.CalendarConnector(session=session)
+
+    first, second = await asyncio.gather(
+        connector.create_day_off_event("User", "2024-02-05"),
+        connector.create_day_off_event("User", "2024-02-05"),
+    )
+    third = await connector.create_day_off_event("User", "2024-02-05")
+    other = await connector.create_day_off_event("User", "2024-02-06")
+    with open(log_file, "a") as f:
+        f.write("Step: four submissions, two distinct days\n")
+        f.write(f"Output: {[first, second, third, other]} posts={len(session.post_calls)}\n")
+
+    assert len(session.post_calls) == 2
+    ids = [payload["id"] for _, _, payload in session.post_calls]
+    assert ids[0] == cc.event_id("day_off", "User", "2024-02-05", "2024-02-05")
+    assert ids[0] != ids[1]
+    assert first["status"] == second["status"] == third["status"] == "ok"
+    assert third.get("duplicate")
+
+
+class ConflictSession(DummySession):
+    """Answers inserts with 409 and serves the existing event."""
+
+    def __init__(self, existing_status):
+        super().__init__()
+        self.post_response = MockResponse(409, {"error": "duplicate"})
+        self.existing_status = existing_status
+        self.put_calls = []
+
+    def get(self, url, headers):
+        return MockResponse(200, {"id": url.rsplit("/", 1)[1], "status": self.existing_status})
+
+    def put(self, url, headers, json):
+        self.put_calls.append((url, json))
+        return MockResponse(200, json)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("existing_status", ["confirmed", "cancelled"])
+async def test_conflict_resolves_to_existing_event(tmp_path, monkeypatch, existing_status):
+    cc, Config = _stub_config(monkeypatch)
+    log_file = tmp_path / f"vacation_conflict_{existing_status}_log.txt"
+    log_file.write_text(f"Input: insert answered 409, existing event {existing_status}\n")
+
+    Config.CALENDAR_ID = "CAL_ID"
+    monkeypatch.setattr(cc, "base_headers", fake_headers)
+    session = ConflictSession(existing_status)
+    connector = cc.CalendarConnector(session=session)
+
+    result = await connector.create_vacation_event("User", "2024-02-05", "2024-02-10", "Europe/Kyiv")
+    with open(log_file, "a") as f:
+        f.write("Step: called create_vacation_event\n")
+        f.write(f"Output: {result} puts={session.put_calls}\n")
+
+    expected_id = cc.event_id("vacation", "User", "2024-02-05", "2024-02-10")
+    assert len(session.post_calls) == 1
+    assert result["status"] == "ok"
+    assert result["event_id"] == expected_id
+    if existing_status == "cancelled":
+        # A deleted event keeps its ID; it is restored rather than skipped
+        assert session.put_calls[0][1]["status"] == "confirmed"
+    else:
+        assert not session.put_calls
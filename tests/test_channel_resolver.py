@@ -0,0 +1,85 @@
+import sys
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.channel_resolver import ChannelResolver
+
+
+class FakeBot:
+    def __init__(self, gateway=None):
+        self.gateway = gateway or {}
+        self.fetches = []
+
+    def get_channel(self, cid):
+        return self.gateway.get(cid)
+
+    async def fetch_channel(self, cid):
+        self.fetches.append(cid)
+        await asyncio.sleep(0.01)
+        if cid == 404:
+            raise LookupError("Unknown Channel")
+        return types.SimpleNamespace(id=cid)
+
+
+@pytest.mark.asyncio
+async def test_gateway_then_cache_then_rest(tmp_path):
+    log = tmp_path / "channel_resolver_log.txt"
+    log.write_text("Input: channel 1 in gateway cache, channel 2 only over REST\n")
+
+    gateway_channel = types.SimpleNamespace(id=1)
+    bot = FakeBot({1: gateway_channel})
+    resolver = ChannelResolver()
+
+    # Survey start resolves the same channel several times, some concurrently
+    first = await resolver.resolve(bot, "1")
+    fetched = await asyncio.gather(*(resolver.resolve(bot, "2") for _ in range(3)))
+    again = await resolver.resolve(bot, 2)
+    metrics = resolver.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: resolve 1 once, 2 four times\n")
+        f.write(f"Output: fetches={bot.fetches} metrics={metrics}\n")
+
+    assert first is gateway_channel
+    assert all(ch is fetched[0] for ch in fetched) and again is fetched[0]
+    assert bot.fetches == [2]
+    assert metrics["rest_fetches"] == 1
+    assert metrics["fetches_saved"] == 4
+
+
+@pytest.mark.asyncio
+async def test_rest_errors_propagate_and_are_not_cached(tmp_path):
+    log = tmp_path / "channel_resolver_error_log.txt"
+    log.write_text("Input: unknown channel\n")
+
+    bot = FakeBot()
+    resolver = ChannelResolver()
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            await resolver.resolve(bot, 404)
+
+    with open(log, "a") as f:
+        f.write("Step: resolve twice\n")
+        f.write(f"Output: fetches={bot.fetches}\n")
+
+    assert bot.fetches == [404, 404]
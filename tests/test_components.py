@@ -0,0 +1,138 @@
+import sys
+import types
+import logging
+import importlib.util
+from pathlib import Path
+
+import discord
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig,
+    logger=logging.getLogger("test"),
+    Strings=types.SimpleNamespace(
+        SURVEY_EXPIRED_OR_NOT_FOUND="expired",
+        SURVEY_NOT_FOR_YOU="not yours",
+    ),
+)
+
+from services.survey import SurveyManager
+
+# Loaded by path; the discord_bot.views package pulls in every view
+spec = importlib.util.spec_from_file_location(
+    "discord_bot.views.components", ROOT / "discord_bot" / "views" / "components.py"
+)
+components = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(components)
+ComponentRouter = components.ComponentRouter
+layout = components.layout
+survey_custom_id = components.survey_custom_id
+survey_template = components.survey_template
+
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content, ephemeral=False):
+        self.sent.append((content, ephemeral))
+
+
+def click(custom_id, user_id="u1", channel="channel"):
+    return types.SimpleNamespace(
+        type=discord.InteractionType.component,
+        data={"custom_id": custom_id},
+        user=types.SimpleNamespace(id=user_id),
+        channel=channel,
+        response=FakeResponse(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_by_template(tmp_path):
+    log = tmp_path / "components_router_log.txt"
+    log.write_text("Input: clicks on step, workload and unknown custom_ids\n")
+
+    router = ComponentRouter()
+    calls = []
+
+    @router.route(survey_template("step"))
+    async def step(interaction, session_id, step):
+        calls.append(("step", session_id, step))
+
+    @router.route(survey_template("workload", "hours"))
+    async def workload(interaction, session_id, step, hours):
+        calls.append(("workload", session_id, step, hours))
+
+    @router.route(survey_template("broken"))
+    async def broken(interaction, session_id, step):
+        raise RuntimeError("handler failed")
+
+    await router.dispatch(click(survey_custom_id("step", "1_2", "workload_today")))
+    await router.dispatch(click(survey_custom_id("workload", "1_2", "workload_today", 10)))
+    await router.dispatch(click(survey_custom_id("broken", "1_2", "x")))  # logged, not raised
+    await router.dispatch(click("start_survey_button"))  # left to the persistent view
+    await router.dispatch(types.SimpleNamespace(type=discord.InteractionType.application_command, data={}))
+
+    with open(log, "a") as f:
+        f.write("Step: dispatch\n")
+        f.write(f"Output: calls={calls} metrics={router.metrics()}\n")
+
+    assert calls == [("step", "1_2", "workload_today"), ("workload", "1_2", "workload_today", "10")]
+    assert router.metrics() == {"routes": 3, "routed": 3, "unmatched": 1}
+
+
+@pytest.mark.asyncio
+async def test_layout_is_not_kept_by_discord_py():
+    button = discord.ui.Button(label="Ввести", custom_id=survey_custom_id("step", "1_2", "workload_today"))
+    view = layout(button)
+
+    # discord.py only stores views that are not finished
+    assert view.is_finished()
+    assert view.to_components()[0]["components"][0]["custom_id"] == "survey:step:1_2:workload_today"
+
+
+@pytest.mark.asyncio
+async def test_survey_for_click_checks_step_user_and_activity(tmp_path, monkeypatch):
+    log = tmp_path / "components_survey_for_click_log.txt"
+    log.write_text("Input: survey on workload_today, clicks from restored buttons\n")
+
+    manager = SurveyManager()
+    monkeypatch.setattr(components, "survey_manager", manager)
+    survey = manager.create_survey("u1", "c1", ["workload_today", "day_off_nextweek"], "c1_u1")
+    survey.last_activity = 0
+
+    stale = click(survey_custom_id("step", "c1_u1", "day_off_nextweek"))
+    other_user = click(survey_custom_id("step", "c1_u1", "workload_today"), user_id="u2")
+    gone = click(survey_custom_id("step", "c9_u1", "workload_today"))
+    ok = click(survey_custom_id("step", "c1_u1", "workload_today"))
+
+    assert manager.stale(300) == [survey]
+    assert await components.survey_for_click(stale, "c1_u1", "day_off_nextweek") is None
+    assert await components.survey_for_click(other_user, "c1_u1", "workload_today") is None
+    assert await components.survey_for_click(gone, "c9_u1", "workload_today") is None
+    assert await components.survey_for_click(ok, "c1_u1", "workload_today") is survey
+
+    with open(log, "a") as f:
+        f.write("Step: four clicks\n")
+        f.write(f"Output: {[c.response.sent for c in (stale, other_user, gone, ok)]}\n")
+
+    assert stale.response.sent == [("expired", True)]
+    assert other_user.response.sent == [("not yours", False)]
+    assert gone.response.sent == [("expired", True)]
+    assert ok.response.sent == []
+    # The click counts as activity and gives a restored survey its channel back
+    assert survey.channel == "channel"
+    assert manager.stale(300) == []
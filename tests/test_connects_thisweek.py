@@ -34,10 +34,8 @@ PAGE_URL = page_url_match.group(0)
 SAMPLE_PROFILE = {"results": [{"id": PAGE_ID, "url": PAGE_URL}]}
 
 
-class DummySession:
-    def __init__(self, should_fail=False):
-        self.should_fail = should_fail
-        self.post_calls = []
+class DummyResponse:
+    status = 200
 
     async def __aenter__(self):
         return self
@@ -45,10 +43,17 @@ class DummySession:
     async def __aexit__(self, *args):
         pass
 
-    async def post(self, url, json):
+
+class DummySession:
+    def __init__(self, should_fail=False):
+        self.should_fail = should_fail
+        self.post_calls = []
+
+    def post(self, url, json):
         self.post_calls.append((url, json))
         if self.should_fail:
             raise Exception("post failed")
+        return DummyResponse()
 
 
 class FakeDB:
@@ -68,16 +73,15 @@ async def test_profile_exists(monkeypatch, tmp_path):
     log_file.write_text(f"Input: {COMMAND_PAYLOAD}\n")
 
     session = DummySession()
-    monkeypatch.setattr(connects_thisweek.aiohttp, "ClientSession", lambda: session)
+    monkeypatch.setattr(connects_thisweek, "http_client", SimpleNamespace(get_session=AsyncMock(return_value=session)))
     monkeypatch.setattr(connects_thisweek, "Config", SimpleNamespace(DATABASE_URL="sqlite://", CONNECTS_URL="http://example.com"))
 
     fake_notion = SimpleNamespace(
         get_profile_stats_by_name=AsyncMock(return_value=SAMPLE_PROFILE),
         update_profile_stats_connects=AsyncMock(),
-        close=AsyncMock(),
     )
-    monkeypatch.setattr(connects_thisweek, "NotionConnector", lambda: fake_notion)
-    monkeypatch.setattr(connects_thisweek, "SurveyStepsDB", FakeDB)
+    monkeypatch.setattr(connects_thisweek, "_notion", fake_notion)
+    monkeypatch.setattr(connects_thisweek, "get_steps_db", FakeDB)
 
     result = await connects_thisweek.handle(COMMAND_PAYLOAD)
 
@@ -91,6 +95,7 @@ async def test_profile_exists(monkeypatch, tmp_path):
     )
     assert result == expected
     assert fake_notion.update_profile_stats_connects.called
+    assert session.post_calls
 
 
 @pytest.mark.asyncio
@@ -99,16 +104,15 @@ async def test_no_profile(monkeypatch, tmp_path):
     log_file.write_text(f"Input: {COMMAND_PAYLOAD}\n")
 
     session = DummySession()
-    monkeypatch.setattr(connects_thisweek.aiohttp, "ClientSession", lambda: session)
+    monkeypatch.setattr(connects_thisweek, "http_client", SimpleNamespace(get_session=AsyncMock(return_value=session)))
     monkeypatch.setattr(connects_thisweek, "Config", SimpleNamespace(DATABASE_URL="sqlite://", CONNECTS_URL="http://example.com"))
 
     fake_notion = SimpleNamespace(
         get_profile_stats_by_name=AsyncMock(return_value={"results": []}),
         update_profile_stats_connects=AsyncMock(),
-        close=AsyncMock(),
     )
-    monkeypatch.setattr(connects_thisweek, "NotionConnector", lambda: fake_notion)
-    monkeypatch.setattr(connects_thisweek, "SurveyStepsDB", FakeDB)
+    monkeypatch.setattr(connects_thisweek, "_notion", fake_notion)
+    monkeypatch.setattr(connects_thisweek, "get_steps_db", FakeDB)
 
     result = await connects_thisweek.handle(COMMAND_PAYLOAD)
 
@@ -125,16 +129,15 @@ async def test_database_error(monkeypatch, tmp_path):
     log_file.write_text(f"Input: {COMMAND_PAYLOAD}\n")
 
     session = DummySession(should_fail=True)
-    monkeypatch.setattr(connects_thisweek.aiohttp, "ClientSession", lambda: session)
+    monkeypatch.setattr(connects_thisweek, "http_client", SimpleNamespace(get_session=AsyncMock(return_value=session)))
     monkeypatch.setattr(connects_thisweek, "Config", SimpleNamespace(DATABASE_URL="sqlite://", CONNECTS_URL="http://example.com"))
 
     fake_notion = SimpleNamespace(
         get_profile_stats_by_name=AsyncMock(return_value=SAMPLE_PROFILE),
         update_profile_stats_connects=AsyncMock(),
-        close=AsyncMock(),
     )
-    monkeypatch.setattr(connects_thisweek, "NotionConnector", lambda: fake_notion)
-    monkeypatch.setattr(connects_thisweek, "SurveyStepsDB", FakeDB)
+    monkeypatch.setattr(connects_thisweek, "_notion", fake_notion)
+    monkeypatch.setattr(connects_thisweek, "get_steps_db", FakeDB)
 
     result = await connects_thisweek.handle(COMMAND_PAYLOAD)
 
@@ -152,16 +155,15 @@ async def test_end_to_end(monkeypatch, tmp_path):
     log_file.write_text(f"Input: {COMMAND_PAYLOAD}\n")
 
     session = DummySession()
-    monkeypatch.setattr(connects_thisweek.aiohttp, "ClientSession", lambda: session)
+    monkeypatch.setattr(connects_thisweek, "http_client", SimpleNamespace(get_session=AsyncMock(return_value=session)))
     monkeypatch.setattr(connects_thisweek, "Config", SimpleNamespace(DATABASE_URL="sqlite://", CONNECTS_URL="http://example.com"))
 
     fake_notion = SimpleNamespace(
         get_profile_stats_by_name=AsyncMock(return_value=SAMPLE_PROFILE),
         update_profile_stats_connects=AsyncMock(),
-        close=AsyncMock(),
     )
-    monkeypatch.setattr(connects_thisweek, "NotionConnector", lambda: fake_notion)
-    monkeypatch.setattr(connects_thisweek, "SurveyStepsDB", FakeDB)
+    monkeypatch.setattr(connects_thisweek, "_notion", fake_notion)
+    monkeypatch.setattr(connects_thisweek, "get_steps_db", FakeDB)
 
     result = await connects_thisweek.handle(COMMAND_PAYLOAD.copy())
 
@@ -174,3 +176,51 @@ async def test_end_to_end(monkeypatch, tmp_path):
         f"{COMMAND_PAYLOAD['result']['connects']} на цьому тиждні."
     )
     assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_side_effects_run_concurrently(monkeypatch, tmp_path):
+    import asyncio
+    import time
+
+    log_file = tmp_path / "concurrency_log.txt"
+    log_file.write_text(f"Input: {COMMAND_PAYLOAD}, each call takes 0.1s, post fails\n")
+    delay = 0.1
+
+    class SlowDB(FakeDB):
+        async def upsert_step(self, *args):
+            await asyncio.sleep(delay)
+            await super().upsert_step(*args)
+
+    db = SlowDB()
+
+    async def slow_session():
+        await asyncio.sleep(delay)
+        return DummySession(should_fail=True)
+
+    async def slow_lookup(name):
+        await asyncio.sleep(delay)
+        return SAMPLE_PROFILE
+
+    monkeypatch.setattr(connects_thisweek, "http_client", SimpleNamespace(get_session=slow_session))
+    monkeypatch.setattr(connects_thisweek, "Config", SimpleNamespace(DATABASE_URL="sqlite://", CONNECTS_URL="http://example.com"))
+    fake_notion = SimpleNamespace(
+        get_profile_stats_by_name=slow_lookup,
+        update_profile_stats_connects=AsyncMock(),
+    )
+    monkeypatch.setattr(connects_thisweek, "_notion", fake_notion)
+    monkeypatch.setattr(connects_thisweek, "get_steps_db", lambda *_: db)
+
+    started = time.monotonic()
+    result = await connects_thisweek.handle(COMMAND_PAYLOAD.copy())
+    elapsed = time.monotonic() - started
+
+    with open(log_file, "a") as f:
+        f.write("Step: handle called\n")
+        f.write(f"Output: {result} elapsed={elapsed:.3f}s\n")
+
+    assert elapsed < 2 * delay
+    # The failed post doesn't stop the other operations
+    assert result == connects_thisweek.ERROR_MESSAGE
+    assert db.upsert_step_calls
+    assert fake_notion.update_profile_stats_connects.called
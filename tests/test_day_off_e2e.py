@@ -49,6 +49,7 @@ sys.modules["config"] = config_mod
 
 import router
 import services.cmd.day_off as day_off
+from services.calendar_connector import CalendarConnector
 from services.date_utils import format_date_ua
 
 
@@ -77,12 +78,12 @@ def load_notion_lookup():
     return {"results": [{"name": name, "discord_id": "321", "channel_id": "123", "to_do": todo_url}]}
 
 
-class DummyCalendar:
+class DummyCalendar(CalendarConnector):
     def __init__(self):
         self.calls = []
 
-    async def create_day_off_event(self, name: str, date: str):
-        self.calls.append((name, date))
+    async def create_day_off_event(self, name: str, date: str, end_date=None):
+        self.calls.append((name, date) if end_date is None else (name, date, end_date))
         return {"status": "ok", "event_id": "1"}
 
 
@@ -156,7 +157,7 @@ async def test_day_off_nextweek_e2e(tmp_path, monkeypatch):
         f.write(f"Output: {result}\n")
 
     name = load_notion_lookup()["results"][0]["name"]
-    assert cal.calls == [(name, "2024-02-05"), (name, "2024-02-06")]
+    assert cal.calls == [(name, "2024-02-05", "2024-02-06")]
     assert steps.calls == [("123", "day_off_nextweek", True)]
     formatted = ", ".join([
         format_date_ua("2024-02-05"),
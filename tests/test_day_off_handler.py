@@ -48,6 +48,7 @@ config_mod = types.SimpleNamespace(
 sys.modules["config"] = config_mod
 
 import services.cmd.day_off as day_off
+from services.calendar_connector import CalendarConnector
 from services.date_utils import format_date_ua
 
 
@@ -74,13 +75,13 @@ def load_author() -> str:
     return re.search(r'plain_text": "([^\"]+Lernichenko)', text).group(1)
 
 
-class DummyCalendar:
+class DummyCalendar(CalendarConnector):
     def __init__(self, fail: bool = False):
         self.calls = []
         self.fail = fail
 
-    async def create_day_off_event(self, name: str, date: str):
-        self.calls.append((name, date))
+    async def create_day_off_event(self, name: str, date: str, end_date=None):
+        self.calls.append((name, date) if end_date is None else (name, date, end_date))
         if self.fail:
             return {"status": "error", "message": "boom"}
         return {"status": "ok", "event_id": "1"}
@@ -202,10 +203,8 @@ async def test_many_dates(tmp_path, monkeypatch):
     with open(log, "a") as f:
         f.write(f"Output: {out}\n")
 
-    assert cal.calls == [
-        (load_author(), "2024-02-05"),
-        (load_author(), "2024-02-06"),
-    ]
+    # Consecutive days are merged into one event
+    assert cal.calls == [(load_author(), "2024-02-05", "2024-02-06")]
     assert steps.calls == [("123", "day_off_nextweek", True)]
     formatted = ", ".join([
         format_date_ua("2024-02-05"),
@@ -299,10 +298,8 @@ async def test_days_selected_key(tmp_path, monkeypatch):
     with open(log, "a") as f:
         f.write(f"Output: {out}\n")
 
-    assert cal.calls == [
-        (load_author(), "2024-02-05"),
-        (load_author(), "2024-02-06"),
-    ]
+    # Consecutive days are merged into one event
+    assert cal.calls == [(load_author(), "2024-02-05", "2024-02-06")]
     assert steps.calls == [("123", "day_off_nextweek", True)]
     formatted = ", ".join([
         format_date_ua("2024-02-05"),
@@ -0,0 +1,83 @@
+import sys
+import types
+import logging
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.http_client import HttpClient
+from services.notion_connector import NotionConnector
+
+
+async def ok(request):
+    return web.json_response({"ok": True})
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(tmp_path):
+    log = tmp_path / "reuse_log.txt"
+    log.write_text("Input: 3 sequential GET requests\n")
+
+    app = web.Application()
+    app.router.add_get("/", ok)
+    server = TestServer(app)
+    await server.start_server()
+    client = HttpClient()
+    try:
+        for _ in range(3):
+            session = await client.get_session()
+            async with session.get(server.make_url("/")) as resp:
+                await resp.json()
+        stats = client.stats()[server.host]
+    finally:
+        await client.close()
+        await server.close()
+
+    with open(log, "a") as f:
+        f.write("Step: requests done\n")
+        f.write(f"Output: {stats}\n")
+
+    assert stats["requests"] == 3
+    assert stats["errors"] == 0
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["latency_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_connectors_share_session(tmp_path, monkeypatch):
+    log = tmp_path / "shared_log.txt"
+    log.write_text("Input: two NotionConnector instances\n")
+
+    client = HttpClient()
+    monkeypatch.setattr(sys.modules["services.notion_connector"], "http_client", client)
+    try:
+        first = await NotionConnector()._get_session()
+        second = await NotionConnector()._get_session()
+        await NotionConnector().close()
+        with open(log, "a") as f:
+            f.write("Step: _get_session twice\n")
+            f.write(f"Output: {first is second}\n")
+        assert first is second
+        assert not first.closed
+    finally:
+        await client.close()
+    assert first.closed
@@ -0,0 +1,177 @@
+import sys
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.message_queue import BROADCAST, INTERACTION, OutboundQueue
+
+
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.id = len(channel.calls) + 1000 * channel.id
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, **kwargs):
+        self.channel.calls.append(("edit", kwargs.get("content")))
+        self.content = kwargs.get("content", self.content)
+        return self
+
+    async def add_reaction(self, emoji):
+        self.channel.calls.append(("react", emoji))
+
+
+class FakeChannel:
+    def __init__(self, cid, calls=None):
+        self.id = cid
+        self.calls = calls if calls is not None else []
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(0)
+        self.calls.append(("send", content))
+        return FakeMessage(self, content)
+
+
+@pytest.mark.asyncio
+async def test_interactions_overtake_broadcasts(tmp_path):
+    log = tmp_path / "message_queue_priority_log.txt"
+    log.write_text("Input: 4 greetings then 1 reply, global bucket of 1 per 20ms\n")
+
+    calls = []
+    queue = OutboundQueue(channel_rate=5, channel_per=1, global_rate=1, global_per=0.02)
+    greetings = [
+        asyncio.create_task(queue.send(FakeChannel(i, calls), f"hello {i}", priority=BROADCAST))
+        for i in range(1, 5)
+    ]
+    await asyncio.sleep(0)
+    reply = await queue.send(FakeChannel(9, calls), "reply", priority=INTERACTION)
+    await asyncio.gather(*greetings)
+    metrics = queue.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: gather\n")
+        f.write(f"Output: calls={calls} metrics={metrics}\n")
+
+    assert reply.content == "reply"
+    # The first greeting took the free token, the reply is served next
+    assert [c for _, c in calls][:2] == ["hello 1", "reply"]
+    assert metrics["completed"] == 5 and metrics["depth"] == 0
+    assert set(metrics["wait"]) == {"interaction", "broadcast"}
+
+
+@pytest.mark.asyncio
+async def test_channel_order_and_edit_coalescing(tmp_path):
+    log = tmp_path / "message_queue_coalesce_log.txt"
+    log.write_text("Input: channel bucket of 1, three sends and two edits of one message\n")
+
+    channel = FakeChannel(1)
+    queue = OutboundQueue(channel_rate=1, channel_per=0.02)
+    first = await queue.send(channel, "one")
+    sends = [asyncio.create_task(queue.send(channel, text)) for text in ("two", "three")]
+    edits = [
+        asyncio.create_task(queue.edit(first, content="one (edited)")),
+        asyncio.create_task(queue.edit(first, content="one (final)")),
+    ]
+    results = await asyncio.gather(*sends, *edits)
+    metrics = queue.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: gather\n")
+        f.write(f"Output: calls={channel.calls} metrics={metrics}\n")
+
+    assert channel.calls == [
+        ("send", "one"),
+        ("send", "two"),
+        ("send", "three"),
+        ("edit", "one (final)"),
+    ]
+    assert results[2] is results[3] is first
+    assert metrics["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_call_reaches_caller(tmp_path):
+    log = tmp_path / "message_queue_failure_log.txt"
+    log.write_text("Input: a send that raises\n")
+
+    class BrokenChannel(FakeChannel):
+        async def send(self, content=None, **kwargs):
+            raise RuntimeError("403 Forbidden")
+
+    queue = OutboundQueue()
+    with pytest.raises(RuntimeError):
+        await queue.send(BrokenChannel(1), "hi")
+    sent = await queue.send(FakeChannel(1), "again")
+
+    with open(log, "a") as f:
+        f.write("Step: send twice\n")
+        f.write(f"Output: {queue.metrics()}\n")
+
+    assert sent.content == "again"
+    assert queue.metrics()["failed"] == 1 and queue.metrics()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_edit_takes_the_more_urgent_priority(tmp_path):
+    log = tmp_path / "message_queue_coalesce_priority_log.txt"
+    log.write_text("Input: a broadcast send and edit queued, then an interaction edit of the same message\n")
+
+    channel = FakeChannel(1)
+    queue = OutboundQueue(channel_rate=1, channel_per=0.02)
+    first = await queue.send(channel, "one")
+    tasks = [
+        asyncio.create_task(queue.send(channel, "two", priority=BROADCAST)),
+        asyncio.create_task(queue.edit(first, content="one (greeting)", priority=BROADCAST)),
+        asyncio.create_task(queue.edit(first, content="one (answer)", priority=INTERACTION)),
+    ]
+    await asyncio.gather(*tasks)
+    metrics = queue.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: gather\n")
+        f.write(f"Output: calls={channel.calls} metrics={metrics}\n")
+
+    # The merged edit is served as an interaction, ahead of the broadcast send
+    assert channel.calls == [("send", "one"), ("edit", "one (answer)"), ("send", "two")]
+    assert metrics["coalesced"] == 1
+    assert metrics["wait"]["interaction"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reactions_keep_channel_order(tmp_path):
+    log = tmp_path / "message_queue_react_log.txt"
+    log.write_text("Input: an error edit followed by its reaction\n")
+
+    channel = FakeChannel(1)
+    queue = OutboundQueue(channel_rate=1, channel_per=0.02)
+    first = await queue.send(channel, "one")
+    await asyncio.gather(
+        queue.edit(first, content="one (error)"),
+        queue.react(first, "❌"),
+    )
+
+    with open(log, "a") as f:
+        f.write("Step: gather\n")
+        f.write(f"Output: calls={channel.calls} metrics={queue.metrics()}\n")
+
+    assert channel.calls == [("send", "one"), ("edit", "one (error)"), ("react", "❌")]
+    assert queue.metrics()["completed"] == 3
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import sys
 import json
 import re
@@ -31,7 +32,7 @@ sys.modules["config"] = types.SimpleNamespace(
     Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
 )
 
-from notion_connector import NotionConnector
+from notion_connector import NotionConnector, NotionError, TokenBucket
 from config import Config
 
 
@@ -55,9 +56,10 @@ def load_team_directory():
 class MockResponse:
     """Simple mock for aiohttp response."""
 
-    def __init__(self, status: int, data: Dict[str, Any]):
+    def __init__(self, status: int, data: Dict[str, Any], headers: Dict[str, str] | None = None):
         self.status = status
         self._data = data
+        self.headers = headers or {}
 
     async def json(self) -> Dict[str, Any]:
         return self._data
@@ -164,3 +166,78 @@ async def test_update_profile_stats_connects(tmp_path):
 
     assert payload["properties"] == {"Connects": {"number": 5}}
 
+
+class SequenceSession(DummySession):
+    """Session returning queued responses in order."""
+
+    def __init__(self, responses: List[MockResponse]) -> None:
+        super().__init__()
+        self.responses = list(responses)
+
+    def post(self, url: str, headers: Dict[str, str], json: Dict[str, Any]):
+        self.post_calls.append((url, headers, json))
+        return self.responses.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_query_database_honours_retry_after(tmp_path):
+    log_file = tmp_path / "retry_after_log.txt"
+    log_file.write_text("Input: 429 Retry-After=0.2 then 200\n")
+
+    os.environ["NOTION_TOKEN"] = "token"
+    session = SequenceSession([
+        MockResponse(429, {"code": "rate_limited"}, {"Retry-After": "0.2"}),
+        MockResponse(200, {"results": []}),
+    ])
+    limiter = TokenBucket(rate=100, capacity=10)
+    connector = NotionConnector(session=session, limiter=limiter)
+
+    started = asyncio.get_running_loop().time()
+    result = await connector.query_database("DB", None, {})
+    elapsed = asyncio.get_running_loop().time() - started
+    with open(log_file, "a") as f:
+        f.write("Step: called query_database\n")
+        f.write(f"Output: {result} elapsed={elapsed:.3f} metrics={limiter.metrics()}\n")
+
+    assert result["results"] == []
+    assert len(session.post_calls) == 2
+    assert elapsed >= 0.2
+    assert limiter.metrics()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_query_database_does_not_retry_client_errors(tmp_path):
+    log_file = tmp_path / "no_retry_log.txt"
+    log_file.write_text("Input: 400 validation_error\n")
+
+    os.environ["NOTION_TOKEN"] = "token"
+    session = SequenceSession([MockResponse(400, {"code": "validation_error"})])
+    connector = NotionConnector(session=session, limiter=TokenBucket(rate=100, capacity=10))
+
+    with pytest.raises(NotionError):
+        await connector.query_database("DB", None, {})
+    with open(log_file, "a") as f:
+        f.write("Step: called query_database\n")
+        f.write(f"Output: calls={len(session.post_calls)}\n")
+
+    assert len(session.post_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests(tmp_path):
+    log_file = tmp_path / "bucket_log.txt"
+    log_file.write_text("Input: 6 acquires at 20 req/s, burst 1\n")
+
+    limiter = TokenBucket(rate=20, capacity=1)
+    started = asyncio.get_running_loop().time()
+    await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+    elapsed = asyncio.get_running_loop().time() - started
+    metrics = limiter.metrics()
+    with open(log_file, "a") as f:
+        f.write("Step: gather acquires\n")
+        f.write(f"Output: elapsed={elapsed:.3f} metrics={metrics}\n")
+
+    assert elapsed >= 0.2
+    assert metrics["acquired"] == 6
+    assert metrics["queue_depth"] == 0
+    assert metrics["wait_time_max"] >= 0.2
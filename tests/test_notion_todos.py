@@ -0,0 +1,209 @@
+import sys
+import json
+import types
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = "token"
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.notion_connector import NotionConnector
+from services.notion_todos import Notion_todos, ToDoBlockCache
+
+PAGE_ID = "2f57f8df09cc4923888ec37a709344d7"
+RECENT = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+OLD = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def todo(block_id, title, created=RECENT, checked=False, has_children=False):
+    return {
+        "id": block_id,
+        "type": "to_do",
+        "created_time": created,
+        "last_edited_time": created,
+        "has_children": has_children,
+        "to_do": {"checked": checked, "rich_text": [{"plain_text": title}]},
+    }
+
+
+def toggle(block_id, created=OLD, edited=None):
+    block = {"id": block_id, "type": "toggle", "created_time": created, "has_children": True}
+    if edited:
+        block["last_edited_time"] = edited
+    return block
+
+
+class FakeConnector(NotionConnector):
+    """Serves a block tree one page of ``page_size`` children at a time."""
+
+    def __init__(self, tree, page_size=2, delay=0.01):
+        super().__init__()
+        self.tree = tree
+        self.page_size = page_size
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def list_block_children(self, block_id, start_cursor=None, **_):
+        self.calls.append((block_id, start_cursor))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        children = self.tree.get(block_id, [])
+        start = int(start_cursor or 0)
+        end = start + self.page_size
+        has_more = end < len(children)
+        return {
+            "results": children[start:end],
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+
+def build_tree():
+    return {
+        PAGE_ID: [
+            todo("t1", "first"),
+            toggle("week1"),
+            toggle("week2"),
+            toggle("week3"),
+            todo("t2", "old", created=OLD, has_children=True),
+            todo("t3", "done", checked=True, has_children=True),
+        ],
+        "week1": [todo("w1a", "week1 a"), todo("w1b", "week1 b", has_children=True)],
+        "w1b": [todo("w1b1", "nested")],
+        "week2": [todo("w2a", "week2 a")],
+        "week3": [todo("w3a", "week3 a"), todo("w3b", "week3 b"), todo("w3c", "week3 c")],
+        "t2": [todo("t2a", "under old")],
+        "t3": [todo("t3a", "under done")],
+    }
+
+
+@pytest.mark.asyncio
+async def test_walk_follows_cursors_and_prunes(tmp_path):
+    log = tmp_path / "todo_walk_log.txt"
+    log.write_text("Input: ToDo tree with 6 root blocks, page_size=2\n")
+
+    connector = FakeConnector(build_tree())
+    todos = Notion_todos(
+        f"https://www.notion.so/{PAGE_ID}", 21, connector=connector, concurrency=3, cache=ToDoBlockCache()
+    )
+    text = json.loads(await todos.get_tasks_text(user_id="321"))
+    with open(log, "a") as f:
+        f.write("Step: get_tasks_text\n")
+        f.write(f"Output: {text} calls={connector.calls}\n")
+
+    assert text["tasks_found"]
+    titles = [line[len(" * *"):-1] for line in text["text"].split("\n")[1:]]
+    # Page order, including children beyond the first page of results
+    assert titles == ["first", "week1 a", "week1 b", "nested", "week2 a", "week3 a", "week3 b", "week3 c"]
+    listed = {block for block, _ in connector.calls}
+    # Old and checked to-dos are never descended into
+    assert "t2" not in listed and "t3" not in listed
+    assert (PAGE_ID, "4") in connector.calls
+    assert connector.max_in_flight <= 3
+    assert connector.max_in_flight > 1
+
+
+@pytest.mark.asyncio
+async def test_root_failure_raises(tmp_path):
+    log = tmp_path / "todo_root_error_log.txt"
+    log.write_text("Input: root listing fails\n")
+
+    class Broken(FakeConnector):
+        async def list_block_children(self, block_id, start_cursor=None, **_):
+            raise RuntimeError("notion down")
+
+    todos = Notion_todos(
+        f"https://www.notion.so/{PAGE_ID}", 21, connector=Broken({}), cache=ToDoBlockCache()
+    )
+    with pytest.raises(ConnectionError) as err:
+        await todos.get_tasks_text(user_id="321")
+    with open(log, "a") as f:
+        f.write("Step: get_tasks_text\n")
+        f.write(f"Output: {err.value}\n")
+
+
+@pytest.mark.asyncio
+async def test_unchanged_subtrees_come_from_cache(tmp_path):
+    log = tmp_path / "todo_cache_log.txt"
+    log.write_text("Input: same ToDo page walked three times\n")
+
+    tree = build_tree()
+    tree[PAGE_ID][1:4] = [
+        toggle("week1", edited="2024-01-01T00:00:00.000Z"),
+        toggle("week2", edited="2024-01-01T00:00:00.000Z"),
+        toggle("week3", edited="2024-01-01T00:00:00.000Z"),
+    ]
+    connector = FakeConnector(tree)
+    cache = ToDoBlockCache()
+    todos = Notion_todos(f"https://www.notion.so/{PAGE_ID}", 21, connector=connector, cache=cache)
+
+    first = await todos.get_tasks_text(user_id="321")
+    cold_calls = len(connector.calls)
+    connector.calls.clear()
+    second = await todos.get_tasks_text(user_id="321")
+    warm_calls = list(connector.calls)
+
+    # Editing week3 invalidates only that subtree
+    tree["week3"] = [todo("w3a", "week3 a")]
+    tree[PAGE_ID][3] = toggle("week3", edited="2024-02-01T00:00:00.000Z")
+    connector.calls.clear()
+    third = json.loads(await todos.get_tasks_text(user_id="321"))
+    metrics = cache.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: cold, warm, after edit\n")
+        f.write(f"Output: cold={cold_calls} warm={warm_calls} edited={connector.calls} metrics={metrics}\n")
+
+    assert first == second
+    # Only the root page (3 cursor pages) is listed when nothing changed
+    assert {block for block, _ in warm_calls} == {PAGE_ID}
+    assert {block for block, _ in connector.calls} == {PAGE_ID, "week3"}
+    assert "week3 b" not in third["text"]
+    # Warm: week1, week2, week3, w1b; after edit: week1, week2, w1b
+    assert metrics["hits"] == 7
+    assert metrics["stale"] == 1
+    assert metrics["calls_saved"] == 8
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    log = tmp_path / "todo_cache_evict_log.txt"
+    log.write_text("Input: max_blocks=6, three 2-child entries\n")
+
+    cache = ToDoBlockCache(max_blocks=6)
+    children = [todo("a", "a"), todo("b", "b")]
+    cache.put("x", "t1", children, 1)
+    cache.put("y", "t1", children, 1)
+    assert cache.get("x", "t1") is not None
+    cache.put("z", "t1", children, 1)
+    metrics = cache.metrics()
+    with open(log, "a") as f:
+        f.write("Step: put x, y, get x, put z\n")
+        f.write(f"Output: {metrics}\n")
+
+    assert cache.get("y", "t1") is None
+    assert cache.get("x", "t1") is not None
+    assert metrics["evictions"] == 1
+    assert metrics["blocks"] <= 6
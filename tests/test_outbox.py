@@ -0,0 +1,221 @@
+import sys
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.outbox import (
+    DatabaseOutboxStore,
+    MemoryOutboxStore,
+    Outbox,
+    OutboxStore,
+    PermanentDeliveryError,
+)
+from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_migrations import migrate
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_before_delivery(tmp_path):
+    log = tmp_path / "outbox_fast_reply_log.txt"
+    log.write_text("Input: slow delivery, submit twice with the same key\n")
+
+    release = asyncio.Event()
+    delivered = []
+
+    async def slow_write(write):
+        await release.wait()
+        delivered.append(write["hours"])
+
+    box = Outbox(workers=2, poll_interval=0.05)
+    box.register("notion.update", slow_write)
+    box.set_store(MemoryOutboxStore())
+    await box.start()
+    try:
+        await asyncio.wait_for(box.submit("notion.update", {"hours": 4}, "page:Mon"), 0.1)
+        # An identical write that is already queued is not added again
+        await box.submit("notion.update", {"hours": 4}, "page:Mon")
+        release.set()
+        await wait_until(lambda: box.delivered == 1)
+        await box.submit("notion.update", {"hours": 4}, "page:Mon")
+        await asyncio.sleep(0.1)
+        counts = await box.store.counts()
+    finally:
+        await box.stop()
+
+    with open(log, "a") as f:
+        f.write("Step: submit, release, resubmit identical\n")
+        f.write(f"Output: delivered={delivered} counts={counts} metrics={box.metrics()}\n")
+
+    assert delivered == [4]
+    assert counts == {"pending": 0, "done": 1, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_retries_then_dead_letters(tmp_path):
+    log = tmp_path / "outbox_retry_log.txt"
+    log.write_text("Input: flaky and broken deliveries\n")
+
+    attempts = {"flaky": 0, "broken": 0, "rejected": 0}
+
+    async def flaky(write):
+        attempts["flaky"] += 1
+        if attempts["flaky"] < 3:
+            raise ConnectionError("notion down")
+
+    async def broken(write):
+        attempts["broken"] += 1
+        raise ConnectionError("still down")
+
+    async def rejected(write):
+        attempts["rejected"] += 1
+        raise PermanentDeliveryError("400 validation_error")
+
+    box = Outbox(workers=3, max_attempts=3, retry_base=0.01, poll_interval=0.02)
+    for kind, func in (("flaky", flaky), ("broken", broken), ("rejected", rejected)):
+        box.register(kind, func)
+    box.set_store(MemoryOutboxStore())
+    await box.start()
+    try:
+        for kind in attempts:
+            await box.submit(kind, {"n": 1}, kind)
+        await wait_until(lambda: box.delivered == 1 and box.dead_lettered == 2)
+        dead = await box.store.dead_letters()
+    finally:
+        await box.stop()
+
+    with open(log, "a") as f:
+        f.write("Step: run until settled\n")
+        f.write(f"Output: attempts={attempts} dead={dead}\n")
+
+    assert attempts == {"flaky": 3, "broken": 3, "rejected": 1}
+    assert {d["kind"] for d in dead} == {"broken", "rejected"}
+    assert all(d["last_error"] for d in dead)
+
+
+@pytest.mark.asyncio
+async def test_database_store_survives_restart(tmp_path):
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/outbox.db"
+    log = tmp_path / "outbox_db_log.txt"
+    log.write_text(f"Input: {db_url}\n")
+
+    repo = SurveyStepsDB(db_url)
+    await migrate(repo)
+    store = DatabaseOutboxStore(repo)
+    await store.put("notion.update", "page:Mon", {"hours": 2}, now=0)
+    await store.put("notion.update", "page:Mon", {"hours": 3}, now=0)
+    await store.put("notion.update", "page:Tue", {"hours": 5}, now=0)
+
+    # A fresh outbox over the same table delivers what was queued before
+    delivered = []
+
+    async def write(payload):
+        delivered.append(payload["hours"])
+
+    box = Outbox(workers=2, poll_interval=0.02)
+    box.register("notion.update", write)
+    box.set_store(DatabaseOutboxStore(repo))
+    await box.start()
+    try:
+        await wait_until(lambda: box.delivered == 2)
+        counts = await box.store.counts()
+    finally:
+        await box.stop()
+        await repo.close()
+
+    with open(log, "a") as f:
+        f.write("Step: restart and drain\n")
+        f.write(f"Output: delivered={delivered} counts={counts}\n")
+
+    assert sorted(delivered) == [3, 5]
+    assert counts["done"] == 2 and counts["pending"] == 0
+
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "database"])
+async def test_replacing_a_claimed_payload_keeps_the_lease(tmp_path, backend):
+    log = tmp_path / f"outbox_lease_{backend}_log.txt"
+    log.write_text("Input: claim with a 30s lease, replace the payload at t=1\n")
+
+    repo = None
+    if backend == "memory":
+        store = MemoryOutboxStore()
+    else:
+        repo = SurveyStepsDB(f"sqlite+aiosqlite:///{tmp_path}/outbox.db")
+        await migrate(repo)
+        store = DatabaseOutboxStore(repo)
+    try:
+        await store.put("notion.update", "page:Mon", {"hours": 2}, now=0)
+        (old,) = await store.claim(10, now=0, lease=30)
+        await store.put("notion.update", "page:Mon", {"hours": 3}, now=1)
+        during_lease = await store.claim(10, now=2, lease=30)
+        # The old delivery's outcome is dropped; the replacement stays queued
+        await store.complete(old, now=3)
+        after_lease = await store.claim(10, now=31, lease=30)
+    finally:
+        if repo is not None:
+            await repo.close()
+
+    with open(log, "a") as f:
+        f.write("Step: claim at t=2 and t=31\n")
+        f.write(f"Output: during={during_lease} after={after_lease}\n")
+
+    assert during_lease == []
+    assert [e.payload["hours"] for e in after_lease] == [3]
+
+@pytest.mark.asyncio
+async def test_submit_delivers_inline_when_not_started(tmp_path):
+    log = tmp_path / "outbox_inline_log.txt"
+    log.write_text("Input: outbox without a worker pool\n")
+
+    async def failing(write):
+        raise ConnectionError("notion down")
+
+    box = Outbox()
+    box.register("notion.update", failing)
+    with pytest.raises(ConnectionError):
+        await box.submit("notion.update", {"hours": 1}, "page:Mon")
+    with pytest.raises(KeyError):
+        await box.submit("unknown", {}, "x")
+
+    with open(log, "a") as f:
+        f.write("Step: submit\n")
+        f.write(f"Output: {box.metrics()}\n")
+
+    assert box.metrics()["inline"] == 1
+
+
+def test_incomplete_store_fails_on_creation():
+    class PutOnly(OutboxStore):
+        async def put(self, kind, dedup_key, payload, now):
+            pass
+
+    with pytest.raises(TypeError):
+        PutOnly()
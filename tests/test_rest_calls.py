@@ -0,0 +1,96 @@
+import sys
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+from discord.http import Route
+from discord.webhook.async_ import async_context
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.rest_calls import RestCallCounter
+
+
+class FakeHTTP:
+    async def request(self, route, **kwargs):
+        await asyncio.sleep(0)
+        return {"path": route.path}
+
+
+class FakeTree:
+    async def interaction_check(self, interaction):
+        return True
+
+
+EDIT = Route("PATCH", "/channels/{channel_id}/messages/{message_id}", channel_id=1, message_id=2)
+REACT = Route("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", channel_id=1, message_id=2, emoji="x")
+FOLLOWUP = Route("POST", "/webhooks/{webhook_id}/{webhook_token}", webhook_id=1, webhook_token="t")
+
+
+@pytest.mark.asyncio
+async def test_calls_are_counted_per_scope(tmp_path, monkeypatch):
+    log = tmp_path / "rest_calls_log.txt"
+    log.write_text("Input: two survey steps and a slash command running concurrently\n")
+
+    adapter = async_context.get()
+
+    async def webhook_request(route, session, **kwargs):
+        return None
+
+    monkeypatch.setattr(adapter, "request", webhook_request)
+    bot = types.SimpleNamespace(http=FakeHTTP(), tree=FakeTree())
+    counter = RestCallCounter()
+    counter.install(bot)
+    counter.install(bot)  # installing twice doesn't count twice
+
+    async def step(name, routes):
+        counter.enter(f"survey:{name}")
+        for route in routes:
+            await bot.http.request(route)
+
+    async def command():
+        interaction = types.SimpleNamespace(command=types.SimpleNamespace(name="workload_today"))
+        assert await bot.tree.interaction_check(interaction)
+        await adapter.request(FOLLOWUP, None)
+        await bot.http.request(EDIT)
+
+    await asyncio.gather(
+        step("workload_today", [EDIT, REACT]),
+        step("day_off_nextweek", [EDIT]),
+        command(),
+    )
+    with counter.scope("survey:start"):
+        await bot.http.request(EDIT)
+    await bot.http.request(REACT)
+    metrics = counter.metrics()
+
+    with open(log, "a") as f:
+        f.write("Step: gather, then a scoped and an unscoped call\n")
+        f.write(f"Output: {metrics}\n")
+
+    assert metrics["total"] == 7
+    assert metrics["by_scope"] == {
+        "survey:workload_today": 2,
+        "command:workload_today": 2,
+        "survey:day_off_nextweek": 1,
+        "survey:start": 1,
+        "other": 1,
+    }
+    assert metrics["by_route"]["PATCH /channels/{channel_id}/messages/{message_id}"] == 4
+    assert metrics["by_route"]["POST /webhooks/{webhook_id}/{webhook_token}"] == 1
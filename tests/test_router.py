@@ -362,3 +362,36 @@ async def test_dispatch_connects(tmp_path, monkeypatch):
     with open(log, "a") as f:
         f.write(f"Output: {result}\n")
     assert result == {"output": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_survey_runs_lookups_concurrently(tmp_path, monkeypatch):
+    import asyncio
+    import time
+
+    log = tmp_path / "bootstrap_log.txt"
+    log.write_text("Input: bootstrap channel 123\n")
+
+    async def slow_lookup(channel_id):
+        await asyncio.sleep(0.1)
+        return load_notion_lookup()
+
+    async def slow_pending(payload):
+        await asyncio.sleep(0.1)
+        return {"output": True, "steps": ["workload_today"]}
+
+    monkeypatch.setattr(router.team_directory, "get_by_channel", lambda _c: None)
+    monkeypatch.setattr(router._notio, "find_team_directory_by_channel", slow_lookup)
+    monkeypatch.setattr(router.check_channel, "handle", slow_pending)
+
+    started = time.monotonic()
+    result = await router.bootstrap_survey("123", "123_321")
+    elapsed = time.monotonic() - started
+    with open(log, "a") as f:
+        f.write("Step: router.bootstrap_survey\n")
+        f.write(f"Output: {result} elapsed={elapsed:.3f}s\n")
+
+    assert result["registered"] is True
+    assert result["steps"] == ["workload_today"]
+    assert result["todo_url"] == load_notion_lookup()["results"][0]["to_do"]
+    assert elapsed < 0.18
@@ -0,0 +1,136 @@
+import sys
+import types
+import timeit
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services import survey as survey_module
+from services.survey import SurveyManager
+
+
+def fill(manager: SurveyManager, count: int) -> None:
+    for i in range(count):
+        manager.create_survey(f"u{i}", f"c{i}", ["workload_today"], f"c{i}_u{i}")
+
+
+def test_indexes_follow_create_and_remove(tmp_path):
+    log = tmp_path / "index_log.txt"
+    log.write_text("Input: create c1/c2 for u1\n")
+
+    manager = SurveyManager()
+    s1 = manager.create_survey("u1", "c1", ["workload_today"], "c1_u1")
+    s2 = manager.create_survey("u1", "c2", ["workload_today"], "c2_u1")
+
+    assert manager.get_survey_by_session("c1_u1") is s1
+    assert set(manager.get_surveys_by_user("u1")) == {s1, s2}
+    assert manager.has_survey_for_user("u1")
+
+    manager.remove_survey("c1")
+    with open(log, "a") as f:
+        f.write("Step: remove c1\n")
+        f.write(f"Output: {manager.get_surveys_by_user('u1')}\n")
+    assert manager.get_survey_by_session("c1_u1") is None
+    assert manager.get_surveys_by_user("u1") == [s2]
+
+    # Replacing the survey in a channel drops the old session
+    s3 = manager.create_survey("u2", "c2", ["workload_today"], "c2_u2")
+    assert manager.get_survey_by_session("c2_u1") is None
+    assert manager.get_survey_by_session("c2_u2") is s3
+    assert not manager.has_survey_for_user("u1")
+    assert manager.get_surveys_by_user("u2") == [s3]
+
+
+def test_indexes_ignore_surveys_dropped_directly(tmp_path):
+    log = tmp_path / "stale_log.txt"
+    log.write_text("Input: surveys.clear()\n")
+
+    manager = SurveyManager()
+    manager.create_survey("u1", "c1", ["workload_today"], "c1_u1")
+    manager.surveys.clear()
+
+    with open(log, "a") as f:
+        f.write("Step: lookups after clear\n")
+        f.write(f"Output: {manager.get_survey_by_session('c1_u1')}\n")
+    assert manager.get_survey_by_session("c1_u1") is None
+    assert not manager.has_survey_for_user("u1")
+
+
+def test_lookup_cost_is_flat(tmp_path):
+    log = tmp_path / "benchmark_log.txt"
+    log.write_text("Input: 10 vs 10000 active surveys\n")
+
+    timings = {}
+    for count in (10, 10_000):
+        manager = SurveyManager()
+        fill(manager, count)
+        last = count - 1
+
+        def lookup():
+            manager.get_survey_by_session(f"c{last}_u{last}")
+            manager.has_survey_for_user(f"u{last}")
+
+        timings[count] = min(timeit.repeat(lookup, number=2000, repeat=5))
+
+    with open(log, "a") as f:
+        f.write("Step: timeit session/user lookups\n")
+        f.write(f"Output: {timings}\n")
+
+    # A linear scan would be ~1000x slower at 10k; allow generous noise
+    assert timings[10_000] < timings[10] * 5
+
+
+@pytest.mark.asyncio
+async def test_todo_prefetch_is_memoised(tmp_path, monkeypatch):
+    log = tmp_path / "todo_prefetch_log.txt"
+    log.write_text("Input: todo_url set on survey\n")
+
+    calls = []
+    release = asyncio.Event()
+
+    class FakeTodos:
+        def __init__(self, url, days):
+            calls.append((url, days))
+
+        async def get_tasks_text(self, user_id):
+            await release.wait()
+            return '{"tasks_found": false}'
+
+    monkeypatch.setattr(survey_module, "Notion_todos", FakeTodos)
+    manager = SurveyManager()
+    survey = manager.create_survey("u1", "c1", ["workload_today"], "c1_u1")
+    survey.todo_url = "https://www.notion.so/todo"
+    first = survey.prefetch_todos()
+    assert survey.prefetch_todos() is first
+    assert not survey.todos_ready()
+    # Bounded wait while Notion is still busy
+    assert await survey.todos_text(0.01) is None
+
+    release.set()
+    text = await survey.todos_text(1)
+    with open(log, "a") as f:
+        f.write("Step: prefetch twice, then todos_text\n")
+        f.write(f"Output: calls={calls} text={text}\n")
+
+    assert text == '{"tasks_found": false}'
+    assert survey.todos_ready()
+    assert calls == [("https://www.notion.so/todo", survey_module.TODO_LOOKBACK_DAYS)]
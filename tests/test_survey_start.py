@@ -10,13 +10,6 @@ ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT))
 
 
-def load_payload_example(title: str) -> dict:
-    text = (ROOT / "payload_examples.txt").read_text()
-    start = text.index(title)
-    match = re.search(r"```json\n(.*?)\n```", text[start:], re.DOTALL)
-    return json.loads(match.group(1))
-
-
 def load_check_channel_response() -> dict:
     text = (ROOT / "responses").read_text()
     start = text.index("check_channel empty steps response")
@@ -81,11 +74,24 @@ def test_start_survey_without_steps(monkeypatch):
         create_survey=create_survey,
         remove_survey=lambda _cid: None,
     )
-    services_stub.webhook_service = types.SimpleNamespace(
-        send_webhook_with_retry=None
-    )
+    services_stub.webhook_service = types.SimpleNamespace(bootstrap_survey=None)
     services_stub.session_manager = types.SimpleNamespace()
+
+    async def resolve(bot, cid):
+        return await bot.fetch_channel(int(cid))
+
+    services_stub.channel_resolver = types.SimpleNamespace(resolve=resolve)
+    services_stub.rest_calls = types.SimpleNamespace(enter=lambda scope: None)
+
+    async def queued_send(channel, content=None, **kwargs):
+        kwargs.pop("priority", None)
+        return await channel.send(content, **kwargs)
+
+    services_stub.message_queue = types.SimpleNamespace(send=queued_send)
     monkeypatch.setitem(sys.modules, "services", services_stub)
+    queue_stub = types.ModuleType("services.message_queue")
+    queue_stub.BROADCAST = 1
+    monkeypatch.setitem(sys.modules, "services.message_queue", queue_stub)
     notion_stub = types.ModuleType("services.notion_todos")
     notion_stub.Notion_todos = object
     monkeypatch.setitem(sys.modules, "services.notion_todos", notion_stub)
@@ -104,27 +110,23 @@ def test_start_survey_without_steps(monkeypatch):
     spec.loader.exec_module(survey_cmd)
     Strings = config_stub.Strings
 
-    payload = load_payload_example("check_channel Command Payload")
     channel_id = "123"
     user_id = "321"
     session_id = f"{channel_id}_{user_id}"
-    expected = dict(payload)
-    expected["channelId"] = channel_id
-    expected["sessionId"] = session_id
-
-    response = load_check_channel_response()
-    called = {"payloads": []}
-
-    async def fake_send_webhook(target, payload_arg, headers):
-        called["payloads"].append(payload_arg)
-        # Simulate router populating todo_url on second call
-        if len(called["payloads"]) == 2 and created.get("survey"):
-            created["survey"].todo_url = "https://todo.url"
-        return True, response
-
-    monkeypatch.setattr(
-        survey_cmd.webhook_service, "send_webhook_with_retry", fake_send_webhook
-    )
+
+    response = load_check_channel_response()["output"]
+    called = {"bootstraps": []}
+
+    async def fake_bootstrap(channel_arg, session_arg):
+        called["bootstraps"].append((channel_arg, session_arg))
+        # One round-trip returns the steps and the ToDo URL together
+        return {
+            "registered": response["output"] is True,
+            "steps": response.get("steps", []),
+            "todo_url": "https://todo.url",
+        }
+
+    monkeypatch.setattr(survey_cmd.webhook_service, "bootstrap_survey", fake_bootstrap)
     channel = DummyChannel(channel_id)
 
     async def fake_fetch_channel(cid):
@@ -142,7 +144,7 @@ def test_start_survey_without_steps(monkeypatch):
         survey_cmd.handle_start_daily_survey(bot, user_id, channel_id, session_id)
     )
 
-    assert called["payloads"] == [expected, expected]
+    assert called["bootstraps"] == [(channel_id, session_id)]
     assert channel.messages == [Strings.SURVEY_COMPLETE_MESSAGE]
     assert created["survey"].todo_url == "https://todo.url"
 
@@ -188,9 +190,24 @@ def test_start_survey_no_required_steps(monkeypatch):
         create_survey=create_survey,
         remove_survey=lambda _cid: None,
     )
-    services_stub.webhook_service = types.SimpleNamespace(send_webhook_with_retry=None)
+    services_stub.webhook_service = types.SimpleNamespace(bootstrap_survey=None)
     services_stub.session_manager = types.SimpleNamespace()
+
+    async def resolve(bot, cid):
+        return await bot.fetch_channel(int(cid))
+
+    services_stub.channel_resolver = types.SimpleNamespace(resolve=resolve)
+    services_stub.rest_calls = types.SimpleNamespace(enter=lambda scope: None)
+
+    async def queued_send(channel, content=None, **kwargs):
+        kwargs.pop("priority", None)
+        return await channel.send(content, **kwargs)
+
+    services_stub.message_queue = types.SimpleNamespace(send=queued_send)
     monkeypatch.setitem(sys.modules, "services", services_stub)
+    queue_stub = types.ModuleType("services.message_queue")
+    queue_stub.BROADCAST = 1
+    monkeypatch.setitem(sys.modules, "services.message_queue", queue_stub)
     notion_stub = types.ModuleType("services.notion_todos")
     notion_stub.Notion_todos = object
     monkeypatch.setitem(sys.modules, "services.notion_todos", notion_stub)
@@ -208,26 +225,22 @@ def test_start_survey_no_required_steps(monkeypatch):
     spec.loader.exec_module(survey_cmd)
     Strings = config_stub.Strings
 
-    payload = load_payload_example("check_channel Command Payload")
     channel_id = "123"
     user_id = "321"
     session_id = f"{channel_id}_{user_id}"
-    expected = dict(payload)
-    expected["channelId"] = channel_id
-    expected["sessionId"] = session_id
 
-    response = load_check_channel_nonmatching_response()
-    called = {"payloads": []}
+    response = load_check_channel_nonmatching_response()["output"]
+    called = {"bootstraps": []}
 
-    async def fake_send_webhook(target, payload_arg, headers):
-        called["payloads"].append(payload_arg)
-        if len(called["payloads"]) == 2 and created.get("survey"):
-            created["survey"].todo_url = "https://todo.url"
-        return True, response
+    async def fake_bootstrap(channel_arg, session_arg):
+        called["bootstraps"].append((channel_arg, session_arg))
+        return {
+            "registered": response["output"] is True,
+            "steps": response.get("steps", []),
+            "todo_url": "https://todo.url",
+        }
 
-    monkeypatch.setattr(
-        survey_cmd.webhook_service, "send_webhook_with_retry", fake_send_webhook
-    )
+    monkeypatch.setattr(survey_cmd.webhook_service, "bootstrap_survey", fake_bootstrap)
     channel = DummyChannel(channel_id)
 
     async def fake_fetch_channel(cid):
@@ -245,7 +258,7 @@ def test_start_survey_no_required_steps(monkeypatch):
         survey_cmd.handle_start_daily_survey(bot, user_id, channel_id, session_id)
     )
 
-    assert called["payloads"] == [expected, expected]
+    assert called["bootstraps"] == [(channel_id, session_id)]
     assert channel.messages == [Strings.SURVEY_COMPLETE_MESSAGE]
     assert created["steps"] == []
     assert created["survey"].todo_url == "https://todo.url"
@@ -16,7 +16,11 @@ DAY_OFF_NEXTWEEK = step_names[2]
 incomplete_match = re.search(r"incompleteSteps\": \[\"([^\"]+)\", \"([^\"]+)\"\]", text)
 WORKLOAD_NEXTWEEK = incomplete_match.group(1)
 
-from survey_steps_db import SurveyStepsDB
+import asyncio
+import time
+
+import survey_steps_db
+from survey_steps_db import SurveyStepsDB, PoolTimeoutError
 from databases import Database
 
 CREATE_TABLE = (
@@ -163,3 +167,172 @@ async def test_fetch_week_returns_latest(tmp_path):
 
     await database.disconnect()
 
+
+@pytest.mark.asyncio
+async def test_pool_metrics_and_acquire_timeout(tmp_path):
+    log_file = tmp_path / "pool_metrics_log.txt"
+    log_file.write_text("Input: max_size=1, acquire_timeout=0.05\n")
+
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    database = Database(db_url)
+    await database.connect()
+    await database.execute(CREATE_TABLE)
+    repo = SurveyStepsDB(db_url, db=database, max_size=1, acquire_timeout=0.05)
+
+    await repo.upsert_step("S1", WORKLOAD_TODAY, True)
+    async with repo._acquire():
+        busy = repo.metrics()
+        with pytest.raises(PoolTimeoutError):
+            await repo.fetch_week("S1", week_start_str())
+    metrics = repo.metrics()
+    with open(log_file, "a") as f:
+        f.write("Step: hold the only slot and query\n")
+        f.write(f"Output: busy={busy} after={metrics}\n")
+
+    assert busy["in_use"] == 1
+    assert metrics["in_use"] == 0
+    assert metrics["acquire_timeouts"] == 1
+    assert metrics["acquired"] == 2
+
+    await database.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_shared_instance_reused(tmp_path):
+    log_file = tmp_path / "shared_pool_log.txt"
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    log_file.write_text(f"Input: {db_url}\n")
+
+    first = await survey_steps_db.init_steps_db(db_url, max_size=3)
+    try:
+        await first.db.execute(CREATE_TABLE)
+        second = survey_steps_db.get_steps_db(db_url)
+        await second.upsert_step("S1", WORKLOAD_TODAY, True)
+        with open(log_file, "a") as f:
+            f.write("Step: get_steps_db after init\n")
+            f.write(f"Output: {first is second} {second.metrics()}\n")
+        assert first is second
+        assert second.max_size == 3
+        assert second.db.is_connected
+    finally:
+        await survey_steps_db.close_steps_db()
+    assert not first.db.is_connected
+
+
+@pytest.mark.asyncio
+async def test_upsert_steps_batch(tmp_path):
+    log_file = tmp_path / "upsert_steps_log.txt"
+    log_file.write_text("Input: 3 rows, one duplicate key\n")
+
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    database = Database(db_url)
+    await database.connect()
+    await database.execute(CREATE_TABLE)
+    repo = SurveyStepsDB(db_url, db=database)
+
+    await repo.upsert_step("S1", WORKLOAD_TODAY, True)
+    result = await repo.upsert_steps([
+        ("S1", WORKLOAD_TODAY, False),
+        ("S2", CONNECTS_THISWEEK, False),
+        ("S2", CONNECTS_THISWEEK, True),
+    ])
+    s1 = await repo.fetch_week("S1", week_start_str())
+    s2 = await repo.fetch_week("S2", week_start_str())
+    with open(log_file, "a") as f:
+        f.write("Step: upsert_steps and fetch\n")
+        f.write(f"Output: {result} {s1} {s2}\n")
+
+    assert result == {"status": "ok", "count": 2}
+    assert len(s1) == 1 and bool(s1[0]["completed"]) is False
+    assert len(s2) == 1 and bool(s2[0]["completed"]) is True
+    assert await repo.upsert_steps([]) == {"status": "ok", "count": 0}
+
+    await database.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_upsert_steps_benchmark(tmp_path):
+    log_file = tmp_path / "upsert_benchmark_log.txt"
+    log_file.write_text("Input: 1000 rows, single vs batched\n")
+
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    database = Database(db_url)
+    await database.connect()
+    await database.execute(CREATE_TABLE)
+    repo = SurveyStepsDB(db_url, db=database)
+    rows = [(f"S{i}", WORKLOAD_TODAY, True) for i in range(1000)]
+
+    started = time.perf_counter()
+    for session_id, step, completed in rows:
+        await repo.upsert_step(session_id, step, completed)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await repo.upsert_steps([(s, step, False) for s, step, _ in rows])
+    batched = time.perf_counter() - started
+
+    count = await database.fetch_val(
+        "SELECT COUNT(*) FROM n8n_survey_steps_missed WHERE completed = 0"
+    )
+    with open(log_file, "a") as f:
+        f.write("Step: 1000 upsert_step vs one upsert_steps\n")
+        f.write(f"Output: single={single:.3f}s batched={batched:.3f}s\n")
+
+    assert count == 1000
+    assert batched < single / 3
+
+    await database.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_fetch_week_many_and_pending_steps_many(tmp_path):
+    log_file = tmp_path / "fetch_many_log.txt"
+    log_file.write_text("Input: sessions S1, S2, S3\n")
+
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    database = Database(db_url)
+    await database.connect()
+    await database.execute(CREATE_TABLE_NO_UNIQUE)
+    repo = SurveyStepsDB(db_url, db=database)
+
+    week_start = (
+        datetime.now(timezone.utc) - timedelta(days=1)
+    ).replace(tzinfo=None, microsecond=0)
+    rows = [
+        ("S1", WORKLOAD_TODAY, False, week_start + timedelta(hours=1)),
+        ("S1", WORKLOAD_TODAY, True, week_start + timedelta(hours=2)),
+        ("S1", CONNECTS_THISWEEK, False, week_start + timedelta(hours=1)),
+        ("S2", DAY_OFF_NEXTWEEK, True, week_start + timedelta(hours=1)),
+        ("S2", WORKLOAD_TODAY, True, week_start - timedelta(days=2)),
+    ]
+    for session_id, step, completed, updated in rows:
+        await database.execute(
+            "INSERT INTO n8n_survey_steps_missed (session_id, step_name, completed, updated)"
+            " VALUES (:session_id, :step_name, :completed, :updated)",
+            {
+                "session_id": session_id,
+                "step_name": step,
+                "completed": completed,
+                "updated": updated.isoformat(" "),
+            },
+        )
+
+    start = week_start.isoformat(" ")
+    weekly = await repo.fetch_week_many(["S1", "S2", "S3"], start)
+    all_steps = [WORKLOAD_TODAY, CONNECTS_THISWEEK, DAY_OFF_NEXTWEEK]
+    pending = await repo.pending_steps_many(["S1", "S2", "S3"], start, all_steps)
+    with open(log_file, "a") as f:
+        f.write("Step: fetch_week_many and pending_steps_many\n")
+        f.write(f"Output: {weekly} {pending}\n")
+
+    assert weekly["S1"] == await repo.fetch_week("S1", start)
+    assert [r["step_name"] for r in weekly["S2"]] == [DAY_OFF_NEXTWEEK]
+    assert weekly["S3"] == []
+    assert pending == {
+        "S1": [CONNECTS_THISWEEK, DAY_OFF_NEXTWEEK],
+        "S2": [WORKLOAD_TODAY, CONNECTS_THISWEEK],
+        "S3": all_steps,
+    }
+    assert repo.metrics()["acquired"] == 3
+
+    await database.disconnect()
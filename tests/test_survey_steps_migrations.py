@@ -0,0 +1,96 @@
+import sys
+import types
+import logging
+from pathlib import Path
+
+import pytest
+from databases import Database
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_migrations import LATEST_VERSION, current_version, migrate
+
+FETCH_WEEK_SQLITE = (
+    "SELECT step_name, completed, updated FROM ("
+    "SELECT step_name, completed, updated, "
+    "ROW_NUMBER() OVER (PARTITION BY step_name ORDER BY updated DESC) AS rn "
+    "FROM n8n_survey_steps_missed "
+    "WHERE session_id = :session_id AND updated >= :week_start"
+    ") AS ranked WHERE rn = 1 ORDER BY step_name"
+)
+
+
+@pytest.mark.asyncio
+async def test_migrate_creates_schema(tmp_path):
+    log_file = tmp_path / "migrate_log.txt"
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    log_file.write_text(f"Input: empty database {db_url}\n")
+
+    repo = SurveyStepsDB(db_url)
+    version = await migrate(repo)
+    again = await migrate(repo)
+    await repo.upsert_step("S1", "workload_today", True)
+    records = await repo.fetch_week("S1", "2000-01-01 00:00:00")
+    indexes = await repo.db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = 'n8n_survey_steps_missed'"
+    )
+    with open(log_file, "a") as f:
+        f.write("Step: migrate twice\n")
+        f.write(f"Output: version={version} again={again} indexes={[dict(i) for i in indexes]}\n")
+
+    assert version == again == LATEST_VERSION
+    assert await current_version(repo) == LATEST_VERSION
+    assert [r["step_name"] for r in records] == ["workload_today"]
+    assert "idx_survey_steps_session_step_updated" in {i["name"] for i in indexes}
+    await repo.close()
+
+
+@pytest.mark.asyncio
+async def test_migrate_existing_table_and_index_used(tmp_path):
+    log_file = tmp_path / "migrate_existing_log.txt"
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/test.db"
+    log_file.write_text("Input: table created before versioning\n")
+
+    database = Database(db_url)
+    await database.connect()
+    await database.execute(
+        "CREATE TABLE n8n_survey_steps_missed ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+        "step_name TEXT NOT NULL, completed BOOLEAN NOT NULL, "
+        "updated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+        "UNIQUE(session_id, step_name))"
+    )
+    repo = SurveyStepsDB(db_url, db=database)
+    await repo.upsert_step("S1", "workload_today", True)
+
+    version = await migrate(repo)
+    plan = await database.fetch_all(
+        "EXPLAIN QUERY PLAN " + FETCH_WEEK_SQLITE,
+        {"session_id": "S1", "week_start": "2000-01-01 00:00:00"},
+    )
+    details = " ".join(dict(p)["detail"] for p in plan)
+    with open(log_file, "a") as f:
+        f.write("Step: migrate and explain fetch_week\n")
+        f.write(f"Output: version={version} plan={details}\n")
+
+    assert version == LATEST_VERSION
+    assert len(await repo.fetch_week("S1", "2000-01-01 00:00:00")) == 1
+    assert "USING INDEX idx_survey_steps_session_step_updated" in details
+    await database.disconnect()
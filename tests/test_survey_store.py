@@ -0,0 +1,186 @@
+import sys
+import types
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+from services.survey import SurveyManager
+from services.survey_steps_db import SurveyStepsDB
+from services.survey_steps_migrations import migrate
+from services.survey_store import DatabaseSurveyStore, MemorySurveyStore, SurveyStateStore
+
+
+@pytest.mark.asyncio
+async def test_transitions_are_checkpointed(tmp_path):
+    log = tmp_path / "checkpoint_log.txt"
+    log.write_text("Input: survey with two steps\n")
+
+    store = MemorySurveyStore()
+    manager = SurveyManager()
+    manager.set_store(store)
+    survey = manager.create_survey("u1", "c1", ["workload_today", "connects_thisweek"], "c1_u1")
+    survey.add_result("workload_today", 10)
+    survey.next_step()
+    survey.todo_url = "https://notion.so/todo"
+    survey.current_question_message_id = 42
+    await manager.flush()
+
+    state = (await store.load_all())[0]
+    with open(log, "a") as f:
+        f.write("Step: flush\n")
+        f.write(f"Output: {state}\n")
+
+    assert state["current_index"] == 1
+    assert state["results"] == {"workload_today": 10}
+    assert state["todo_url"] == "https://notion.so/todo"
+    assert state["current_question_message_id"] == 42
+
+    manager.remove_survey("c1")
+    await manager.flush()
+    assert await store.load_all() == []
+
+
+@pytest.mark.asyncio
+async def test_rehydrate_restores_surveys(tmp_path):
+    log = tmp_path / "rehydrate_log.txt"
+    db_url = f"sqlite+aiosqlite:///{tmp_path}/state.db"
+    log.write_text(f"Input: {db_url}\n")
+
+    repo = SurveyStepsDB(db_url)
+    await migrate(repo)
+    before = SurveyManager()
+    before.set_store(DatabaseSurveyStore(repo))
+    survey = before.create_survey("u1", "c1", ["workload_today", "day_off_nextweek"], "c1_u1")
+    survey.add_result("workload_today", 5)
+    survey.next_step()
+    finished = before.create_survey("u2", "c2", ["workload_today"], "c2_u2")
+    finished.current_index = 1
+    await before.flush()
+
+    # Simulate a restart with a fresh manager over the same database
+    after = SurveyManager()
+    after.set_store(DatabaseSurveyStore(repo))
+    restored = await after.rehydrate(max_age=60)
+    await after.flush()
+    remaining = await DatabaseSurveyStore(repo).load_all()
+    await repo.close()
+
+    with open(log, "a") as f:
+        f.write("Step: rehydrate\n")
+        f.write(f"Output: restored={restored} remaining={remaining}\n")
+
+    assert restored == 1
+    copy = after.get_survey_by_session("c1_u1")
+    assert copy is not None
+    assert copy.current_step() == "day_off_nextweek"
+    assert copy.results == {"workload_today": 5}
+    assert after.get_surveys_by_user("u1") == [copy]
+    # Finished surveys are dropped instead of restored
+    assert after.get_survey("c2") is None
+    assert [s["channel_id"] for s in remaining] == ["c1"]
+
+
+
+@pytest.mark.asyncio
+async def test_day_off_selection_is_checkpointed(tmp_path):
+    log = tmp_path / "day_off_selection_log.txt"
+    log.write_text("Input: two toggles clicked from the same buttons message, then a restart\n")
+
+    store = MemorySurveyStore()
+    manager = SurveyManager()
+    manager.set_store(store)
+    survey = manager.create_survey("u1", "c1", ["day_off_thisweek", "day_off_nextweek"], "c1_u1")
+    # Both clicks would have seen an all-grey message; neither one is lost
+    survey.toggle_day_off("day_off_thisweek", 3)
+    survey.toggle_day_off("day_off_thisweek", 1)
+    survey.toggle_day_off("day_off_nextweek", 4)
+    survey.toggle_day_off("day_off_nextweek", 4)
+    await manager.flush()
+    state = (await store.load_all())[0]
+    restored = type(survey).from_state(state)
+
+    with open(log, "a") as f:
+        f.write("Step: toggle, checkpoint, restore\n")
+        f.write(f"Output: state={state['day_off_selection']} restored={restored.day_off_selection}\n")
+
+    assert state["day_off_selection"] == {"day_off_thisweek": [1, 3], "day_off_nextweek": []}
+    assert restored.day_off_selection == survey.day_off_selection
+
+class DummyPartial:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def delete(self):
+        self.channel.deleted.append(self.id)
+
+
+class DummyChannel:
+    def __init__(self):
+        self.id = 1
+        self.deleted = []
+
+    def get_partial_message(self, message_id):
+        return DummyPartial(self, message_id)
+
+
+@pytest.mark.asyncio
+async def test_messages_are_kept_as_ids(tmp_path):
+    log = tmp_path / "partial_message_log.txt"
+    log.write_text("Input: question, buttons and start messages\n")
+
+    store = MemorySurveyStore()
+    manager = SurveyManager()
+    manager.set_store(store)
+    channel = DummyChannel()
+    survey = manager.create_survey("u1", "c1", ["workload_today"], "c1_u1")
+    survey.current_message = types.SimpleNamespace(id=7, channel=channel, content="question")
+    survey.buttons_message_id = 8
+    survey.start_message_id = 9
+    await manager.flush()
+    state = (await store.load_all())[0]
+
+    # The survey holds a handle, not the message it was given
+    handle = survey.current_message
+    assert isinstance(handle, DummyPartial) and handle.id == 7
+
+    restored = type(survey).from_state(state)
+    assert restored.current_message is None  # no channel attached yet
+    await restored.cleanup(channel)
+    await survey.cleanup()
+
+    with open(log, "a") as f:
+        f.write("Step: checkpoint, restore, cleanup both\n")
+        f.write(f"Output: state={state} deleted={channel.deleted}\n")
+
+    assert (state["current_question_message_id"], state["buttons_message_id"], state["start_message_id"]) == (7, 8, 9)
+    assert channel.deleted == [8, 9, 7, 8, 9, 7]
+    assert survey.current_question_message_id is None
+    assert restored.buttons_message_id is None
+
+
+def test_incomplete_store_fails_on_creation():
+    class SaveOnly(SurveyStateStore):
+        async def save(self, channel_id, state):
+            pass
+
+    with pytest.raises(TypeError):
+        SaveOnly()
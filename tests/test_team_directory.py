@@ -0,0 +1,180 @@
+import sys
+import json
+import re
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "services"))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+fake_google = types.ModuleType("google")
+auth = types.ModuleType("auth")
+transport = types.ModuleType("transport")
+requests_mod = types.ModuleType("requests")
+requests_mod.Request = object
+transport.requests = requests_mod
+auth.transport = transport
+oauth2 = types.ModuleType("oauth2")
+service_account = types.ModuleType("service_account")
+service_account.Credentials = object
+oauth2.service_account = service_account
+fake_google.auth = auth
+fake_google.oauth2 = oauth2
+sys.modules["google"] = fake_google
+sys.modules["google.auth"] = auth
+sys.modules["google.auth.transport"] = transport
+sys.modules["google.auth.transport.requests"] = requests_mod
+sys.modules["google.oauth2"] = oauth2
+sys.modules["google.oauth2.service_account"] = service_account
+
+import router
+from team_directory import TeamDirectoryIndex
+
+
+def load_payload_example(title: str) -> dict:
+    text = Path(ROOT / "payload_examples.txt").read_text()
+    start = text.index(title)
+    match = re.search(r"```json\n(.*?)\n```", text[start:], re.DOTALL)
+    return json.loads(match.group(1))
+
+
+def load_entry() -> dict:
+    text = Path(ROOT / "responses").read_text()
+    name = re.search(r'plain_text": "([^"]+Lernichenko)"', text).group(1)
+    todo_url = re.search(r'https://www.notion.so/[0-9a-f-]+', text).group(0)
+    page_id = re.search(r'id": "([0-9a-f-]{36})"', text).group(1)
+    return {
+        "id": page_id,
+        "name": name,
+        "discord_id": "321",
+        "channel_id": "123",
+        "to_do": todo_url,
+    }
+
+
+class FakeConnector:
+    def __init__(self, records, gate=None):
+        self.records = records
+        self.gate = gate
+        self.calls = 0
+
+    async def list_team_directory(self):
+        self.calls += 1
+        if self.gate:
+            await self.gate.wait()
+        return {"results": [dict(r) for r in self.records]}
+
+
+@pytest.mark.asyncio
+async def test_refresh_indexes_entries(tmp_path):
+    log = tmp_path / "refresh_log.txt"
+    entry = load_entry()
+    other = {"id": "p2", "name": "Other", "discord_id": "555", "channel_id": "777", "to_do": ""}
+    log.write_text(f"Input: {[entry, other]}\n")
+
+    index = TeamDirectoryIndex(connector=FakeConnector([entry, other]))
+    assert index.get_by_channel("123") is None
+
+    count = await index.refresh()
+    with open(log, "a") as f:
+        f.write("Step: refresh\n")
+        f.write(f"Output: {count}\n")
+
+    assert count == 2
+    assert index.get_by_channel("123")["name"] == entry["name"]
+    assert index.get_by_discord_id("555")["id"] == "p2"
+    assert index.get_by_name(entry["name"])["channel_id"] == "123"
+    assert index.get_by_channel("999") is None
+
+
+@pytest.mark.asyncio
+async def test_register_and_unregister_update_index(tmp_path):
+    log = tmp_path / "writes_log.txt"
+    entry = load_entry()
+    entry.update({"discord_id": "", "channel_id": ""})
+    log.write_text(f"Input: {entry}\n")
+
+    index = TeamDirectoryIndex(connector=FakeConnector([entry]))
+    await index.refresh()
+
+    index.update_ids(entry["id"], "321", "123")
+    with open(log, "a") as f:
+        f.write("Step: update_ids\n")
+        f.write(f"Output: {index.get_by_channel('123')}\n")
+    assert index.get_by_channel("123")["discord_id"] == "321"
+
+    index.clear_channel(entry["id"])
+    with open(log, "a") as f:
+        f.write("Step: clear_channel\n")
+        f.write(f"Output: {index.get_by_channel('123')}\n")
+    assert index.get_by_channel("123") is None
+    assert index.get_by_discord_id("321")["id"] == entry["id"]
+
+
+@pytest.mark.asyncio
+async def test_write_during_refresh_is_kept(tmp_path):
+    log = tmp_path / "race_log.txt"
+    entry = load_entry()
+    log.write_text(f"Input: {entry}\n")
+
+    gate = asyncio.Event()
+    index = TeamDirectoryIndex(connector=FakeConnector([entry], gate=gate))
+    task = asyncio.create_task(index.refresh())
+    await asyncio.sleep(0)
+    index.clear_channel(entry["id"])
+    gate.set()
+    await task
+
+    with open(log, "a") as f:
+        f.write("Step: clear during refresh\n")
+        f.write(f"Output: {index.get_by_channel('123')}\n")
+    assert index.get_by_channel("123") is None
+
+
+@pytest.mark.asyncio
+async def test_dispatch_uses_loaded_index(tmp_path, monkeypatch):
+    log = tmp_path / "dispatch_log.txt"
+    log.write_text("Input: command\n")
+
+    index = TeamDirectoryIndex(connector=FakeConnector([load_entry()]))
+    await index.refresh()
+    monkeypatch.setattr(router, "team_directory", index)
+
+    async def fail_lookup(channel_id):
+        raise AssertionError("Notion should not be queried")
+
+    async def dummy(payload):
+        return "ok"
+
+    monkeypatch.setattr(router._notio, "find_team_directory_by_channel", fail_lookup)
+    monkeypatch.setitem(router.HANDLERS, "dummy", dummy)
+    payload = load_payload_example("Generic Slash Command Payload")
+    payload.update({"command": "dummy", "result": {}})
+    payload["channelId"] = "123"
+    payload["userId"] = "321"
+    payload["sessionId"] = "123_321"
+    with open(log, "a") as f:
+        f.write("Step: dispatch\n")
+    result = await router.dispatch(payload)
+    with open(log, "a") as f:
+        f.write(f"Output: {result}\n")
+    assert result == {"output": "ok"}
@@ -89,7 +89,7 @@ async def test_handle_vacation_success(tmp_path, monkeypatch):
     payload["result"]["end_date"] = end_iso
 
     fake_db = FakeDB()
-    monkeypatch.setattr(vacation, "SurveyStepsDB", lambda *_: fake_db)
+    monkeypatch.setattr(vacation, "get_steps_db", lambda *_: fake_db)
     monkeypatch.setattr(vacation, "Config", types.SimpleNamespace(DATABASE_URL="sqlite://"))
 
     async def fake_create(name, start, end, tz):
@@ -132,7 +132,7 @@ async def test_handle_vacation_calendar_error(tmp_path, monkeypatch):
     payload["result"]["end_date"] = end_iso
 
     fake_db = FakeDB()
-    monkeypatch.setattr(vacation, "SurveyStepsDB", lambda *_: fake_db)
+    monkeypatch.setattr(vacation, "get_steps_db", lambda *_: fake_db)
     monkeypatch.setattr(vacation, "Config", types.SimpleNamespace(DATABASE_URL="sqlite://"))
 
     async def fake_create(name, start, end, tz):
@@ -172,7 +172,7 @@ async def test_vacation_e2e(tmp_path, monkeypatch):
         return {"status": "ok", "event_id": event_id}
 
     fake_db = FakeDB()
-    monkeypatch.setattr(vacation, "SurveyStepsDB", lambda *_: fake_db)
+    monkeypatch.setattr(vacation, "get_steps_db", lambda *_: fake_db)
     monkeypatch.setattr(vacation, "Config", types.SimpleNamespace(DATABASE_URL="sqlite://"))
     monkeypatch.setattr(router._notio, "find_team_directory_by_channel", fake_lookup)
     monkeypatch.setattr(
@@ -216,7 +216,7 @@ async def test_handle_vacation_records_step(monkeypatch, tmp_path):
     payload["result"]["end_date"] = end_iso
 
     fake_db = FakeDB()
-    monkeypatch.setattr(vacation, "SurveyStepsDB", lambda *_: fake_db)
+    monkeypatch.setattr(vacation, "get_steps_db", lambda *_: fake_db)
     monkeypatch.setattr(vacation, "Config", types.SimpleNamespace(DATABASE_URL="sqlite://"))
 
     async def fake_create(name, start, end, tz):
@@ -232,4 +232,5 @@ async def test_handle_vacation_records_step(monkeypatch, tmp_path):
         f.write(f"Output: {result}\n")
 
     assert fake_db.calls == [(payload["channelId"], "vacation", True)]
-    assert fake_db.closed
+    # The shared pool stays open between handler calls
+    assert not fake_db.closed
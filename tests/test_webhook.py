@@ -0,0 +1,187 @@
+import sys
+import time
+import types
+import asyncio
+import logging
+from pathlib import Path
+
+import discord
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+class DummyConfig:
+    DATABASE_URL = "sqlite://"
+    NOTION_TEAM_DIRECTORY_DB_ID = ""
+    NOTION_TOKEN = ""
+    NOTION_WORKLOAD_DB_ID = ""
+    NOTION_PROFILE_STATS_DB_ID = ""
+    SESSION_TTL = 1
+    SURVEY_HANDOFF_TIMEOUT = 2
+
+
+sys.modules["config"] = types.SimpleNamespace(
+    Config=DummyConfig, logger=logging.getLogger("test"), Strings=object()
+)
+
+fake_google = types.ModuleType("google")
+auth = types.ModuleType("auth")
+transport = types.ModuleType("transport")
+requests_mod = types.ModuleType("requests")
+requests_mod.Request = object
+transport.requests = requests_mod
+auth.transport = transport
+oauth2 = types.ModuleType("oauth2")
+service_account = types.ModuleType("service_account")
+service_account.Credentials = object
+oauth2.service_account = service_account
+fake_google.auth = auth
+fake_google.oauth2 = oauth2
+sys.modules["google"] = fake_google
+sys.modules["google.auth"] = auth
+sys.modules["google.auth.transport"] = transport
+sys.modules["google.auth.transport.requests"] = requests_mod
+sys.modules["google.oauth2"] = oauth2
+sys.modules["google.oauth2.service_account"] = service_account
+
+from services import webhook
+
+
+def make_message() -> discord.Message:
+    message = discord.Message.__new__(discord.Message)
+    message.id = 1
+    message.author = types.SimpleNamespace(id=321)
+    message.channel = types.SimpleNamespace(id=123, name="survey")
+    return message
+
+
+@pytest.fixture
+def survey(monkeypatch):
+    async def fake_dispatch(payload):
+        return {"output": "ok", "survey": "continue"}
+
+    monkeypatch.setattr(webhook.router, "dispatch", fake_dispatch)
+    state = webhook.survey_manager.create_survey(
+        "321", "123", ["workload_today", "connects_thisweek"], "123_321"
+    )
+    yield state
+    webhook.survey_manager.remove_survey("123")
+
+
+@pytest.mark.asyncio
+async def test_next_step_follows_interaction_end(tmp_path, monkeypatch, survey):
+    log = tmp_path / "handoff_latency_log.txt"
+    log.write_text("Input: workload_today submitted\n")
+
+    asked = asyncio.get_running_loop().create_future()
+
+    async def ask(channel, state, step):
+        asked.set_result((time.monotonic(), step))
+
+    async def finish(channel, state):
+        pass
+
+    monkeypatch.setattr(webhook, "ask_dynamic_step", ask)
+    monkeypatch.setattr(webhook, "finish_survey", finish)
+    service = webhook.WebhookService()
+
+    survey.begin_interaction()
+    submitted = time.monotonic()
+    success, data = await service.send_webhook(make_message(), command="survey", status="step")
+    returned = time.monotonic()
+    survey.end_interaction()
+    asked_at, step = await asyncio.wait_for(asked, 1)
+    gap = asked_at - submitted
+
+    with open(log, "a") as f:
+        f.write("Step: send_webhook + end_interaction\n")
+        f.write(f"Output: step={step} returned_after={returned - submitted:.4f}s gap={gap:.4f}s\n")
+
+    assert success
+    assert step == "connects_thisweek"
+    # Previously a fixed one-second sleep sat between steps
+    assert returned - submitted < 0.1
+    assert gap < 0.1
+
+
+@pytest.mark.asyncio
+async def test_view_advance_is_not_repeated(tmp_path, monkeypatch, survey):
+    log = tmp_path / "handoff_no_double_log.txt"
+    log.write_text("Input: view advances the survey itself\n")
+
+    asked = []
+
+    async def ask(channel, state, step):
+        asked.append(step)
+
+    async def finish(channel, state):
+        asked.append("finish")
+
+    monkeypatch.setattr(webhook, "ask_dynamic_step", ask)
+    monkeypatch.setattr(webhook, "finish_survey", finish)
+    service = webhook.WebhookService()
+
+    survey.begin_interaction()
+    await service.send_webhook(make_message(), command="survey", status="step")
+    survey.next_step()
+    await ask(None, survey, survey.current_step())
+    survey.end_interaction()
+    await asyncio.gather(*service._continuations)
+
+    with open(log, "a") as f:
+        f.write("Step: view continues, then ends interaction\n")
+        f.write(f"Output: {asked}\n")
+
+    assert asked == ["connects_thisweek"]
+    assert survey.current_index == 1
+
+
+class FakeResponse:
+    def __init__(self, calls):
+        self.calls = calls
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content, **kwargs):
+        self.done = True
+        self.calls.append(("send_message", content))
+
+
+class FakeInteraction:
+    def __init__(self):
+        self.calls = []
+        self.response = FakeResponse(self.calls)
+
+    async def edit_original_response(self, **kwargs):
+        self.calls.append(("edit_original_response", kwargs))
+
+
+@pytest.mark.asyncio
+async def test_interaction_response_takes_two_calls(tmp_path, monkeypatch):
+    log = tmp_path / "interaction_response_calls_log.txt"
+    log.write_text("Input: command answered with output\n")
+
+    monkeypatch.setattr(webhook, "Strings", types.SimpleNamespace(PROCESSING="⏳", ERROR="❌"))
+    service = webhook.WebhookService()
+
+    async def send_webhook(*args, **kwargs):
+        return True, {"output": "Записав!"}
+
+    monkeypatch.setattr(service, "send_webhook", send_webhook)
+    interaction = FakeInteraction()
+    await service.send_interaction_response(interaction, initial_message="Обробка", command="vacation")
+
+    with open(log, "a") as f:
+        f.write("Step: send_interaction_response\n")
+        f.write(f"Output: {interaction.calls}\n")
+
+    # One response shows progress and one edit shows the result; no
+    # reactions, no delete and re-send
+    assert interaction.calls == [
+        ("send_message", "Обробка ⏳"),
+        ("edit_original_response", {"content": "Записав!", "view": None}),
+    ]
@@ -289,3 +289,54 @@ async def test_workload_today_e2e(tmp_path, monkeypatch, hours_key):
     )
     assert result == {"output": expected}
 
+
+
+@pytest.mark.asyncio
+async def test_handle_workload_today_uses_prefetched_page(tmp_path, monkeypatch):
+    from services import survey as survey_module
+
+    payload = load_payload_example("Workload Slash Command Payload")
+    payload.update({"channelId": "123", "author": "Tester"})
+    log = tmp_path / "workload_today_prefetch.txt"
+    log.write_text(f"Input: {payload}\n")
+
+    resp = load_workload_response()
+    queried = []
+
+    async def fake_prefetch(name, mapping=None):
+        queried.append(("prefetch", name, tuple(mapping or ())))
+        return resp
+
+    async def fake_query(db_id, flt, mapping):
+        queried.append(("live", flt["title"]["equals"]))
+        return resp
+
+    async def fake_update(page_id, day_field, hours):
+        return {"status": "ok"}
+
+    async def fake_upsert(session_id, step, completed):
+        pass
+
+    monkeypatch.setattr(survey_module._notion, "get_workload_page_by_name", fake_prefetch)
+    monkeypatch.setattr(workload_today._notio, "query_database", fake_query)
+    monkeypatch.setattr(workload_today._notio, "update_workload_day", fake_update)
+    monkeypatch.setattr(
+        workload_today, "_steps_db", types.SimpleNamespace(upsert_step=fake_upsert)
+    )
+
+    manager = survey_module.survey_manager
+    manager.create_survey("321", "123", ["workload_today"], "123_321", author="Tester")
+    try:
+        prefetched = await workload_today.handle(dict(payload))
+    finally:
+        manager.remove_survey("123")
+    # Without a survey the handler queries Notion itself
+    live = await workload_today.handle(dict(payload))
+
+    with open(log, "a") as f:
+        f.write("Step: handle with and without a prefetched page\n")
+        f.write(f"Output: {queried}\n")
+
+    assert prefetched == live
+    assert [q[0] for q in queried] == ["prefetch", "live"]
+    assert "fact_6" in queried[0][2]
@@ -4,6 +4,9 @@ import discord
 from aiohttp import web
 from config import Config, logger, Strings
 from services.webhook import WebhookService
+from services.channel_resolver import channel_resolver
+from services.message_queue import message_queue, BROADCAST
+from services.rest_calls import rest_calls
 
 class WebServer:
     def __init__(self, bot):
@@ -34,10 +37,13 @@ class WebServer:
 
             # Create consistent session ID format
             try:
-                channel = await self.bot.fetch_channel(channel_id)
+                channel = await channel_resolver.resolve(self.bot, channel_id)
                 logger.info(f"Attempting to send greeting message to channel {channel_id} for user {user_id}")
                 from discord_bot.views.start_survey import StartSurveyView
-                await channel.send(f"<@{user_id}> {Strings.SURVEY_GREETING}", view=StartSurveyView())
+                # Greetings go out for the whole team at once; they yield to survey steps
+                await message_queue.send(
+                    channel, f"<@{user_id}> {Strings.SURVEY_GREETING}", view=StartSurveyView(), priority=BROADCAST
+                )
                 logger.info("Greeting message sent successfully")
                 return web.json_response({"status": "Greeting message sent"})
             except Exception as e:
@@ -48,6 +54,14 @@ class WebServer:
             logger.error(f"Server error: {str(e)}")
             return web.json_response({"error": "Internal server error"}, status=500)
 
+    async def metrics_handler(self, request):
+        """Expose the outbound queue, REST call and channel lookup metrics."""
+        return web.json_response({
+            "message_queue": message_queue.metrics(),
+            "rest_calls": rest_calls.metrics(),
+            "channel_lookups": channel_resolver.metrics(),
+        })
+
     async def debug_log_handler(self, request):
         """Handle requests to view the debug log file."""
         log_file_path = "/app/logs/register_debug.log" # Updated path
@@ -72,6 +86,7 @@ class WebServer:
         app.router.add_post('/start_survey', server.start_survey_http)
         # Add route to expose debug log file
         app.router.add_get('/debug_log', server.debug_log_handler)
+        app.router.add_get('/metrics', server.metrics_handler)
 
         port = int(Config.PORT or "3000")
         host = "0.0.0.0"